@@ -11,11 +11,12 @@ from app.core.config import settings
 from app.core.logger import get_logger
 from app.models import UtilsMessage
 from app.services.api_search_service import (
+    SearchMode,
     delete_embeddings,
     search_endpoints,
-    store_embeddings,
 )
 from app.services.file_service import upload_files_to_project
+from app.services.ingestion_service import IngestionJob, ingestion_queue
 
 router = APIRouter()
 logger = get_logger(__name__, service="files")
@@ -24,6 +25,8 @@ logger = get_logger(__name__, service="files")
 class UploadResponse(BaseModel):
     message: str
     files: list[str]
+    # Ids of the jobs embedding the uploaded API collections
+    jobs: list[str] = []
 
 
 class FileContentRequest(BaseModel):
@@ -41,7 +44,7 @@ class SearchResponse(BaseModel):
     results: list[dict] = []
     metadata: dict = {
         "totalEndpoints": 0,
-        "searchMethod": "fts",
+        "searchMethod": SearchMode.HYBRID.value,
         "timestamp": "",
         "searchParameters": {"includeExamples": False, "limit": 50, "where": None},
     }
@@ -62,27 +65,19 @@ async def upload_files(
     files: list[UploadFile] = File(...),
 ) -> Any:
     """
-    Upload files to a project and generate embeddings for API collections.
-    Returns a list of safe filenames that were successfully uploaded.
+    Upload files to a project and queue embedding jobs for API collections.
+    Returns a list of safe filenames that were successfully uploaded, and the
+    ids of the jobs embedding them, to follow with
+    GET /files/jobs/{job_id}?project_id=...
     """
     logger.info(f"Starting file upload for project_id: {project_id}")
     uploaded_files = await upload_files_to_project(project_id=project_id, files=files)
-    # Generate embeddings for potential API collections
-    for file_path in uploaded_files:
-        filename = Path(file_path).name
-        if filename.lower().endswith((".json", ".yaml", ".yml")):
-            try:
-                full_path = Path(settings.UPLOAD_DIR) / file_path
-                with full_path.open("r", encoding="utf-8") as f:
-                    content = (
-                        json.load(f)
-                        if filename.lower().endswith(".json")
-                        else yaml.safe_load(f)
-                    )
-                    store_embeddings(project_id, filename, content)
-                    logger.info(f"Generated embeddings for file: {filename}")
-            except Exception as e:
-                logger.error(f"Error processing file for embeddings: {str(e)}")
+    # Generate embeddings for potential API collections in the background
+    jobs = [
+        ingestion_queue.submit(project_id, file_path).id
+        for file_path in uploaded_files
+        if Path(file_path).name.lower().endswith((".json", ".yaml", ".yml"))
+    ]
 
     logger.info(
         f"Successfully uploaded {len(uploaded_files)} files to project {project_id}"
@@ -90,9 +85,25 @@ async def upload_files(
     return UploadResponse(
         message=f"Successfully uploaded {len(uploaded_files)} files",
         files=uploaded_files,
+        jobs=jobs,
     )
 
 
+@router.get("/jobs", response_model=list[IngestionJob])
+async def list_ingestion_jobs(project_id: str) -> Any:
+    """List the embedding jobs of a project's uploaded files, newest first."""
+    return ingestion_queue.list(project_id)
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_ingestion_job(job_id: str, project_id: str) -> Any:
+    """Get the status, progress, errors and timings of an embedding job."""
+    job = ingestion_queue.get(job_id)
+    if job is None or job.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @router.delete("/", response_model=UtilsMessage)
 async def delete_file(*, file: str) -> Any:
     """Delete a file and its embeddings from a project."""
@@ -166,9 +177,14 @@ async def search_api_collections(
     query: str,
     limit: int = 10,
     where: str | None = None,
+    mode: SearchMode = SearchMode.SEMANTIC,
 ) -> Any:
     """
-    Search for API endpoints using semantic similarity with optional metadata filtering.
+    Search for API endpoints with optional metadata filtering, by semantic
+    similarity, by keyword (fts) or by fusing both rankings (hybrid).
+
+    Semantic mode is the default, as its score is a distance where lower is
+    better; fts and hybrid scores are higher for better matches.
     """
     logger.info(
         f"Searching API collections for project {project_id} with query: {query}"
@@ -186,32 +202,16 @@ async def search_api_collections(
                     detail="Invalid where filter format. Must be valid JSON",
                 )
 
-        results = search_endpoints(project_id, query, limit, where_filter)
-
-        # Process results
-        processed_results = []
-
-        # Check if we have valid results
-        if (
-            results.get("documents")
-            and results.get("metadatas")
-            and results.get("distances")
-            and len(results["documents"]) > 0
-        ):
-            # Get the first result set (ChromaDB returns nested lists)
-            documents = results["documents"][0]
-            metadatas = results["metadatas"][0]
-            distances = results["distances"][0]
-
-            for doc, metadata, distance in zip(
-                documents, metadatas, distances, strict=True
-            ):
-                result = {
-                    "endpoint": json.loads(doc) if isinstance(doc, str) else doc,
-                    "metadata": metadata,
-                    "score": float(distance),
-                }
-                processed_results.append(result)
+        matches = search_endpoints(project_id, query, limit, where_filter, mode)
+        processed_results = [
+            {
+                "endpoint": json.loads(match.document),
+                "metadata": match.metadata,
+                "score": match.score,
+                "ranks": match.ranks,
+            }
+            for match in matches
+        ]
 
         logger.info(
             f"Search completed successfully with {len(processed_results)} results"
@@ -222,11 +222,12 @@ async def search_api_collections(
             results=processed_results,
             metadata={
                 "totalEndpoints": len(processed_results),
-                "searchMethod": "semantic_similarity",
+                "searchMethod": mode.value,
                 "timestamp": datetime.now().isoformat(),
                 "searchParameters": {
                     "limit": limit,
                     "where": where_filter,
+                    "mode": mode.value,
                 },
             },
         )
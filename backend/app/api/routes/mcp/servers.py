@@ -1,22 +1,34 @@
+import json
+from collections.abc import AsyncIterator
 from typing import Any, Literal
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, status
-from sqlmodel import func, select
+from fastapi import APIRouter, BackgroundTasks, Body, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastmcp.exceptions import ToolError
+from mcp.shared.exceptions import McpError
+from sqlmodel import Session, func, select
 
 from app.api.deps import CurrentUser, SessionDep
 from app.core.logger import get_logger
 from app.mcp.manager import MCPManager
+from app.mcp.queue_manager import queue_manager
+from app.mcp.resource_monitor import resource_monitor
+from app.mcp.stats import parse_range, server_stats
 from app.models import (
     MCPServer,
     MCPServerCreate,
     MCPServerOut,
     MCPServerOutWithTemplate,
+    MCPServerResourceSample,
     MCPServersOut,
     MCPServersOutWithTemplate,
     MCPServerState,
+    MCPServerStatsOut,
     MCPServerStatus,
     MCPServerUpdate,
     MCPTool,
+    MCPToolCallOut,
+    MCPToolCatalog,
     UtilsMessage,
 )
 
@@ -25,7 +37,51 @@ logger = get_logger(__name__)
 router = APIRouter()
 
 
+def persisted_tools(session: Session, server: MCPServer) -> list[MCPTool]:
+    """
+    Get the tools of a server without contacting it.
+
+    Uses the tool catalog persisted the last time the server was reachable,
+    falling back to the tools configured on the server.
+    """
+    catalog = session.get(MCPToolCatalog, server.id)
+    if catalog is None:
+        return server.tools or []
+
+    configured = {tool.name: tool for tool in (server.tools or [])}
+    return [
+        MCPTool(
+            name=tool["name"],
+            description=tool.get("description") or "",
+            status=True,
+            parameters=tool.get("inputSchema") or {},
+        )
+        for tool in catalog.tools
+        if tool["name"] not in configured or configured[tool["name"]].status
+    ]
+
+
 # Helper function to get MCP server or raise 404
+def get_owned_server(session: Session, current_user: CurrentUser, id: str) -> MCPServer:
+    """Get an MCP server the current user may access, or raise 404/403."""
+    db_mcp_server_orm = session.get(MCPServer, id)
+    if not db_mcp_server_orm:
+        raise HTTPException(status_code=404, detail="MCP server not found")
+    if not current_user.is_superuser and db_mcp_server_orm.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return db_mcp_server_orm
+
+
+async def check_server_tool_call(id: str, request_id: str) -> None:
+    """
+    Check that a tool call was queued for a server.
+
+    Raises:
+        HTTPException: 404 if the call is unknown, expired or belongs to
+            another server
+    """
+    if await queue_manager.call_proxy_id(request_id) != id:
+        raise HTTPException(status_code=404, detail="Tool call not found")
 
 
 @router.get("/", response_model=MCPServersOut)
@@ -231,6 +287,8 @@ async def delete_mcp_server(
 
     # Stop the server in the background only after DB commit is complete
     background_tasks.add_task(MCPManager.get_singleton().stop_server, mcp_server_orm)
+    background_tasks.add_task(resource_monitor.forget, mcp_server_orm.id)
+    background_tasks.add_task(server_stats.forget, mcp_server_orm.id)
 
     return UtilsMessage(message="MCP server deleted successfully")
 
@@ -320,8 +378,8 @@ async def read_mcp_server_tools(
 
     if not proxy:
         logger.error(f"MCP proxy not found for server {server_orm.id}")
-        # If proxy doesn't exist or is not initialized, return just the configured tools
-        return server_orm.tools or []
+        # If proxy doesn't exist, return the last discovered or configured tools
+        return persisted_tools(session, server_orm)
 
     try:
         # Get tools from the proxy
@@ -344,5 +402,133 @@ async def read_mcp_server_tools(
 
     except Exception as e:
         logger.error(f"Error getting tools for server {server_orm.id}: {e}")
-        # On error, return just the configured tools
-        return server_orm.tools or []
+        # On error, return the last discovered or configured tools
+        return persisted_tools(session, server_orm)
+
+
+@router.get("/{id}/resources", response_model=list[MCPServerResourceSample])
+def read_mcp_server_resources(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: str,
+) -> Any:
+    """
+    Get recent resource usage samples for a specific MCP server.
+
+    Returns CPU, memory, file descriptor and thread samples of the server's
+    process tree, oldest first. Remote servers have no samples.
+    """
+    db_mcp_server_orm = session.get(MCPServer, id)
+    if not db_mcp_server_orm:
+        raise HTTPException(status_code=404, detail="MCP server not found")
+    if not current_user.is_superuser and db_mcp_server_orm.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return resource_monitor.history(id)
+
+
+@router.get("/{id}/stats", response_model=MCPServerStatsOut)
+def read_mcp_server_stats(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: str,
+    range: str = Query("1h", description="How far back to look, e.g. 30m, 6h or 7d"),
+) -> Any:
+    """
+    Get the call, error, latency and restart history of a specific MCP server.
+
+    Ranges up to a day are returned per minute, longer ones per hour.
+    """
+    get_owned_server(session, current_user, id)
+    try:
+        span = parse_range(range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    resolution, data = server_stats.query(session, id, span)
+    return MCPServerStatsOut(
+        server_id=id, range=range, resolution=resolution, data=data
+    )
+
+
+@router.post("/{id}/tools/{tool_name}/calls", response_model=MCPToolCallOut)
+async def start_mcp_tool_call(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: str,
+    tool_name: str,
+    arguments: dict[str, Any] = Body(default_factory=dict),
+) -> Any:
+    """
+    Queue a tool call and return its request ID.
+
+    Follow its progress and result with the events endpoint, and stop it early
+    with the cancel endpoint.
+    """
+    get_owned_server(session, current_user, id)
+
+    proxy = MCPManager.get_singleton().get_mcp_proxy(id)
+    if not proxy:
+        raise HTTPException(status_code=409, detail="MCP server is not running")
+
+    try:
+        request_id = await proxy.start_tool_call(tool_name, arguments)
+    except ToolError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except McpError as e:
+        raise HTTPException(status_code=400, detail=e.error.message)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return MCPToolCallOut(request_id=request_id)
+
+
+@router.get("/{id}/tool-calls/{request_id}/events")
+async def stream_mcp_tool_call_events(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: str,
+    request_id: str,
+) -> StreamingResponse:
+    """
+    Stream the progress and outcome of a queued tool call as server-sent events.
+
+    Emits `progress` events while the tool runs, then one `result` or `error`
+    event before the stream closes.
+
+    ```bash
+    curl -N "http://localhost:8000/api/v1/mcp/servers/{id}/tool-calls/{request_id}/events"
+    ```
+    """
+    get_owned_server(session, current_user, id)
+    await check_server_tool_call(id, request_id)
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event in queue_manager.stream_events(request_id):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.post("/{id}/tool-calls/{request_id}/cancel")
+async def cancel_mcp_tool_call(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: str,
+    request_id: str,
+) -> UtilsMessage:
+    """
+    Cancel a queued or running tool call.
+    """
+    get_owned_server(session, current_user, id)
+    await check_server_tool_call(id, request_id)
+    await queue_manager.cancel_tool_call(request_id)
+    return UtilsMessage(message="Tool call cancellation requested")
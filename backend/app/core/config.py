@@ -85,6 +85,14 @@ class Settings(BaseSettings):
         # ".xlsx",
         ".csv",
     }
+    # Worker threads embedding uploaded API collections, and finished
+    # ingestion jobs kept for status queries
+    INGESTION_WORKERS: int = 2
+    INGESTION_JOBS_RETAINED: int = 500
+    # Endpoint search fuses the keyword and vector rankings of this many
+    # candidates each with reciprocal rank fusion, using this constant
+    SEARCH_CANDIDATES: int = 50
+    SEARCH_RRF_K: int = 60
 
     @computed_field  # type: ignore[misc]
     @property
@@ -175,6 +183,106 @@ class Settings(BaseSettings):
         auth_part = f":{self.REDIS_PASSWORD}@" if self.REDIS_PASSWORD else ""
         return f"redis://{auth_part}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
 
+    # MCP proxy configuration
+    # Maximum number of queued tool calls a node executes concurrently
+    MCP_QUEUE_CONCURRENCY: int = 10
+    # Seconds to wait for in-flight tool calls to finish during shutdown
+    MCP_DRAIN_TIMEOUT: float = 30.0
+    # Seconds between health check pings to each running MCP server
+    MCP_HEALTH_CHECK_INTERVAL: float = 30.0
+    # Connection pool limits for remote (sse/http) MCP upstreams, per origin
+    MCP_HTTP_MAX_CONNECTIONS: int = 100
+    MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    MCP_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    # Resource sampling of stdio MCP server processes
+    MCP_RESOURCE_SAMPLE_INTERVAL: float = 15.0
+    MCP_RESOURCE_HISTORY_SIZE: int = 240
+    # Soft limits log a warning, hard limits restart the server (None disables)
+    MCP_PROCESS_RSS_SOFT_LIMIT_MB: float | None = None
+    MCP_PROCESS_RSS_HARD_LIMIT_MB: float | None = None
+    MCP_PROCESS_FDS_SOFT_LIMIT: int | None = None
+    MCP_PROCESS_FDS_HARD_LIMIT: int | None = None
+    # CPU use averaged over the sample interval, 100 being one full core
+    MCP_PROCESS_CPU_SOFT_LIMIT_PERCENT: float | None = None
+    MCP_PROCESS_CPU_HARD_LIMIT_PERCENT: float | None = None
+    # Compiled tool argument validators kept for reuse across servers
+    MCP_VALIDATOR_CACHE_SIZE: int = 2048
+    # Per-call Redis streams carrying progress events to streaming callers
+    MCP_EVENT_STREAM_MAXLEN: int = 1000
+    MCP_EVENT_STREAM_TTL: int = 600
+    # Tool results longer than this many characters are truncated, the rest is
+    # kept in Redis chunks for the fetch_result_chunk tool (0 disables)
+    MCP_MAX_RESULT_SIZE: int = 1_000_000
+    MCP_RESULT_CHUNK_SIZE: int = 256_000
+    MCP_RESULT_CHUNK_TTL: int = 600
+    # Per-minute proxy stats kept in memory, compacted to the database and
+    # downsampled to hours once older than the minute retention
+    MCP_STATS_HISTORY_MINUTES: int = 180
+    MCP_STATS_LATENCY_SAMPLES: int = 1000
+    MCP_STATS_COMPACT_INTERVAL: float = 300.0
+    MCP_STATS_MINUTE_RETENTION_HOURS: int = 24
+    MCP_STATS_HOUR_RETENTION_DAYS: int = 30
+    # Opt-in NDJSON trace of sampled tool calls, for replay with
+    # `python -m app.mcp.loadtest.replay`
+    MCP_TRACE_ENABLED: bool = False
+    MCP_TRACE_SAMPLE_RATE: float = 1.0
+    MCP_TRACE_PATH: str | None = None
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def mcp_trace_path(self) -> str:
+        if self.MCP_TRACE_PATH:
+            return self.MCP_TRACE_PATH
+        return str(Path(self.BASE_DIR) / ".centroid" / "traces" / "tool_calls.ndjson")
+
+    # OpenAPI executor configuration
+    # Shared HTTP clients, one per origin and auth profile. HTTP/2 is negotiated
+    # with servers that support it; their usage is logged with the stats compaction
+    OPENAPI_HTTP2: bool = True
+    OPENAPI_HTTP_MAX_CONNECTIONS: int = 50
+    OPENAPI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAPI_HTTP_KEEPALIVE_EXPIRY: float = 90.0
+    # Private cache of GET responses, scoped per auth profile and credentials.
+    # Entries evicted from memory spill to disk (0 bytes disables the disk
+    # tier), in a private directory created under OPENAPI_HTTP_CACHE_DIR or the
+    # system temp dir and deleted on shutdown
+    OPENAPI_HTTP_CACHE: bool = True
+    OPENAPI_HTTP_CACHE_MEMORY_BYTES: int = 32 * 1024 * 1024
+    OPENAPI_HTTP_CACHE_DISK_BYTES: int = 256 * 1024 * 1024
+    OPENAPI_HTTP_CACHE_DIR: str | None = None
+    OPENAPI_HTTP_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+    # Upper bound of the freshness guessed from Last-Modified, in seconds
+    OPENAPI_HTTP_CACHE_HEURISTIC_MAX: float = 300.0
+    # Request pacing per upstream host and per host and credentials, in
+    # requests per second (0 paces only by the upstream's rate limit headers)
+    OPENAPI_RATE_LIMIT_HOST_RPS: float = 0.0
+    OPENAPI_RATE_LIMIT_HOST_BURST: int = 20
+    OPENAPI_RATE_LIMIT_CREDENTIAL_RPS: float = 0.0
+    OPENAPI_RATE_LIMIT_CREDENTIAL_BURST: int = 10
+    # Retries of idempotent requests refused with 429/502/503/504, with
+    # jittered exponential backoff; longer Retry-After waits are not retried
+    OPENAPI_RETRY_ATTEMPTS: int = 3
+    OPENAPI_RETRY_BACKOFF: float = 0.5
+    OPENAPI_RETRY_MAX_DELAY: float = 30.0
+    # Calls in flight at once and argument sets allowed per execute_many batch
+    OPENAPI_BATCH_CONCURRENCY: int = 10
+    OPENAPI_BATCH_MAX_ITEMS: int = 100
+    # Caps on the items, JSON bytes and pages gathered by automatic pagination
+    OPENAPI_PAGINATION_MAX_ITEMS: int = 1000
+    OPENAPI_PAGINATION_MAX_BYTES: int = 1_000_000
+    OPENAPI_PAGINATION_MAX_PAGES: int = 50
+    # $refs nested deeper than this in an operation's schemas become plain objects
+    OPENAPI_SPEC_MAX_REF_DEPTH: int = 5
+    # Most compiled operation and nested object models kept for reuse, per cache
+    OPENAPI_MODEL_CACHE_SIZE: int = 2048
+    # OAuth2 access tokens are refreshed in the background this many seconds
+    # before they expire; tokens without an expires_in last the default
+    OPENAPI_OAUTH_REFRESH_MARGIN: float = 60.0
+    OPENAPI_OAUTH_DEFAULT_EXPIRES_IN: float = 3600.0
+    # Response body bytes read per call; larger responses are cut and marked
+    # truncated, keeping the complete items of a top-level array or object
+    OPENAPI_RESPONSE_MAX_BYTES: int = 5 * 1024 * 1024
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = (
@@ -15,6 +15,7 @@ from app.core.config import settings
 from app.core.db import engine
 from app.mcp.manager import MCPManager
 from app.models import MCPServer, MCPServerStatus
+from app.services.ingestion_service import ingestion_queue
 
 # Suppress specific Pydantic warnings
 warnings.filterwarnings(
@@ -80,6 +81,9 @@ async def lifespan(app: FastAPI):  # noqa: ARG001
     # Use the manager's shutdown method to stop all servers in parallel
     await manager.shutdown()
 
+    # Drop the embedding jobs that did not start yet
+    ingestion_queue.shutdown()
+
 
 # Combine both lifespans
 combined_lifespan = combine_lifespans(mcp_app.lifespan, agent_app.lifespan, lifespan)
@@ -0,0 +1 @@
+"""Load generation and replay tooling for the MCP proxy."""
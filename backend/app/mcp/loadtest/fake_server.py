@@ -0,0 +1,139 @@
+"""
+Deterministic fake MCP server for load tests and benchmarks.
+
+Every tool answers after a fixed delay with a text payload of a fixed size.
+Tools can be configured directly or derived from a recorded traffic trace, so
+replayed calls see the latencies and result sizes observed in production.
+
+Run it with:
+
+    python -m app.mcp.loadtest.fake_server --transport stdio --latency-ms 5
+    python -m app.mcp.loadtest.fake_server --trace tool_calls.ndjson \\
+        --transport streamable-http --port 9000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+from dataclasses import dataclass
+from typing import Any
+
+import mcp.types
+from fastmcp import FastMCP
+from fastmcp.exceptions import NotFoundError, ToolError
+from mcp.types import TextContent
+
+from app.mcp.loadtest.trace import load_trace
+
+
+@dataclass
+class ToolProfile:
+    """How a fake tool behaves."""
+
+    latency: float = 0.0
+    payload_bytes: int = 64
+    error_rate: float = 0.0
+
+
+class FakeMCPServer(FastMCP):
+    """MCP server whose tools only sleep and return filler of a configured size."""
+
+    def __init__(
+        self,
+        tools: dict[str, ToolProfile] | None = None,
+        seed: int = 0,
+        **kwargs: Any,
+    ):
+        super().__init__(name=kwargs.pop("name", "fake-mcp"), **kwargs)
+        self.profiles = tools or {"echo": ToolProfile()}
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_trace(
+        cls, entries: list[dict[str, Any]], seed: int = 0
+    ) -> "FakeMCPServer":
+        """
+        Build a fake server mirroring the tools of a recorded trace.
+
+        Each tool takes the median latency and result size recorded for it, and
+        fails as often as it did in the trace.
+        """
+        calls: dict[str, list[dict[str, Any]]] = {}
+        for entry in entries:
+            calls.setdefault(entry["tool"], []).append(entry)
+
+        return cls(
+            tools={
+                tool: ToolProfile(
+                    latency=statistics.median(e["latency_ms"] for e in tool_calls)
+                    / 1000,
+                    payload_bytes=int(
+                        statistics.median(e["result_bytes"] for e in tool_calls)
+                    ),
+                    error_rate=sum(not e["ok"] for e in tool_calls) / len(tool_calls),
+                )
+                for tool, tool_calls in calls.items()
+            },
+            seed=seed,
+        )
+
+    async def _mcp_list_tools(self) -> list[mcp.types.Tool]:
+        return [
+            mcp.types.Tool(
+                name=name,
+                description=f"Fake tool answering in {profile.latency * 1000:.1f}ms",
+                inputSchema={"type": "object", "additionalProperties": True},
+            )
+            for name, profile in self.profiles.items()
+        ]
+
+    async def _mcp_call_tool(
+        self, key: str, arguments: dict[str, Any]
+    ) -> list[TextContent]:
+        profile = self.profiles.get(key)
+        if profile is None:
+            raise NotFoundError(f"Unknown tool: {key}")
+
+        if profile.latency:
+            await asyncio.sleep(profile.latency)
+        if profile.error_rate and self._random.random() < profile.error_rate:
+            raise ToolError(f"Simulated failure of {key}")
+        return [TextContent(type="text", text="x" * profile.payload_bytes)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--transport", choices=["stdio", "streamable-http", "sse"], default="stdio"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--trace", help="Derive tools from a recorded NDJSON trace")
+    parser.add_argument("--tools", default="echo", help="Comma separated tool names")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=64)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.trace:
+        server = FakeMCPServer.from_trace(load_trace(args.trace), seed=args.seed)
+    else:
+        profile = ToolProfile(
+            latency=args.latency_ms / 1000,
+            payload_bytes=args.payload_bytes,
+            error_rate=args.error_rate,
+        )
+        server = FakeMCPServer(
+            tools={name: profile for name in args.tools.split(",")}, seed=args.seed
+        )
+
+    if args.transport == "stdio":
+        server.run(transport="stdio")
+    else:
+        server.run(transport=args.transport, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Replay a recorded tool call trace against an MCP endpoint.
+
+Calls are issued at the offsets they were recorded at, divided by `--speed`,
+with placeholder arguments matching the recorded argument shapes. Against a
+Centroid deployment, point `--target` at its MCP endpoint and register the
+fake server (see app.mcp.loadtest.fake_server) under the recorded server IDs,
+or map every call to one server with `--server-id`. Without `--target` the
+trace is replayed against an in-process fake server.
+
+    python -m app.mcp.loadtest.replay tool_calls.ndjson --speed 2
+    python -m app.mcp.loadtest.replay tool_calls.ndjson \\
+        --target http://localhost:8000/mcp/ --server-id fake-server --json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastmcp import Client
+
+from app.mcp.loadtest.fake_server import FakeMCPServer
+from app.mcp.loadtest.report import CallResult, LoadReport, summarize
+from app.mcp.loadtest.trace import load_trace, synthesize_arguments
+
+
+async def _call(client: Client, name: str, arguments: dict[str, Any]) -> CallResult:
+    start = time.perf_counter()
+    try:
+        result = await client.call_tool_mcp(name, arguments)
+        error = result.content[0].text if result.isError and result.content else None
+        return CallResult(
+            tool=name,
+            latency=time.perf_counter() - start,
+            ok=not result.isError,
+            error=error,
+        )
+    except Exception as e:
+        return CallResult(
+            tool=name, latency=time.perf_counter() - start, ok=False, error=str(e)
+        )
+
+
+async def replay(
+    entries: list[dict[str, Any]],
+    client: Client,
+    speed: float = 1.0,
+    tool_name: Callable[[dict[str, Any]], str] | None = None,
+) -> LoadReport:
+    """
+    Issue the calls of a trace through an MCP client at the recorded pace.
+
+    Args:
+        entries: Trace entries, ordered by start time
+        client: Client connected to the target MCP endpoint
+        speed: Rate multiplier, 2.0 replays twice as fast as recorded
+        tool_name: Maps an entry to the tool name to call on the target
+
+    Returns:
+        LoadReport: Throughput, latency percentiles and error rates of the run
+    """
+    if not entries:
+        return summarize([], 0.0)
+    tool_name = tool_name or (lambda entry: entry["tool"])
+
+    origin = entries[0]["ts"]
+    tasks: list[asyncio.Task[CallResult]] = []
+    async with client:
+        start = time.perf_counter()
+        for entry in entries:
+            delay = (entry["ts"] - origin) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(
+                asyncio.create_task(
+                    _call(
+                        client,
+                        tool_name(entry),
+                        synthesize_arguments(entry.get("args") or {}),
+                    )
+                )
+            )
+        results = await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+
+    return summarize(list(results), duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("trace", help="NDJSON trace recorded by the MCP proxy")
+    parser.add_argument("--target", help="MCP endpoint URL of the deployment")
+    parser.add_argument(
+        "--server-id", help="Send every call to this server instead of the recorded one"
+    )
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    entries = load_trace(args.trace)
+    if args.target:
+        client = Client(args.target)
+
+        # The gateway exposes each mounted server's tools as "<server>_<tool>"
+        def tool_name(entry: dict[str, Any]) -> str:
+            return f"{args.server_id or entry['server']}_{entry['tool']}"
+
+    else:
+        client = Client(FakeMCPServer.from_trace(entries))
+
+        def tool_name(entry: dict[str, Any]) -> str:
+            return entry["tool"]
+
+    report = asyncio.run(replay(entries, client, speed=args.speed, tool_name=tool_name))
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+
+
+if __name__ == "__main__":
+    main()
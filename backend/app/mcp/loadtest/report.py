@@ -0,0 +1,84 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.mcp.utils import percentile
+
+
+@dataclass
+class CallResult:
+    """Outcome of a single tool call made by a load generator."""
+
+    tool: str
+    latency: float
+    ok: bool
+    error: str | None = None
+
+
+@dataclass
+class LoadReport:
+    """Throughput, latency and error summary of a load run."""
+
+    calls: int
+    errors: int
+    duration: float
+    throughput: float
+    latency_ms: dict[str, float]
+    errors_by_tool: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "duration_s": round(self.duration, 3),
+            "throughput_per_s": round(self.throughput, 2),
+            "latency_ms": self.latency_ms,
+            "errors_by_tool": self.errors_by_tool,
+        }
+
+    def format(self) -> str:
+        latency = "  ".join(
+            f"{key}={value:.2f}" for key, value in self.latency_ms.items()
+        )
+        lines = [
+            f"calls:      {self.calls} in {self.duration:.2f}s",
+            f"throughput: {self.throughput:.2f} calls/s",
+            f"latency ms: {latency}",
+            f"errors:     {self.errors} ({self.error_rate:.2%})",
+        ]
+        for tool, count in sorted(self.errors_by_tool.items()):
+            lines.append(f"  {tool}: {count}")
+        return "\n".join(lines)
+
+
+def summarize(results: list[CallResult], duration: float) -> LoadReport:
+    """
+    Summarize the calls of a load run.
+
+    Args:
+        results: The outcome of every call made
+        duration: Wall-clock seconds the run took
+
+    Returns:
+        LoadReport: Throughput, latency percentiles and error counts
+    """
+    latencies = [result.latency * 1000 for result in results]
+    failed = [result for result in results if not result.ok]
+    return LoadReport(
+        calls=len(results),
+        errors=len(failed),
+        duration=duration,
+        throughput=len(results) / duration if duration > 0 else 0.0,
+        latency_ms={
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies, default=0.0), 3),
+        },
+        errors_by_tool=dict(Counter(result.tool for result in failed)),
+    )
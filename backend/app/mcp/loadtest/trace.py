@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+from typing import Any
+
+# Placeholder values for the scalar types recorded in argument shapes
+_PLACEHOLDERS: dict[str, Any] = {
+    "str": "x",
+    "int": 0,
+    "float": 0.0,
+    "bool": False,
+    "null": None,
+}
+
+
+def load_trace(path: str | Path) -> list[dict[str, Any]]:
+    """Read the entries of an NDJSON tool call trace, ordered by start time."""
+    with Path(path).open(encoding="utf-8") as trace_file:
+        entries = [json.loads(line) for line in trace_file if line.strip()]
+    return sorted(entries, key=lambda entry: entry["ts"])
+
+
+def synthesize_arguments(shape: Any) -> Any:
+    """Build placeholder arguments matching a recorded argument shape."""
+    if isinstance(shape, dict):
+        return {key: synthesize_arguments(item) for key, item in shape.items()}
+    if isinstance(shape, list):
+        return [synthesize_arguments(item) for item in shape]
+    return _PLACEHOLDERS.get(shape, "x")
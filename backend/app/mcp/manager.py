@@ -1,13 +1,20 @@
 import asyncio
 import threading
+from typing import Any
 
 from fastmcp import FastMCP
 from sqlmodel import Session
 
+from app.core.config import settings
 from app.core.logger import get_logger
+from app.mcp.openapi.client_pool import openapi_clients
 from app.mcp.proxy import MCPProxy
 from app.mcp.queue_manager import queue_manager
-from app.models import MCPServer
+from app.mcp.resource_monitor import resource_monitor
+from app.mcp.stats import server_stats
+from app.mcp.traffic import traffic_recorder
+from app.mcp.transports import http_pool
+from app.models import MCPServer, MCPToolCatalog
 from app.models.mcp.server import MCPServerState
 
 logger = get_logger(__name__)
@@ -21,6 +28,13 @@ class MCPManager:
     _mcp_app: FastMCP | None = None
     _agent_app: FastMCP | None = None
     _queue_worker_task: asyncio.Task | None = None
+    _health_check_task: asyncio.Task | None = None
+    _resource_monitor_task: asyncio.Task | None = None
+    _stats_compaction_task: asyncio.Task | None = None
+    # Restarts and catalog reconciliations running in the background, and
+    # the restarts by server id, so a server is not restarted twice at once
+    _background_tasks: set[asyncio.Task] = set()
+    _pending_restarts: dict[str, asyncio.Task] = {}
 
     def __new__(cls):
         with cls._lock:
@@ -37,6 +51,28 @@ class MCPManager:
                     cls._server = cls()
         return cls._server
 
+    def _spawn(self, coro: Any, name: str) -> asyncio.Task:
+        """Run a coroutine in the background, keeping it until it is done."""
+        task = asyncio.create_task(coro, name=name)
+        self._background_tasks.add(task)
+
+        def done(task: asyncio.Task) -> None:
+            self._background_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Background task {name} failed: {task.exception()}")
+
+        task.add_done_callback(done)
+        return task
+
+    def _schedule_restart(self, server: MCPServer) -> bool:
+        """Restart a server in the background unless a restart is pending."""
+        if server.id in self._pending_restarts:
+            return False
+        task = self._spawn(self.restart_server(server), name=f"restart-{server.id}")
+        self._pending_restarts[server.id] = task
+        task.add_done_callback(lambda _: self._pending_restarts.pop(server.id, None))
+        return True
+
     def set_mcp_app(self, app: FastMCP) -> None:
         self._mcp_app = app
 
@@ -78,6 +114,9 @@ class MCPManager:
         """
         # Initialize the Redis queue manager first
         await self._initialize_queue_manager()
+        self._health_check_task = asyncio.create_task(self._health_check_loop())
+        self._resource_monitor_task = asyncio.create_task(self._resource_monitor_loop())
+        self._stats_compaction_task = asyncio.create_task(self._stats_compaction_loop())
 
         if not servers:
             logger.info("No active servers to initialize")
@@ -115,6 +154,87 @@ class MCPManager:
             logger.error(f"Failed to initialize queue manager: {e}")
             raise
 
+    async def _health_check_loop(self) -> None:
+        """Periodically ping every registered MCP server, stdio and remote alike"""
+        while True:
+            await asyncio.sleep(settings.MCP_HEALTH_CHECK_INTERVAL)
+            proxies = list(self._registry.values())
+            if not proxies:
+                continue
+            results = await asyncio.gather(
+                *[proxy.health_check() for proxy in proxies], return_exceptions=True
+            )
+            unhealthy = [
+                proxy.mcp_server.id
+                for proxy, result in zip(proxies, results, strict=True)
+                if result is not True
+            ]
+            if unhealthy:
+                logger.warning(f"MCP servers failed health check: {unhealthy}")
+
+    async def _resource_monitor_loop(self) -> None:
+        """Periodically sample MCP server processes and enforce resource limits"""
+        over_soft_limit: set[str] = set()
+        while True:
+            await asyncio.sleep(settings.MCP_RESOURCE_SAMPLE_INTERVAL)
+            try:
+                # One scan of the process table for all servers, off the event loop
+                samples = await asyncio.to_thread(
+                    resource_monitor.sample_all, list(self._registry)
+                )
+            except Exception as e:
+                logger.error(f"Error sampling MCP server resources: {e}")
+                continue
+            for server_id, sample in samples.items():
+                proxy = self._registry.get(server_id)
+                if proxy is None:
+                    continue
+
+                proxy.stats["resources"] = sample.model_dump(mode="json")
+                limit_status = resource_monitor.check_limits(sample)
+
+                if limit_status == "hard":
+                    if server_id in self._pending_restarts:
+                        continue
+                    logger.error(
+                        f"MCP server {server_id} exceeded its hard resource limit "
+                        f"(rss={sample.rss_bytes} bytes, fds={sample.open_fds}, "
+                        f"cpu={sample.cpu_percent}%), restarting"
+                    )
+                    over_soft_limit.discard(server_id)
+                    proxy.stats["resource_restarts"] = (
+                        proxy.stats.get("resource_restarts", 0) + 1
+                    )
+                    self._schedule_restart(proxy.mcp_server)
+                elif limit_status == "soft":
+                    if server_id not in over_soft_limit:
+                        logger.warning(
+                            f"MCP server {server_id} exceeded its soft resource limit "
+                            f"(rss={sample.rss_bytes} bytes, fds={sample.open_fds}, "
+                            f"cpu={sample.cpu_percent}%)"
+                        )
+                        over_soft_limit.add(server_id)
+                else:
+                    over_soft_limit.discard(server_id)
+
+    async def _stats_compaction_loop(self) -> None:
+        """
+        Periodically write the per-minute proxy stats to the database and log the
+        usage of the shared OpenAPI clients
+        """
+        while True:
+            await asyncio.sleep(settings.MCP_STATS_COMPACT_INTERVAL)
+            self._compact_stats()
+            openapi_clients.log_stats()
+
+    def _compact_stats(self, include_open: bool = False) -> None:
+        if not self._db_session:
+            return
+        try:
+            server_stats.compact(self._db_session, include_open=include_open)
+        except Exception as e:
+            logger.error(f"Error compacting MCP server stats: {e}")
+
     async def start_server(self, server: MCPServer) -> bool:
         """
         Start an MCP server and register it in the manager.
@@ -129,6 +249,7 @@ class MCPManager:
             bool: True if successful, False otherwise
         """
         logger.info(f"Starting MCP server: '{server.id}'")
+        proxy = None
 
         # Check if we already have a proxy for this server
         if server.id in self._registry:
@@ -150,15 +271,23 @@ class MCPManager:
             # Create a new proxy instance
             from app.mcp.proxy import MCPProxy
 
-            proxy = MCPProxy(mcp_server=server)
-            proxy.mount(f"{server.id}/mcp", self._mcp_app)
+            proxy = MCPProxy(
+                mcp_server=server,
+                catalog=self._load_catalog(server.id),
+                on_catalog_change=self._save_catalog,
+            )
+            if self._mcp_app:
+                proxy.mount(self._mcp_app)
 
-            # Initialize the proxy
+            # Register before initializing so listings are served from the
+            # persisted catalog while the server warms up
+            self._registry[server.id] = proxy
             success = await proxy.initialize()
 
             if success:
-                # Add to registry
-                self._registry[server.id] = proxy
+                self._spawn(
+                    self._reconcile_catalog(proxy), name=f"reconcile-{server.id}"
+                )
                 # Update state to running in database
                 if self._db_session:
                     await self.update_servers_state(
@@ -167,6 +296,7 @@ class MCPManager:
                 logger.info(f"Successfully started MCP server {server.id}")
                 return True
             else:
+                self._unregister(server.id, proxy)
                 # Update state to error in database
                 if self._db_session:
                     await self.update_servers_state(
@@ -176,6 +306,7 @@ class MCPManager:
                 return False
 
         except Exception as e:
+            self._unregister(server.id, proxy)
             # Update state to error in database
             if self._db_session:
                 await self.update_servers_state(
@@ -184,6 +315,59 @@ class MCPManager:
             logger.error(f"Error starting MCP server {server.id}: {e}")
             return False
 
+    def _unregister(self, server_id: str, proxy: MCPProxy | None) -> None:
+        """Remove a proxy that failed to start from the registry and gateway."""
+        if proxy is None or self._registry.get(server_id) is not proxy:
+            return
+        del self._registry[server_id]
+        if self._mcp_app:
+            try:
+                self._mcp_app.unmount(server_id)
+            except KeyError:
+                pass
+
+    def _load_catalog(self, server_id: str) -> MCPToolCatalog | None:
+        """Load the persisted tool catalog of a server, if any."""
+        if not self._db_session:
+            return None
+        try:
+            return self._db_session.get(MCPToolCatalog, server_id)
+        except Exception as e:
+            logger.error(f"Error loading tool catalog for server {server_id}: {e}")
+            return None
+
+    async def _save_catalog(
+        self, server_id: str, tools: list[dict[str, Any]], content_hash: str
+    ) -> None:
+        """Persist a server's tool catalog, replacing the previous snapshot."""
+        if not self._db_session:
+            return
+        catalog = self._db_session.get(MCPToolCatalog, server_id)
+        if catalog is None:
+            catalog = MCPToolCatalog(server_id=server_id)
+        catalog.tools = tools
+        catalog.content_hash = content_hash
+        self._db_session.add(catalog)
+        try:
+            self._db_session.commit()
+        except Exception:
+            self._db_session.rollback()
+            raise
+        logger.info(f"Persisted tool catalog for server {server_id}")
+
+    async def _reconcile_catalog(self, proxy: MCPProxy) -> None:
+        """Replace the persisted catalog with the live one once a server is up."""
+        try:
+            changed = await proxy.reconcile_catalog()
+            if not changed:
+                logger.info(
+                    f"Persisted tool catalog for server {proxy.mcp_server.id} is up to date"
+                )
+        except Exception as e:
+            logger.error(
+                f"Error reconciling tool catalog for server {proxy.mcp_server.id}: {e}"
+            )
+
     async def stop_server(self, server: str | MCPServer) -> bool:
         """
         Stop an MCP server and remove it from the registry.
@@ -218,7 +402,11 @@ class MCPManager:
                 )
 
             # Shutdown the proxy
-            proxy.unmount(prefix=proxy.mcp_server.id)
+            if self._mcp_app:
+                try:
+                    self._mcp_app.unmount(server_id)
+                except KeyError:
+                    logger.warning(f"Server {server_id} was not mounted")
             success = await proxy.shutdown()
 
             if success:
@@ -261,6 +449,7 @@ class MCPManager:
             bool: True if successful, False otherwise
         """
         logger.info(f"Restarting MCP server '{server.id}'")
+        server_stats.record_restart(server.id)
 
         # Stop the server
         stop_result = await self.stop_server(server.id)
@@ -288,12 +477,35 @@ class MCPManager:
         """
         return self._registry.get(server_id)
 
-    async def shutdown(self) -> None:
+    async def shutdown(self, drain_timeout: float | None = None) -> None:
         """
         Shut down all active MCP servers in parallel and cleanup queue manager
 
-        This method stops all servers currently in the registry and the queue worker.
+        In-flight tool calls are drained first: the queue worker stops taking new
+        calls, running calls get up to `drain_timeout` seconds to finish, and only
+        then are the servers and the queue worker stopped.
+
+        Args:
+            drain_timeout: Seconds to wait for in-flight tool calls, defaults to
+                settings.MCP_DRAIN_TIMEOUT
         """
+        if drain_timeout is None:
+            drain_timeout = settings.MCP_DRAIN_TIMEOUT
+        await self._drain_queue_manager(drain_timeout)
+
+        for task in (
+            self._health_check_task,
+            self._resource_monitor_task,
+            self._stats_compaction_task,
+        ):
+            if task and not task.done():
+                task.cancel()
+        # Pending restarts would start servers again while they are stopped
+        background = list(self._background_tasks)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
         server_ids = list(self._registry.keys())
 
         if server_ids:
@@ -323,6 +535,21 @@ class MCPManager:
         # Shutdown queue manager
         await self._shutdown_queue_manager()
 
+        # Keep the stats of the minute still being recorded
+        self._compact_stats(include_open=True)
+
+        # Release pooled connections to remote MCP upstreams
+        await http_pool.aclose()
+        await openapi_clients.aclose()
+        traffic_recorder.close()
+
+    async def _drain_queue_manager(self, timeout: float) -> None:
+        """Stop consuming queued tool calls and wait for in-flight ones"""
+        try:
+            await queue_manager.drain(timeout)
+        except Exception as e:
+            logger.error(f"Error draining queue manager: {e}")
+
     async def _shutdown_queue_manager(self) -> None:
         """Shutdown the Redis queue manager and worker"""
         try:
@@ -0,0 +1,162 @@
+import importlib.util
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.http_cache import CachingTransport, openapi_response_cache
+from app.mcp.openapi.rate_limit import RateLimitedTransport, openapi_rate_limiter
+
+logger = get_logger(__name__)
+
+
+def http2_available() -> bool:
+    """Whether the optional h2 package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Counts the requests that reach the network and the connections opened.
+
+    Sits below the HTTP cache and the rate limiter, so cache hits are not
+    counted as requests served by a reused connection.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: dict[str, int]):
+        self._transport = transport
+        self._stats = stats
+
+    async def _trace(self, event_name: str, info: dict[str, Any]) -> None:  # noqa: ARG002
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections"] += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats["requests"] += 1
+        request.extensions["trace"] = self._trace
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class OpenAPIClientPool:
+    """
+    Shared httpx clients for OpenAPI operations, one per origin and auth profile.
+
+    Clients keep their connections alive between calls, so chatty APIs pay the
+    TCP and TLS handshake once per connection instead of once per call. Each
+    client caps its own connections, which makes the limits per host. Clients
+    of different auth profiles never share connections or cookies. GET
+    responses go through the shared HTTP cache, scoped per auth profile, and
+    requests that miss it are paced by the shared rate limiter.
+    """
+
+    def __init__(self):
+        self._clients: dict[tuple[str, str | None], httpx.AsyncClient] = {}
+        self._stats: dict[tuple[str, str | None], dict[str, int]] = {}
+        self._http2: bool | None = None
+
+    def _use_http2(self) -> bool:
+        if self._http2 is None:
+            self._http2 = settings.OPENAPI_HTTP2 and http2_available()
+            if settings.OPENAPI_HTTP2 and not self._http2:
+                logger.warning(
+                    "HTTP/2 is enabled but the h2 package is not installed, "
+                    "OpenAPI clients will use HTTP/1.1"
+                )
+        return self._http2
+
+    def get_client(
+        self, url: str, auth_profile: str | None = None
+    ) -> httpx.AsyncClient:
+        """
+        Get the pooled client for the origin of a URL.
+
+        Args:
+            url: Absolute URL the client will be used for
+            auth_profile: Identifies the credentials sent with the requests
+
+        Returns:
+            httpx.AsyncClient: A client whose lifetime is managed by the pool
+        """
+        parsed = urlparse(url)
+        key = (f"{parsed.scheme}://{parsed.netloc}", auth_profile)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            logger.info(
+                f"Creating OpenAPI client pool for {key[0]} (auth profile {auth_profile})"
+            )
+            transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+                http2=self._use_http2(),
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAPI_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAPI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OPENAPI_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            transport = _CountingTransport(
+                transport,
+                self._stats.setdefault(key, {"requests": 0, "connections": 0}),
+            )
+            transport = RateLimitedTransport(
+                transport, openapi_rate_limiter, scope=auth_profile or ""
+            )
+            if settings.OPENAPI_HTTP_CACHE:
+                transport = CachingTransport(
+                    transport, openapi_response_cache, scope=auth_profile or ""
+                )
+
+            client = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(30.0))
+            self._clients[key] = client
+        return client
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Requests sent over the network and connections opened per pool, with the
+        share of those requests that reused an open connection.
+        """
+        return [
+            {
+                "origin": origin,
+                "auth_profile": auth_profile,
+                "requests": stats["requests"],
+                "connections": stats["connections"],
+                "reuse_ratio": (
+                    round(1 - stats["connections"] / stats["requests"], 3)
+                    if stats["requests"]
+                    else 0.0
+                ),
+            }
+            for (origin, auth_profile), stats in self._stats.items()
+        ]
+
+    def log_stats(self) -> None:
+        """Log the connection reuse of every pool, the HTTP cache and rate limiting."""
+        for pool in self.stats():
+            logger.info(
+                f"OpenAPI client pool for {pool['origin']}: {pool['requests']} requests "
+                f"over {pool['connections']} connections "
+                f"(reuse ratio {pool['reuse_ratio']})"
+            )
+        if settings.OPENAPI_HTTP_CACHE:
+            logger.info(f"OpenAPI HTTP cache: {openapi_response_cache.usage()}")
+        for host in openapi_rate_limiter.usage():
+            logger.info(f"OpenAPI rate limiting: {host}")
+
+    async def aclose(self) -> None:
+        """Close every pooled client."""
+        self.log_stats()
+        for (origin, _), client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing OpenAPI client pool for {origin}: {e}")
+        self._clients.clear()
+        self._stats.clear()
+        openapi_response_cache.close()
+
+
+openapi_clients = OpenAPIClientPool()
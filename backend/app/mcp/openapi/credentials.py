@@ -0,0 +1,256 @@
+import asyncio
+import base64
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.client_pool import openapi_clients
+from app.models.secret import AuthType
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Credential:
+    """Headers and query parameters that authenticate the requests of a connection."""
+
+    headers: dict[str, str] = field(default_factory=dict)
+    params: dict[str, str] = field(default_factory=dict)
+
+
+def static_credential(auth_type: AuthType, config: dict[str, Any]) -> Credential:
+    """
+    Build the credential of a token, API key or basic auth configuration.
+
+    Raises:
+        ValueError: If the configuration misses a value its type needs
+    """
+    try:
+        if auth_type == AuthType.TOKEN:
+            return Credential(headers={"Authorization": f"Bearer {config['token']}"})
+        if auth_type == AuthType.API_KEY:
+            location = config.get("location", "header")
+            if location == "query":
+                return Credential(params={config["key"]: config["value"]})
+            return Credential(headers={config["key"]: config["value"]})
+        if auth_type == AuthType.BASIC:
+            auth_string = f"{config['username']}:{config['password']}"
+            encoded = base64.b64encode(auth_string.encode()).decode()
+            return Credential(headers={"Authorization": f"Basic {encoded}"})
+    except KeyError as e:
+        raise ValueError(f"{auth_type.value} auth needs a {e.args[0]!r} value") from e
+    raise ValueError(f"{auth_type.value} auth is not a static credential")
+
+
+class OAuth2Credential:
+    """
+    Access token of an OAuth2 client, fetched and refreshed from its token URL.
+
+    Uses the refresh token grant when a refresh token is known and the client
+    credentials grant otherwise, keeping rotated refresh tokens. A token that
+    expires within `refresh_margin` seconds, or is past half its lifetime, is
+    refreshed in the background while requests keep using it, so requests
+    only wait for the token endpoint when there is no usable token at all.
+    Concurrent callers share a single token request.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        refresh_margin: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not config.get("token_url") or not config.get("client_id"):
+            raise ValueError("oauth2 auth needs a 'token_url' and a 'client_id'")
+        self.config = config
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self.refresh_token: str | None = config.get("refresh_token")
+        self._credential: Credential | None = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self._refreshing: asyncio.Task | None = None
+        self.fetches = 0
+
+    def _token_request(self) -> tuple[dict[str, str], dict[str, str]]:
+        """Form fields and headers of the next token request."""
+        if self.refresh_token:
+            data = {"grant_type": "refresh_token", "refresh_token": self.refresh_token}
+        else:
+            data = {"grant_type": "client_credentials"}
+        for name in ("scope", "audience"):
+            if self.config.get(name):
+                data[name] = self.config[name]
+
+        headers = {"Accept": "application/json"}
+        client_id = self.config["client_id"]
+        client_secret = self.config.get("client_secret") or ""
+        if self.config.get("client_auth") == "basic":
+            encoded = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+            headers["Authorization"] = f"Basic {encoded}"
+        else:
+            data["client_id"] = client_id
+            if client_secret:
+                data["client_secret"] = client_secret
+        return data, headers
+
+    async def _fetch(self) -> Credential:
+        token_url = self.config["token_url"]
+        data, headers = self._token_request()
+        try:
+            client = openapi_clients.get_client(token_url)
+            response = await client.post(token_url, data=data, headers=headers)
+            token = response.json() if response.content else {}
+        except (httpx.HTTPError, ValueError) as e:
+            raise HTTPException(
+                status_code=502, detail=f"OAuth2 token request failed: {e}"
+            ) from e
+        if response.status_code != 200 or "access_token" not in token:
+            raise HTTPException(
+                status_code=401,
+                detail=f"OAuth2 token request failed with HTTP {response.status_code}: "
+                f"{token.get('error_description') or token.get('error') or token}",
+            )
+
+        self.fetches += 1
+        if token.get("refresh_token"):
+            self.refresh_token = token["refresh_token"]
+        expires_in = float(
+            token.get("expires_in") or settings.OPENAPI_OAUTH_DEFAULT_EXPIRES_IN
+        )
+        token_type = token.get("token_type") or "Bearer"
+        if token_type.lower() == "bearer":
+            token_type = "Bearer"
+        self._credential = Credential(
+            headers={"Authorization": f"{token_type} {token['access_token']}"}
+        )
+        now = self._clock()
+        self.expires_at = now + expires_in
+        # Short lived tokens are refreshed halfway through their lifetime
+        self.refresh_at = now + max(expires_in - self.refresh_margin, expires_in / 2)
+        logger.info(
+            f"Fetched OAuth2 token from {token_url}, expires in {expires_in:.0f}s"
+        )
+        return self._credential
+
+    def refresh(self) -> asyncio.Task:
+        """Start fetching a new token, or join the fetch already running."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._fetch())
+            self._refreshing.add_done_callback(self._log_failure)
+        return self._refreshing
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"OAuth2 token refresh failed: {task.exception()}")
+
+    async def get(self) -> Credential:
+        now = self._clock()
+        if self._credential is not None and now < self.expires_at:
+            if now >= self.refresh_at:
+                self.refresh()
+            return self._credential
+        return await asyncio.shield(self.refresh())
+
+    def invalidate(self) -> None:
+        """Drop the current token, e.g. after the API rejected it."""
+        self._credential = None
+        self.expires_at = 0.0
+
+
+class CredentialCache:
+    """
+    Credentials of API connections, keyed by auth profile.
+
+    Static credentials have their headers built once when registered. OAuth2
+    credentials keep their access token until it is about to expire. An
+    OAuth2 profile registered from a running event loop fetches its first
+    token right away.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_margin = (
+            settings.OPENAPI_OAUTH_REFRESH_MARGIN
+            if refresh_margin is None
+            else refresh_margin
+        )
+        self._clock = clock
+        self._configs: dict[str, tuple[AuthType, dict[str, Any]]] = {}
+        self._credentials: dict[str, Credential | OAuth2Credential] = {}
+
+    def register(
+        self, profile: str, auth_type: AuthType | str, config: dict[str, Any]
+    ) -> None:
+        """
+        Set the credentials of an auth profile.
+
+        Registering the same configuration again keeps the current token.
+
+        Raises:
+            ValueError: If the auth type is unknown or its configuration incomplete
+        """
+        auth_type = AuthType(auth_type)
+        if self._configs.get(profile) == (auth_type, config):
+            return
+        if auth_type == AuthType.OAUTH2:
+            credential = OAuth2Credential(config, self.refresh_margin, self._clock)
+            try:
+                asyncio.get_running_loop()
+                credential.refresh()
+            except RuntimeError:
+                pass
+        else:
+            credential = static_credential(auth_type, config)
+        self._configs[profile] = (auth_type, config)
+        self._credentials[profile] = credential
+
+    def forget(self, profile: str) -> None:
+        self._configs.pop(profile, None)
+        self._credentials.pop(profile, None)
+
+    async def get(self, profile: str | None) -> Credential | None:
+        """
+        The credential of an auth profile, None if it has none registered.
+
+        Raises:
+            HTTPException: If no OAuth2 token could be fetched
+        """
+        credential = self._credentials.get(profile) if profile else None
+        if isinstance(credential, OAuth2Credential):
+            return await credential.get()
+        return credential
+
+    def invalidate(self, profile: str | None) -> bool:
+        """Drop the token of a profile, returning whether a new one can be fetched."""
+        credential = self._credentials.get(profile) if profile else None
+        if isinstance(credential, OAuth2Credential):
+            credential.invalidate()
+            return True
+        return False
+
+    def usage(self) -> list[dict[str, Any]]:
+        """Token fetches and seconds left on the token of each OAuth2 profile."""
+        now = self._clock()
+        return [
+            {
+                "auth_profile": profile,
+                "fetches": credential.fetches,
+                "expires_in": round(max(credential.expires_at - now, 0.0), 1),
+            }
+            for profile, credential in self._credentials.items()
+            if isinstance(credential, OAuth2Credential)
+        ]
+
+
+openapi_credentials = CredentialCache()
@@ -1,19 +1,41 @@
+import asyncio
+import codecs
 import json
-from collections.abc import Callable
+import re
+from collections.abc import AsyncIterator, Callable
+from inspect import Parameter
 from typing import Any
-from urllib.parse import urljoin
+from weakref import WeakKeyDictionary
 
 import httpx
 from fastapi import HTTPException
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, Field, ValidationError
 
-from app.models.secret import AuthType
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.client_pool import openapi_clients
+from app.mcp.openapi.credentials import openapi_credentials
+from app.mcp.openapi.json_stream import JSONStream
+
+logger = get_logger(__name__)
 
 
 class APIResponse(BaseModel):
     status_code: int
     data: Any | None = None
     error: str | None = None
+    # Response headers, e.g. for pagination links; not part of tool results
+    headers: dict[str, str] = Field(default_factory=dict, exclude=True)
+    # Body bytes read, and whether reading stopped at the byte cap
+    size: int = 0
+    truncated: bool = False
+
+
+class BatchItemResult(BaseModel):
+    # Position of the argument set in the batch
+    index: int
+    result: Any | None = None
+    error: str | None = None
 
 
 class EndpointConfig(BaseModel):
@@ -23,6 +45,12 @@ class EndpointConfig(BaseModel):
     params: dict[str, Any] | None = None
     body: dict[str, Any] | None = None
     timeout: float | None = 30.0
+    # Requests with different auth profiles never share pooled connections
+    auth_profile: str | None = None
+    # Body bytes to read at most, OPENAPI_RESPONSE_MAX_BYTES by default
+    max_response_bytes: int | None = None
+    # Dotted JSON paths to keep from the response, e.g. ["id", "user.login"]
+    fields: list[str] | None = None
 
 
 async def execute_endpoint(
@@ -31,6 +59,12 @@ async def execute_endpoint(
     """
     Execute an API endpoint with the provided configuration.
 
+    The credentials registered for the config's auth profile are added to the
+    request. A request rejected with 401 is retried once with a new OAuth2
+    token. The response body is read as a stream and decoded as it arrives,
+    up to the config's byte cap; a capped response holds what could be
+    decoded of it and is marked truncated.
+
     Args:
         config: EndpointConfig object containing all necessary parameters for the API call
 
@@ -40,67 +74,262 @@ async def execute_endpoint(
     Raises:
         HTTPException: When the API call fails or returns an error status
     """
-    print(f"Executing request to: {config.url}")
-    print(f"Headers: {config.headers}")
-    print(f"Params: {config.params}")
+    logger.debug(f"Executing {config.method} {config.url}")
 
     try:
-        async with httpx.AsyncClient(timeout=config.timeout) as client:
-            print("Making request...")
-            response = await client.request(
-                method=config.method,
-                url=config.url,
-                headers=config.headers,
-                params=config.params,
-                json=config.body,
-            )
-            print(f"Response status: {response.status_code}")
-
-            try:
-                if response.text:
-                    print("Parsing response...")
-                    response_data = response.json()
-                    print(f"Response data: {response_data}")
-                else:
-                    response_data = None
-                    print("Empty response")
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                response_data = response.text
-
-            if 200 <= response.status_code < 300:
-                return APIResponse(status_code=response.status_code, data=response_data)
-            else:
-                error_str = (
-                    json.dumps(response_data)
-                    if isinstance(response_data, dict)
-                    else str(response_data)
-                )
-                print(f"Error response: {error_str}")
-                return APIResponse(status_code=response.status_code, error=error_str)
+        client = openapi_clients.get_client(config.url, config.auth_profile)
+        response = await _send(client, config)
+        if response.status_code == 401 and openapi_credentials.invalidate(
+            config.auth_profile
+        ):
+            response = await _send(client, config)
+        logger.debug(
+            f"{config.method} {config.url} returned {response.status_code}, "
+            f"{response.size} bytes{' (truncated)' if response.truncated else ''}"
+        )
+        return response
 
+    except HTTPException:
+        raise
     except httpx.TimeoutException as e:
-        print(f"Timeout error: {e}")
+        logger.warning(f"{config.method} {config.url} timed out: {e}")
         raise HTTPException(status_code=504, detail=f"Request timed out: {str(e)}")
     except httpx.RequestError as e:
-        print(f"Request error: {e}")
+        logger.warning(f"{config.method} {config.url} failed: {e}")
         raise HTTPException(status_code=500, detail=f"Request failed: {str(e)}")
     except ValidationError as e:
-        print(f"Validation error: {e}")
         raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
     except Exception as e:
-        import traceback
-
-        print(f"Unexpected error: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception(f"Unexpected error calling {config.method} {config.url}")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+async def _send(client: httpx.AsyncClient, config: EndpointConfig) -> APIResponse:
+    headers, params = config.headers, config.params
+    credential = await openapi_credentials.get(config.auth_profile)
+    if credential is not None:
+        headers = {**(headers or {}), **credential.headers}
+        params = {**(params or {}), **credential.params}
+    max_bytes = config.max_response_bytes or settings.OPENAPI_RESPONSE_MAX_BYTES
+
+    async with client.stream(
+        method=config.method,
+        url=config.url,
+        headers=headers,
+        params=params,
+        json=config.body,
+        timeout=config.timeout,
+    ) as response:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(
+            errors="replace"
+        )
+        document = JSONStream(config.fields)
+        size, truncated = 0, False
+        try:
+            async for chunk in response.aiter_bytes():
+                if size + len(chunk) > max_bytes:
+                    chunk, truncated = chunk[: max_bytes - size], True
+                size += len(chunk)
+                document.feed(decoder.decode(chunk))
+                if truncated:
+                    break
+            document.feed(decoder.decode(b"", final=True))
+            data = document.close(partial=truncated)
+        except ValueError as e:
+            # A body that only looks like JSON, e.g. text starting with a bracket
+            data = f"Invalid JSON response: {e}"
+
+    if 200 <= response.status_code < 300:
+        return APIResponse(
+            status_code=response.status_code,
+            data=data,
+            headers=dict(response.headers),
+            size=size,
+            truncated=truncated,
+        )
+    return APIResponse(
+        status_code=response.status_code,
+        error=json.dumps(data) if isinstance(data, dict | list) else str(data),
+        headers=dict(response.headers),
+        size=size,
+        truncated=truncated,
+    )
+
+
+# Placeholders of an OpenAPI path template, like {owner}
+_PATH_PARAMETER = re.compile(r"\{([^{}]+)\}")
+
+# Optional arguments of generated functions and tools that shape the response
+# of a call rather than its request
+RESPONSE_OPTIONS = [
+    Parameter(
+        "response_fields",
+        Parameter.KEYWORD_ONLY,
+        default=None,
+        annotation=list[str] | None,
+    ),
+    Parameter(
+        "max_response_bytes",
+        Parameter.KEYWORD_ONLY,
+        default=None,
+        annotation=int | None,
+    ),
+]
+
+
+def response_options(names: set[str]) -> list[Parameter]:
+    """The response options of an operation, except those its inputs shadow."""
+    return [option for option in RESPONSE_OPTIONS if option.name not in names]
+
+
+class RequestPlan:
+    """
+    Where each field of an operation's input model goes in its HTTP request.
+
+    A plan is compiled once per operation, so a call only fills values into a
+    field-to-location map and the pre-split segments of the path template.
+    """
+
+    def __init__(self, metadata: dict[str, Any], field_names: list[str]):
+        self.metadata = metadata
+        self.method = metadata.get("method", "GET")
+        self.query: list[tuple[str, str]] = []
+        self.headers: list[tuple[str, str]] = []
+        self.cookies: list[tuple[str, str]] = []
+        self.body: list[tuple[str, str]] = []
+        # Response projection and byte cap of the operation, which calls may
+        # override
+        self.response_fields: list[str] | None = metadata.get("response_fields")
+        self.max_response_bytes: int | None = metadata.get("max_response_bytes")
+        # Headers sent with every call of the operation
+        static_headers = metadata.get("headers")
+        self.static_headers: dict[str, str] = (
+            dict(static_headers)
+            if isinstance(static_headers, dict) and "headers" not in field_names
+            else {}
+        )
+
+        path_fields: dict[str, str] = {}
+        for field_name in field_names:
+            param_meta = metadata.get(field_name)
+            if not isinstance(param_meta, dict):
+                param_meta = {}
+            param_name = param_meta.get("name", field_name)
+            param_in = (
+                param_meta.get("in") if param_meta.get("type") == "parameter" else None
+            )
+
+            # If not explicitly a parameter or no location specified, treat as body
+            if not param_in:
+                self.body.append((field_name, param_name))
+            elif param_in == "query":
+                self.query.append((field_name, param_name))
+            elif param_in == "header":
+                self.headers.append((field_name, param_name))
+            elif param_in == "path":
+                path_fields[param_name] = field_name
+            elif param_in == "cookie":
+                self.cookies.append((field_name, param_name))
+
+        # Alternating literal text and placeholder names; placeholders without
+        # a path parameter stay in the URL as they are
+        self.path_segments: list[tuple[str, str | None]] = []
+        parts = _PATH_PARAMETER.split(metadata.get("path", "").lstrip("/"))
+        for index, part in enumerate(parts):
+            if index % 2 == 0:
+                self.path_segments.append((part, None))
+            elif part in path_fields:
+                self.path_segments.append(("", path_fields[part]))
+            else:
+                self.path_segments.append((f"{{{part}}}", None))
+
+    def fill(
+        self,
+        values: dict[str, Any],
+        base_url: str,
+        response_fields: list[str] | None = None,
+        max_response_bytes: int | None = None,
+    ) -> EndpointConfig:
+        """
+        Build the request of one call.
+
+        Args:
+            values: Field values of the validated input model
+            base_url: URL the operation path is relative to
+            response_fields: Dotted JSON paths to keep from the response
+            max_response_bytes: Body bytes to read at most, up to
+                OPENAPI_RESPONSE_MAX_BYTES
+
+        Returns:
+            EndpointConfig for the call, without the fields whose value is None
+        """
+        path = "".join(
+            text if field_name is None else str(values.get(field_name))
+            for text, field_name in self.path_segments
+        )
+
+        headers = dict(self.static_headers)
+        for field_name, name in self.headers:
+            value = values.get(field_name)
+            if isinstance(value, str):
+                headers[name] = value
+        cookies = [
+            f"{name}={values[field_name]}"
+            for field_name, name in self.cookies
+            if values.get(field_name) is not None
+        ]
+        if cookies:
+            headers["Cookie"] = "; ".join(cookies)
+        params = {
+            name: values[field_name]
+            for field_name, name in self.query
+            if values.get(field_name) is not None
+        }
+        body = {
+            name: values[field_name]
+            for field_name, name in self.body
+            if values.get(field_name) is not None
+        }
+
+        return EndpointConfig(
+            url=f"{base_url.rstrip('/')}/{path}",
+            method=self.method,
+            headers=headers or None,
+            params=params or None,
+            body=body or None,
+            timeout=30.0,
+            fields=response_fields or self.response_fields,
+            max_response_bytes=min(
+                max_response_bytes
+                or self.max_response_bytes
+                or settings.OPENAPI_RESPONSE_MAX_BYTES,
+                settings.OPENAPI_RESPONSE_MAX_BYTES,
+            ),
+        )
+
+
+# Request plans per input model; generated functions of the same schema and
+# metadata share one model, and so one plan
+_request_plans: WeakKeyDictionary[Any, RequestPlan] = WeakKeyDictionary()
+
+
+def get_request_plan(fn: Callable, metadata: dict[str, Any]) -> RequestPlan:
+    """Get the compiled request plan of a generated function."""
+    model = fn.model
+    plan = _request_plans.get(model)
+    if plan is None or (plan.metadata is not metadata and plan.metadata != metadata):
+        plan = RequestPlan(metadata, list(model.model_fields))
+        _request_plans[model] = plan
+    return plan
+
+
 def translate_fn_to_endpoint(
     metadata: dict[str, Any],
     connection: Any | None,
     fn: Callable,
     model_instance: BaseModel,
+    response_fields: list[str] | None = None,
+    max_response_bytes: int | None = None,
 ) -> EndpointConfig:
     """
     Translate a function to an EndpointConfig object based on the function's model metadata.
@@ -110,6 +339,8 @@ def translate_fn_to_endpoint(
         connection: Connection object
         fn: Generated function from schema_to_func
         model_instance: Validated model instance containing the runtime values
+        response_fields: Dotted JSON paths to keep from the response
+        max_response_bytes: Body bytes to read at most
 
     Returns:
         EndpointConfig configured based on the function's model metadata
@@ -117,147 +348,99 @@ def translate_fn_to_endpoint(
     if not hasattr(fn, "model"):
         raise ValueError("Function must have a model attribute")
 
-    model = fn.model
-    fields = model.model_fields
-
-    # Get runtime values from the validated model instance
-    runtime_values = model_instance.model_dump()
-
-    # Initialize parameter containers
-    headers: dict[str, str] = {}
-    params: dict[str, Any] = {}
-    body: dict[str, Any] = {}
-    cookies: dict[str, str] = {}
-    path_params: dict[str, str] = {}
-
-    # Extract base path and method from metadata
     base_url = connection.base_url if connection else ""
     if not base_url and metadata.get("app_id") == "github":
         base_url = "https://api.github.com"
-    path = metadata.get("path", "")
-    method = metadata.get("method", "GET")
-
-    # Get values from the function attributes
-    for field_name, _ in fields.items():
-        # Get parameter metadata
-        param_meta = metadata.get(field_name, {})
-        is_parameter = (
-            isinstance(param_meta, dict)
-            and "type" in param_meta
-            and param_meta["type"] == "parameter"
-        )
-        param_in = param_meta.get("in") if isinstance(param_meta, dict) else None
-        param_name = (
-            param_meta.get("name", field_name)
-            if isinstance(param_meta, dict)
-            else field_name
-        )
-
-        # Get value from runtime values
-        value = runtime_values.get(field_name)
-
-        # Skip if no value
-        # if value is None:
-        #     continue
 
-        print(f"Processing {param_name} with value {value}")
-        # Handle parameters based on their location
-        if is_parameter and param_in:
-            if param_in == "query":
-                params[param_name] = value
-            elif param_in == "header" and isinstance(value, str):
-                headers[param_name] = value
-            elif param_in == "path":
-                path_params[param_name] = str(value)
-            elif param_in == "cookie":
-                cookies[param_name] = str(value)
-        else:
-            print(f"Treating {param_name} as body")
-            # If not explicitly a parameter or no location specified, treat as body
-            body[param_name] = value
-
-    # Apply path parameters
-    if path_params:
-        for name, value in path_params.items():
-            path = path.replace(f"{{{name}}}", value)
-
-    # Ensure the URL is properly constructed
-    full_url = urljoin(base_url.rstrip("/") + "/", path.lstrip("/"))
-
-    # Add cookies to headers if any
-    if cookies:
-        cookie_str = "; ".join(f"{k}={v}" for k, v in cookies.items())
-        headers["Cookie"] = cookie_str
-
-    return EndpointConfig(
-        url=full_url,
-        method=method,
-        headers=headers if headers else None,
-        params=params if params else None,
-        body=body if body else None,
-        timeout=30.0,
+    return get_request_plan(fn, metadata).fill(
+        model_instance.model_dump(), base_url, response_fields, max_response_bytes
     )
 
 
 async def execute_dynamic_function(
     model_instance: BaseModel,
     dynamic_function: Callable,
-) -> dict[str, Any]:
-    """Execute the dynamic function with proper error handling"""
+    response_fields: list[str] | None = None,
+    max_response_bytes: int | None = None,
+) -> APIResponse:
+    """
+    Execute the dynamic function with proper error handling.
+
+    Requests that fail, e.g. by timing out, return an APIResponse holding
+    the error rather than raising.
+    """
     metadata = model_instance.model_config.get("json_schema_extra", {})
 
     try:
-        # Get connection details if connection_id is provided
-        connection_id = metadata.get("connection_id")
-        print(f"Connection ID: {connection_id}")
-        connection = None
-        if connection_id:
-            pass
-            # with Session(engine) as session:
-            #     connection = session.get(Connection, connection_id)
-        print(f"Connection: {connection}")
-
         endpoint_config = translate_fn_to_endpoint(
             metadata=metadata,
-            connection=connection,
+            connection=None,
             fn=dynamic_function,
             model_instance=model_instance,
+            response_fields=response_fields,
+            max_response_bytes=max_response_bytes,
         )
-        # print(f"Endpoint config: {endpoint_config}")
-        # If we have a connection, add its auth configuration to headers
-        if connection_id and connection and connection.auth:
-            auth_config = connection.auth
-            print(f"Auth config: {auth_config}")
-            headers = endpoint_config.headers or {}
-
-            if auth_config.type == AuthType.TOKEN:
-                print(f"Token config: {auth_config.config}")
-                headers["Authorization"] = f"Bearer {auth_config.config['token']}"
-            elif auth_config.type == AuthType.API_KEY:
-                config = auth_config.config
-                if config["location"] == "header":
-                    headers[config["key"]] = config["value"]
-                elif config["location"] == "query":
-                    params = endpoint_config.params or {}
-                    params[config["key"]] = config["value"]
-                    endpoint_config.params = params
-            elif auth_config.type == AuthType.BASIC:
-                import base64
-
-                config = auth_config.config
-                auth_string = f"{config['username']}:{config['password']}"
-                encoded = base64.b64encode(auth_string.encode()).decode()
-                headers["Authorization"] = f"Basic {encoded}"
-
-            endpoint_config.headers = headers
+        # The connection id names the auth profile whose credentials, registered
+        # with openapi_credentials, are added to the request
+        endpoint_config.auth_profile = metadata.get("connection_id")
 
         response = await execute_endpoint(endpoint_config)
         return response
 
+    except HTTPException as e:
+        logger.warning(f"Error calling {dynamic_function.__name__}: {e.detail}")
+        return APIResponse(status_code=e.status_code, error=str(e.detail))
     except Exception as e:
-        import traceback
+        logger.exception(f"Error calling {dynamic_function.__name__}")
+        return APIResponse(status_code=500, error=str(e))
+
+
+async def execute_many(
+    fn: Callable,
+    argument_sets: list[dict[str, Any]],
+    concurrency: int | None = None,
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Call a dynamic function once per argument set, concurrently.
+
+    Calls share the pooled clients, so they are also paced by the per-host and
+    per-credential rate limits. A failed call only fails its own item.
 
-        print(f"Error during API call: {str(e)}")
-        print(f"Error type: {type(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
-        return model_instance.model_dump()
+    Args:
+        fn: Async function to call, e.g. generated by schema_to_function
+        argument_sets: Keyword arguments of each call
+        concurrency: Calls in flight at once, OPENAPI_BATCH_CONCURRENCY by default
+
+    Yields:
+        BatchItemResult: One per argument set, in the order the calls complete
+    """
+    slots = asyncio.Semaphore(concurrency or settings.OPENAPI_BATCH_CONCURRENCY)
+
+    async def run(index: int, arguments: dict[str, Any]) -> BatchItemResult:
+        async with slots:
+            try:
+                result = await fn(**arguments)
+            except Exception as e:
+                return BatchItemResult(
+                    index=index, error=getattr(e, "detail", None) or str(e)
+                )
+        if not isinstance(result, APIResponse):
+            return BatchItemResult(index=index, result=result)
+        if result.error is not None:
+            return BatchItemResult(
+                index=index, error=f"HTTP {result.status_code}: {result.error}"
+            )
+        return BatchItemResult(index=index, result=result.data)
+
+    tasks = [
+        asyncio.create_task(run(index, arguments))
+        for index, arguments in enumerate(argument_sets)
+    ]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        # Stop the calls still running if the caller stops reading
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
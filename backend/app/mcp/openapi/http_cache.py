@@ -0,0 +1,504 @@
+import asyncio
+import hashlib
+import json
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Statuses a cache may store without explicit freshness (RFC 9110 15.1)
+HEURISTICALLY_CACHEABLE = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Headers a 304 response must not overwrite in the stored response
+_NOT_UPDATED_BY_304 = {"content-length", "content-encoding", "transfer-encoding"}
+_CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since", "if-match", "range"}
+# Request headers that direct the cache rather than select a response
+_NOT_IN_CACHE_KEY = _CONDITIONAL_HEADERS | {"cache-control", "pragma"}
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    """Parse a Cache-Control header into lowercase directives and their values."""
+    directives: dict[str, str | None] = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def http_date(value: str | None) -> float | None:
+    """Parse an HTTP date into a timestamp, or None if it is missing or invalid."""
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _seconds(value: str | None) -> int | None:
+    try:
+        return max(int(value), 0) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class CachedResponse:
+    """A stored response and what is needed to judge its freshness."""
+
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    stored_at: float
+    url: str = ""
+    # Seconds the response is fresh for, counted from its age when stored
+    lifetime: float = 0.0
+    age: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def header(self, name: str) -> str | None:
+        name = name.lower()
+        return next((v for k, v in self.headers if k.lower() == name), None)
+
+    def current_age(self, now: float) -> float:
+        return self.age + max(now - self.stored_at, 0.0)
+
+    def is_fresh(self, now: float) -> bool:
+        return self.current_age(now) < self.lifetime
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        # The content is stored as received, still in its content encoding
+        return httpx.Response(
+            status_code=self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+        )
+
+    def dump(self) -> bytes:
+        meta = {
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+            "url": self.url,
+            "lifetime": self.lifetime,
+            "age": self.age,
+        }
+        return json.dumps(meta).encode() + b"\n" + self.content
+
+    @classmethod
+    def load(cls, data: bytes) -> "CachedResponse":
+        meta, _, content = data.partition(b"\n")
+        fields = json.loads(meta)
+        fields["headers"] = [tuple(header) for header in fields["headers"]]
+        return cls(content=content, **fields)
+
+
+def freshness_lifetime(
+    response: httpx.Response, heuristic_max: float
+) -> tuple[float, bool]:
+    """
+    How long a response is fresh for and whether it may be stored at all.
+
+    Explicit freshness comes from max-age, then Expires. Without it, responses
+    with a Last-Modified date get 10% of their age as heuristic freshness, up
+    to `heuristic_max` seconds. Responses without freshness are still stored
+    when they carry a validator, to be revalidated on every use.
+    """
+    directives = parse_cache_control(response.headers.get("cache-control"))
+    if "no-store" in directives:
+        return 0.0, False
+
+    has_validator = bool(
+        response.headers.get("etag") or response.headers.get("last-modified")
+    )
+    if "no-cache" in directives:
+        return 0.0, has_validator
+
+    max_age = _seconds(directives.get("max-age"))
+    if max_age is not None:
+        return float(max_age), max_age > 0 or has_validator
+
+    date = http_date(response.headers.get("date")) or time.time()
+    if "expires" in response.headers:
+        expires = http_date(response.headers["expires"])
+        lifetime = max((expires or 0) - date, 0.0)
+        return lifetime, lifetime > 0 or has_validator
+
+    if response.status_code not in HEURISTICALLY_CACHEABLE:
+        return 0.0, False
+    last_modified = http_date(response.headers.get("last-modified"))
+    if last_modified is not None:
+        lifetime = min(max(date - last_modified, 0.0) * 0.1, heuristic_max)
+        return lifetime, True
+    return 0.0, has_validator
+
+
+class _PrefixedStream(httpx.AsyncByteStream):
+    """The chunks already read from a response, then the rest of its stream."""
+
+    def __init__(
+        self,
+        chunks: list[bytes],
+        rest: AsyncIterator[bytes],
+        response: httpx.Response,
+    ):
+        self._chunks = chunks
+        self._rest = rest
+        self._response = response
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while self._chunks:
+            yield self._chunks.pop(0)
+        async for chunk in self._rest:
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._response.aclose()
+
+
+class OpenAPIResponseCache:
+    """
+    Private HTTP cache for the responses of OpenAPI GET operations.
+
+    Entries are keyed by credential scope, URL and request headers, so a
+    response is only ever served to requests made with the same credentials.
+    Recently used entries are kept in memory; entries evicted from memory spill
+    to a private temporary directory under `disk_dir`, only readable by its
+    owner, which is created on first use and deleted by close(). Both tiers
+    are bounded in bytes and evict least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int,
+        disk_bytes: int = 0,
+        disk_dir: str | Path | None = None,
+        max_entry_bytes: int = 4 * 1024 * 1024,
+        heuristic_max: float = 300.0,
+        clock: Callable[[], float] | None = None,
+    ):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes if disk_dir else 0
+        self.max_entry_bytes = max_entry_bytes
+        self.heuristic_max = heuristic_max
+        self._clock = clock or time.time
+        self._memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._memory_size = 0
+        # Key to (size, url) of the entries stored on disk
+        self._disk: OrderedDict[str, tuple[int, str]] = OrderedDict()
+        self._disk_size = 0
+        # Keys per (scope, url), to invalidate every variant of a URL
+        self._keys_by_url: dict[tuple[str, str], set[str]] = {}
+        self._scope_of: dict[str, tuple[str, str]] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stored": 0,
+            "evicted": 0,
+            "invalidated": 0,
+        }
+
+        self._disk_parent = Path(disk_dir) if disk_dir and self.disk_bytes else None
+        self._disk_dir: Path | None = None
+
+    @staticmethod
+    def cache_key(scope: str, request: httpx.Request) -> str:
+        """Key of a request's response within a credential scope."""
+        headers = sorted(
+            (name.lower(), value)
+            for name, value in request.headers.items()
+            if name.lower() not in _NOT_IN_CACHE_KEY
+        )
+        return hashlib.sha256(
+            json.dumps([scope, request.method, str(request.url), headers]).encode()
+        ).hexdigest()
+
+    def _index(self, key: str, scope: str, url: str) -> None:
+        self._keys_by_url.setdefault((scope, url), set()).add(key)
+        self._scope_of[key] = (scope, url)
+
+    def _unindex(self, key: str) -> None:
+        scope_url = self._scope_of.pop(key, None)
+        if scope_url is not None:
+            keys = self._keys_by_url.get(scope_url, set())
+            keys.discard(key)
+            if not keys:
+                self._keys_by_url.pop(scope_url, None)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """Get a stored response from either tier, moving it to memory."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if key not in self._disk or self._disk_dir is None:
+            return None
+
+        size, _ = self._disk.pop(key)
+        self._disk_size -= size
+        path = self._disk_dir / key
+        try:
+            entry = CachedResponse.load(await asyncio.to_thread(path.read_bytes))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable HTTP cache entry {key}: {e}")
+            self._unindex(key)
+            return None
+        finally:
+            path.unlink(missing_ok=True)
+        await self._put_memory(key, entry)
+        return entry
+
+    async def put(self, key: str, scope: str, entry: CachedResponse) -> None:
+        """Store a response, replacing any previous one under the key."""
+        await self.remove(key)
+        if entry.size > self.max_entry_bytes or entry.size > self.memory_bytes:
+            return
+        self._index(key, scope, entry.url)
+        await self._put_memory(key, entry)
+        self.stats["stored"] += 1
+
+    async def _put_memory(self, key: str, entry: CachedResponse) -> None:
+        self._memory[key] = entry
+        self._memory_size += entry.size
+        while self._memory_size > self.memory_bytes:
+            old_key, old_entry = self._memory.popitem(last=False)
+            self._memory_size -= old_entry.size
+            await self._spill(old_key, old_entry)
+
+    async def _spill(self, key: str, entry: CachedResponse) -> None:
+        if self._disk_parent is None or entry.size > self.disk_bytes:
+            self._unindex(key)
+            self.stats["evicted"] += 1
+            return
+        try:
+            if self._disk_dir is None:
+                # A new directory of mode 0700 with an unpredictable name
+                self._disk_parent.mkdir(parents=True, exist_ok=True)
+                self._disk_dir = Path(
+                    tempfile.mkdtemp(
+                        prefix="openapi-http-cache-", dir=self._disk_parent
+                    )
+                )
+            await asyncio.to_thread((self._disk_dir / key).write_bytes, entry.dump())
+        except OSError as e:
+            logger.warning(f"Could not spill HTTP cache entry to disk: {e}")
+            self._unindex(key)
+            return
+        self._disk[key] = (entry.size, entry.url)
+        self._disk_size += entry.size
+        while self._disk_size > self.disk_bytes:
+            old_key, (size, _) = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self._unindex(old_key)
+            (self._disk_dir / old_key).unlink(missing_ok=True)
+            self.stats["evicted"] += 1
+
+    async def remove(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_size -= entry.size
+        if key in self._disk:
+            size, _ = self._disk.pop(key)
+            self._disk_size -= size
+            if self._disk_dir is not None:
+                (self._disk_dir / key).unlink(missing_ok=True)
+        self._unindex(key)
+
+    async def invalidate(self, scope: str, url: str) -> None:
+        """Drop every stored response for a URL within a credential scope."""
+        for key in list(self._keys_by_url.get((scope, url), ())):
+            await self.remove(key)
+            self.stats["invalidated"] += 1
+
+    def close(self) -> None:
+        """Drop every stored response and delete the disk tier's directory."""
+        self._memory.clear()
+        self._memory_size = 0
+        self._disk.clear()
+        self._disk_size = 0
+        self._keys_by_url.clear()
+        self._scope_of.clear()
+        if self._disk_dir is not None:
+            shutil.rmtree(self._disk_dir, ignore_errors=True)
+            self._disk_dir = None
+
+    def usage(self) -> dict[str, Any]:
+        """Entries and bytes held by each tier, with the hit counters."""
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_size,
+            **self.stats,
+        }
+
+    async def handle(
+        self,
+        scope: str,
+        request: httpx.Request,
+        send: Callable[[httpx.Request], Any],
+    ) -> httpx.Response:
+        """
+        Answer a request from the cache where possible, otherwise send it.
+
+        Fresh responses are served without a request. Stale responses with a
+        validator are revalidated with a conditional request, and a 304 answer
+        refreshes and serves them. Successful unsafe requests invalidate the
+        responses stored for their URL.
+        """
+        if request.method in UNSAFE_METHODS:
+            response = await send(request)
+            if response.status_code < 400:
+                await self.invalidate(scope, str(request.url))
+            return response
+
+        request_directives = parse_cache_control(request.headers.get("cache-control"))
+        if (
+            request.method != "GET"
+            or "no-store" in request_directives
+            or any(name in request.headers for name in _CONDITIONAL_HEADERS)
+        ):
+            return await send(request)
+
+        key = self.cache_key(scope, request)
+        entry = await self.get(key)
+        now = self._clock()
+        force_revalidate = (
+            "no-cache" in request_directives
+            or request_directives.get("max-age") == "0"
+            or request.headers.get("pragma", "").lower() == "no-cache"
+        )
+        if entry is not None and not force_revalidate and entry.is_fresh(now):
+            self.stats["hits"] += 1
+            return entry.to_response(request)
+
+        if entry is not None:
+            if entry.header("etag"):
+                request.headers["If-None-Match"] = entry.header("etag")
+            if entry.header("last-modified"):
+                request.headers["If-Modified-Since"] = entry.header("last-modified")
+
+        response = await send(request)
+        received_at = self._clock()
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            self.stats["revalidated"] += 1
+            updated = {name.lower() for name, _ in response.headers.items()}
+            headers = [
+                (name, value)
+                for name, value in entry.headers
+                if name.lower() not in updated
+            ] + [
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in _NOT_UPDATED_BY_304
+            ]
+            refreshed = httpx.Response(entry.status_code, headers=headers)
+            lifetime, _ = freshness_lifetime(refreshed, self.heuristic_max)
+            entry.headers = headers
+            entry.stored_at = received_at
+            entry.age = float(_seconds(response.headers.get("age")) or 0)
+            entry.lifetime = lifetime
+            return entry.to_response(request)
+
+        self.stats["misses"] += 1
+        lifetime, storable = freshness_lifetime(response, self.heuristic_max)
+        content_length = _seconds(response.headers.get("content-length"))
+        if (
+            not storable
+            or response.status_code not in HEURISTICALLY_CACHEABLE
+            or (content_length or 0) > self.max_entry_bytes
+        ):
+            if entry is not None:
+                await self.remove(key)
+            return response
+
+        # Raw bytes, as the response was not decoded by a client yet. Chunked
+        # responses have no Content-Length, so the size is also counted as the
+        # stream is read, and past max_entry_bytes the rest is passed through
+        chunks: list[bytes] = []
+        size = 0
+        stream = aiter(response.stream)
+        try:
+            while size <= self.max_entry_bytes:
+                try:
+                    chunk = await anext(stream)
+                except StopAsyncIteration:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+        except BaseException:
+            await response.aclose()
+            raise
+
+        if size > self.max_entry_bytes:
+            if entry is not None:
+                await self.remove(key)
+            return httpx.Response(
+                status_code=response.status_code,
+                headers=response.headers,
+                stream=_PrefixedStream(chunks, stream, response),
+                request=request,
+                extensions=response.extensions,
+            )
+
+        await response.aclose()
+        entry = CachedResponse(
+            status_code=response.status_code,
+            headers=list(response.headers.multi_items()),
+            content=b"".join(chunks),
+            stored_at=received_at,
+            url=str(request.url),
+            lifetime=lifetime,
+            age=float(_seconds(response.headers.get("age")) or 0),
+        )
+        await self.put(key, scope, entry)
+        return entry.to_response(request)
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """An httpx transport that answers requests through an OpenAPIResponseCache."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        cache: OpenAPIResponseCache,
+        scope: str,
+    ):
+        self._transport = transport
+        self._cache = cache
+        self._scope = scope
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._cache.handle(
+            self._scope, request, self._transport.handle_async_request
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+openapi_response_cache = OpenAPIResponseCache(
+    memory_bytes=settings.OPENAPI_HTTP_CACHE_MEMORY_BYTES,
+    disk_bytes=settings.OPENAPI_HTTP_CACHE_DISK_BYTES,
+    disk_dir=settings.OPENAPI_HTTP_CACHE_DIR or tempfile.gettempdir(),
+    max_entry_bytes=settings.OPENAPI_HTTP_CACHE_MAX_ENTRY_BYTES,
+    heuristic_max=settings.OPENAPI_HTTP_CACHE_HEURISTIC_MAX,
+)
@@ -0,0 +1,193 @@
+import json
+import re
+from typing import Any
+
+# Characters that open, close or separate JSON values, and string delimiters
+_STRUCTURE = re.compile(r'[\[\]{},"]')
+_STRING_END = re.compile(r'["\\]')
+_WHITESPACE = " \t\r\n"
+
+
+def projection(fields: list[str] | None) -> dict[str, Any]:
+    """
+    Tree of the dotted JSON paths to keep, e.g. ["user.login", "id"] becomes
+    {"user": {"login": {}}, "id": {}}. An empty tree keeps everything.
+    """
+    tree: dict[str, Any] = {}
+    for path in fields or []:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def project(value: Any, tree: dict[str, Any]) -> Any:
+    """Keep only the paths of a projection tree, through objects and arrays."""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], tree[key]) for key in tree if key in value}
+    return value
+
+
+class JSONStream:
+    """
+    Incremental decoder of a JSON document fed as text chunks.
+
+    The items of a top-level array, or the members of a top-level object, are
+    decoded and projected as soon as they are complete, and their text is
+    dropped, so a document is not held as text and as values at once. Array
+    members of a top-level object, such as the items of a
+    {"total_count": ..., "items": [...]} envelope, are decoded item by item
+    too. If the input stops early, the value holds the complete items or
+    members read so far. Documents that are not an array or an object are
+    decoded at the end, and their text is the value if they are not JSON.
+    """
+
+    def __init__(self, fields: list[str] | None = None):
+        self.tree = projection(fields)
+        self._buffer = ""
+        # Where scanning resumes and where the current item starts in the buffer
+        self._scan = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._container: str | None = None
+        self._value: Any = None
+        # Key of the array member of a top-level object being read item by item
+        self._member: str | None = None
+        self.complete = False
+
+    def feed(self, text: str) -> None:
+        """
+        Add the next chunk of the document.
+
+        Raises:
+            ValueError: If an item of a top-level array or object is not JSON
+        """
+        self._buffer += text
+        if self._container is None:
+            stripped = self._buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                return
+            if stripped[0] not in "[{":
+                self._container = ""
+                return
+            self._container = stripped[0]
+            self._value = [] if self._container == "[" else {}
+            self._buffer = stripped[1:]
+            self._depth = 1
+        if self._container and not self.complete:
+            self._scan_items()
+
+    def _scan_items(self) -> None:
+        buffer = self._buffer
+        position = self._scan
+        while True:
+            if self._in_string:
+                match = _STRING_END.search(buffer, position)
+                if match is None:
+                    position = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # The escaped character is in the next chunk
+                        position = match.start()
+                        break
+                    position = match.end() + 1
+                    continue
+                self._in_string = False
+                position = match.end()
+                continue
+
+            match = _STRUCTURE.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+            char = match.group()
+            position = match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                if self._depth == 2 and char == "[" and self._container == "{":
+                    self._open_member(buffer[self._start : match.start()])
+                    self._start = position
+            elif char in "]}":
+                self._depth -= 1
+            if self._member is not None and self._depth == 2 and char == ",":
+                self._add_member_item(buffer[self._start : match.start()])
+                self._start = position
+            elif self._member is not None and self._depth == 1:
+                self._add_member_item(buffer[self._start : match.start()])
+                self._member = None
+                self._start = position
+            elif self._depth == 1 and char == ",":
+                self._add(buffer[self._start : match.start()])
+                self._start = position
+            elif self._depth == 0:
+                self._add(buffer[self._start : match.start()])
+                self.complete = True
+                break
+
+        # Drop the text of the items already decoded
+        self._buffer = buffer[self._start :]
+        self._scan = position - self._start
+        self._start = 0
+
+    @staticmethod
+    def _split_member(text: str) -> tuple[str, str]:
+        """The key of an object member and the text of its value."""
+        if not text.startswith('"'):
+            raise ValueError(f"Expected an object key, got {text[:40]!r}")
+        key, end = json.decoder.scanstring(text, 1)
+        value_text = text[end:].lstrip(_WHITESPACE)
+        if not value_text.startswith(":"):
+            raise ValueError(f"Expected ':' after object key {key!r}")
+        return key, value_text[1:]
+
+    def _open_member(self, text: str) -> None:
+        key, value_text = self._split_member(text.strip(_WHITESPACE))
+        if value_text.strip(_WHITESPACE):
+            raise ValueError(f"Unexpected {value_text[:40]!r} in object member {key!r}")
+        self._member = key
+        if not self.tree or key in self.tree:
+            self._value[key] = []
+
+    def _add_member_item(self, text: str) -> None:
+        text = text.strip(_WHITESPACE)
+        if text and self._member in self._value:
+            tree = self.tree.get(self._member, {})
+            self._value[self._member].append(project(json.loads(text), tree))
+
+    def _add(self, text: str) -> None:
+        text = text.strip(_WHITESPACE)
+        if not text:
+            return
+        if self._container == "[":
+            self._value.append(project(json.loads(text), self.tree))
+            return
+        key, value_text = self._split_member(text)
+        if not self.tree:
+            self._value[key] = json.loads(value_text)
+        elif key in self.tree:
+            self._value[key] = project(json.loads(value_text), self.tree[key])
+
+    def close(self, partial: bool = False) -> Any:
+        """
+        The decoded document, or with `partial` what could be decoded of it.
+
+        Raises:
+            ValueError: If a top-level array or object is invalid or, without
+                `partial`, unterminated
+        """
+        if self._container:
+            if not self.complete and not partial:
+                raise ValueError("Unterminated JSON document")
+            return self._value
+        try:
+            return project(json.loads(self._buffer), self.tree)
+        except json.JSONDecodeError:
+            return self._buffer or None
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import re
+from collections.abc import AsyncIterator
+from typing import Any
+from urllib.parse import urljoin, urlsplit
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.executor import APIResponse, EndpointConfig, execute_endpoint
+
+logger = get_logger(__name__)
+
+# Query parameter names that select the page of a list operation
+CURSOR_PARAMS = (
+    "cursor",
+    "after",
+    "starting_after",
+    "page_token",
+    "pageToken",
+    "next_token",
+    "continuation_token",
+    "marker",
+)
+PAGE_PARAMS = ("page", "page_number", "pageNumber")
+OFFSET_PARAMS = ("offset", "skip", "start")
+SIZE_PARAMS = (
+    "per_page",
+    "page_size",
+    "pageSize",
+    "limit",
+    "size",
+    "max_results",
+    "maxResults",
+)
+# Response fields holding the cursor or URL of the next page, at the top level
+# or inside one of the ENVELOPE_FIELDS
+NEXT_CURSOR_FIELDS = (
+    "next_cursor",
+    "nextCursor",
+    "next_page_token",
+    "nextPageToken",
+    "next_token",
+    "nextToken",
+)
+NEXT_URL_FIELDS = ("next", "next_url", "nextUrl", "@odata.nextLink")
+ENVELOPE_FIELDS = ("meta", "pagination", "response_metadata", "links", "paging")
+ITEM_FIELDS = ("items", "data", "results", "values", "records", "value", "entries")
+
+_LINK_NEXT = re.compile(r'<([^>]*)>\s*;[^,]*\brel="?[^",]*\bnext\b')
+
+
+def next_link(headers: dict[str, str]) -> str | None:
+    """The URL of the rel="next" entry of a Link header."""
+    link = next((v for k, v in headers.items() if k.lower() == "link"), None)
+    match = _LINK_NEXT.search(link or "")
+    return match.group(1) if match else None
+
+
+def extract_items(data: Any) -> list[Any]:
+    """The items of a page: the page itself, or the list field of its envelope."""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return []
+    for name in ITEM_FIELDS:
+        if isinstance(data.get(name), list):
+            return data[name]
+    lists = [value for value in data.values() if isinstance(value, list)]
+    return lists[0] if len(lists) == 1 else []
+
+
+def _find_field(data: Any, names: tuple[str, ...]) -> Any:
+    if not isinstance(data, dict):
+        return None
+    for scope in (data, *(data.get(name) for name in ENVELOPE_FIELDS)):
+        if isinstance(scope, dict):
+            for name in names:
+                if scope.get(name) not in (None, ""):
+                    return scope[name]
+    return None
+
+
+def query_parameters(metadata: dict[str, Any]) -> set[str]:
+    """Names of the query parameters declared in an operation's metadata."""
+    return {
+        meta.get("name", field_name)
+        for field_name, meta in metadata.items()
+        if isinstance(meta, dict) and meta.get("in") == "query"
+    }
+
+
+class Paginator:
+    """
+    Iterates over the items of every page of a list operation.
+
+    The pagination style is detected from the response and the operation's
+    query parameters, in this order: a Link header with rel="next", a next
+    page URL or cursor field in the body, then cursor, page or offset query
+    parameters. The next page is requested while the items of the current
+    one are consumed. Iteration stops at the last page or at the item, byte
+    or page caps, which set `truncated` if more items were left. Next page
+    URLs on another scheme or host are not followed and also set `truncated`.
+
+    Raises:
+        HTTPException: When a page cannot be fetched or has an error status
+    """
+
+    def __init__(
+        self,
+        config: EndpointConfig,
+        metadata: dict[str, Any] | None = None,
+        max_items: int | None = None,
+        max_bytes: int | None = None,
+        max_pages: int | None = None,
+    ):
+        self.config = config
+        self.parameters = query_parameters(metadata or {})
+        # Callers may lower the caps, never raise them
+        self.max_items = min(
+            max_items or settings.OPENAPI_PAGINATION_MAX_ITEMS,
+            settings.OPENAPI_PAGINATION_MAX_ITEMS,
+        )
+        self.max_bytes = min(
+            max_bytes or settings.OPENAPI_PAGINATION_MAX_BYTES,
+            settings.OPENAPI_PAGINATION_MAX_BYTES,
+        )
+        self.max_pages = min(
+            max_pages or settings.OPENAPI_PAGINATION_MAX_PAGES,
+            settings.OPENAPI_PAGINATION_MAX_PAGES,
+        )
+        self.style: str | None = None
+        self.pages = 0
+        self.items = 0
+        self.bytes = 0
+        self.truncated = False
+
+    def _param(self, candidates: tuple[str, ...]) -> str | None:
+        params = self.config.params or {}
+        return next(
+            (name for name in candidates if name in self.parameters or name in params),
+            None,
+        )
+
+    def next_request(
+        self, request: EndpointConfig, response: APIResponse, items: list[Any]
+    ) -> EndpointConfig | None:
+        """The request of the page after `response`, or None on the last page."""
+        url = next_link(response.headers)
+        if url is None and isinstance(
+            (next_url := _find_field(response.data, NEXT_URL_FIELDS)), str
+        ):
+            url = next_url
+        if url is not None:
+            url = urljoin(request.url, url)
+            target, origin = urlsplit(url), urlsplit(self.config.url)
+            if (target.scheme, target.netloc) != (origin.scheme, origin.netloc):
+                # The request's credentials must not be sent to another host
+                logger.warning(
+                    f"Not following next page {url} of {self.config.url}: "
+                    "different origin"
+                )
+                self.truncated = True
+                return None
+            self.style = self.style or "link"
+            return request.model_copy(update={"url": url, "params": None})
+
+        has_more = (
+            response.data.get("has_more") if isinstance(response.data, dict) else None
+        )
+        if has_more is False:
+            return None
+        params = dict(request.params or {})
+        cursor = _find_field(response.data, NEXT_CURSOR_FIELDS)
+        cursor_param = self._param(CURSOR_PARAMS)
+        if cursor is not None:
+            self.style = self.style or "cursor"
+            params[cursor_param or "cursor"] = cursor
+            return request.model_copy(update={"params": params})
+        if cursor_param == "starting_after" and items and isinstance(items[-1], dict):
+            # Stripe-style: the id of the last item is the cursor
+            if "id" in items[-1] and has_more:
+                self.style = self.style or "cursor"
+                params[cursor_param] = items[-1]["id"]
+                return request.model_copy(update={"params": params})
+            return None
+
+        size_param = self._param(SIZE_PARAMS)
+        page_size = params.get(size_param) if size_param else None
+        if not items or (isinstance(page_size, int) and len(items) < page_size):
+            return None
+        if page_param := self._param(PAGE_PARAMS):
+            self.style = self.style or "page"
+            params[page_param] = int(params.get(page_param) or 1) + 1
+            return request.model_copy(update={"params": params})
+        if offset_param := self._param(OFFSET_PARAMS):
+            self.style = self.style or "offset"
+            params[offset_param] = int(params.get(offset_param) or 0) + len(items)
+            return request.model_copy(update={"params": params})
+        return None
+
+    async def _fetch(self, request: EndpointConfig) -> APIResponse:
+        response = await execute_endpoint(request)
+        if response.error is not None:
+            raise HTTPException(status_code=response.status_code, detail=response.error)
+        return response
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        request: EndpointConfig | None = self.config
+        prefetch = asyncio.create_task(self._fetch(request))
+        seen: set[str] = set()
+        try:
+            while prefetch is not None:
+                response = await prefetch
+                prefetch = None
+                self.pages += 1
+                seen.add(json.dumps([request.url, request.params], default=str))
+
+                items = extract_items(response.data)
+                request = self.next_request(request, response, items)
+                if response.truncated:
+                    # Items past the page's byte cap were cut off
+                    self.truncated, request = True, None
+                if request is not None and (
+                    self.pages >= self.max_pages
+                    or json.dumps([request.url, request.params], default=str) in seen
+                ):
+                    self.truncated = self.pages >= self.max_pages
+                    request = None
+                if request is not None:
+                    prefetch = asyncio.create_task(self._fetch(request))
+
+                for index, item in enumerate(items):
+                    size = len(json.dumps(item, default=str))
+                    if self.items >= self.max_items or (
+                        self.items and self.bytes + size > self.max_bytes
+                    ):
+                        self.truncated = True
+                        return
+                    self.items += 1
+                    self.bytes += size
+                    yield item
+                    if index == len(items) - 1 and self.items >= self.max_items:
+                        self.truncated = self.truncated or prefetch is not None
+                        return
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
+                await asyncio.gather(prefetch, return_exceptions=True)
+            logger.info(
+                f"Paginated {self.config.url} ({self.style or 'single page'}): "
+                f"{self.items} items from {self.pages} pages"
+                + (", truncated" if self.truncated else "")
+            )
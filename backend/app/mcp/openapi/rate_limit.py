@@ -0,0 +1,279 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.http_cache import http_date
+
+logger = get_logger(__name__)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+# Reset values above this are epoch timestamps rather than seconds from now
+_EPOCH_THRESHOLD = 1_000_000_000
+# Share of a quota left below which requests are spread until it resets
+QUOTA_PACING_FRACTION = 0.2
+
+
+def retry_after(headers: httpx.Headers, now: float) -> float | None:
+    """Seconds to wait according to a Retry-After header, in seconds or a date."""
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        date = http_date(value)
+        return max(date - now, 0.0) if date is not None else None
+
+
+def rate_limit_window(
+    headers: httpx.Headers, now: float
+) -> tuple[int | None, int, float] | None:
+    """
+    Quota size, requests left and seconds until the quota resets, from rate
+    limit headers.
+
+    Reads X-RateLimit-* as well as the RateLimit-* fields of the IETF draft.
+    Resets may be given as epoch timestamps or as seconds from now.
+    """
+    for prefix in ("x-ratelimit-", "ratelimit-"):
+        remaining = headers.get(f"{prefix}remaining")
+        reset = headers.get(f"{prefix}reset")
+        if remaining is None or reset is None:
+            continue
+        try:
+            remaining_count, reset_value = int(remaining), float(reset)
+            limit = headers.get(f"{prefix}limit")
+            limit_count = int(limit.split(",")[0].split(";")[0]) if limit else None
+        except ValueError:
+            return None
+        if reset_value > _EPOCH_THRESHOLD:
+            reset_value -= now
+        return limit_count, max(remaining_count, 0), max(reset_value, 0.0)
+    return None
+
+
+class TokenBucket:
+    """
+    Paces requests to a steady rate with bursts of up to `burst` requests.
+
+    Callers reserve a token and wait for it, so waiting requests go out in
+    the order they reserved. A rate of 0 only applies pauses and the rate
+    learned from the upstream's rate limit headers.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float]):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self.paused_until = 0.0
+        # Rate that spreads the remaining quota until it resets
+        self.quota_rate: float | None = None
+        self.quota_until = 0.0
+
+    def _effective_rate(self, now: float) -> float:
+        if self.quota_rate is not None and now < self.quota_until:
+            return min(self.rate, self.quota_rate) if self.rate > 0 else self.quota_rate
+        return self.rate
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        now = self._clock()
+        wait = max(self.paused_until - now, 0.0)
+        rate = self._effective_rate(now)
+        if rate <= 0:
+            return wait
+
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._tokens + elapsed * rate, float(self.burst)) - 1
+        if self._tokens < 0:
+            wait = max(wait, -self._tokens / rate)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for `seconds`, e.g. after a Retry-After."""
+        self.paused_until = max(self.paused_until, self._clock() + seconds)
+
+    def limit_quota(self, limit: int | None, remaining: int, reset_in: float) -> None:
+        """
+        Apply the state of an upstream quota.
+
+        An exhausted quota pauses requests until it resets. Once less than
+        QUOTA_PACING_FRACTION of it is left, the remaining requests are spread
+        evenly until the reset instead of being spent in a burst.
+        """
+        if remaining == 0:
+            self.pause(reset_in)
+        elif limit is None or remaining < limit * QUOTA_PACING_FRACTION:
+            now = self._clock()
+            if self.quota_rate is None:
+                # Start spreading from now, without a burst
+                self._tokens = min(self._tokens, 1.0)
+                self._updated = now
+            self.quota_rate = remaining / reset_in if reset_in > 0 else None
+            self.quota_until = now + reset_in
+        else:
+            self.quota_rate = None
+
+
+class RateLimiter:
+    """
+    Rate limit state of upstream APIs, per host and per credential scope.
+
+    Requests wait for a token from the bucket of their host and from the
+    bucket of their host and credentials. Rate limit headers and Retry-After
+    answers adjust the buckets, so requests slow down before an API starts
+    refusing them. Idempotent requests refused with 429 or 5xx overload
+    statuses are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        host_rate: float = 0.0,
+        host_burst: int = 10,
+        credential_rate: float = 0.0,
+        credential_burst: int = 10,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_delay: float = 30.0,
+        clock: Callable[[], float] | None = None,
+        sleep: Callable[[float], Awaitable[Any]] | None = None,
+    ):
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.credential_rate = credential_rate
+        self.credential_burst = credential_burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self._clock = clock or time.time
+        self._sleep = sleep or asyncio.sleep
+        self._hosts: dict[str, TokenBucket] = {}
+        self._credentials: dict[tuple[str, str], TokenBucket] = {}
+        self.stats: dict[str, dict[str, float]] = {}
+
+    def _buckets(self, host: str, scope: str) -> tuple[TokenBucket, TokenBucket]:
+        if host not in self._hosts:
+            self._hosts[host] = TokenBucket(
+                self.host_rate, self.host_burst, self._clock
+            )
+            self.stats[host] = {"requests": 0, "retries": 0, "throttled_seconds": 0.0}
+        if (host, scope) not in self._credentials:
+            self._credentials[(host, scope)] = TokenBucket(
+                self.credential_rate, self.credential_burst, self._clock
+            )
+        return self._hosts[host], self._credentials[(host, scope)]
+
+    def observe(self, host: str, scope: str, response: httpx.Response) -> None:
+        """Update the buckets from the rate limit headers of a response."""
+        host_bucket, credential_bucket = self._buckets(host, scope)
+        now = self._clock()
+        window = rate_limit_window(response.headers, now)
+        if window is not None:
+            credential_bucket.limit_quota(*window)
+
+        delay = retry_after(response.headers, now)
+        if delay is not None and response.status_code in RETRY_STATUSES:
+            # 429 is about these credentials, the other statuses about the host
+            bucket = credential_bucket if response.status_code == 429 else host_bucket
+            bucket.pause(min(delay, self.max_delay))
+
+    def backoff_delay(self, attempt: int, response: httpx.Response | None) -> float:
+        """Retry-After when given, otherwise full-jitter exponential backoff."""
+        if response is not None:
+            delay = retry_after(response.headers, self._clock())
+            if delay is not None:
+                return delay
+        return random.uniform(0, min(self.max_delay, self.backoff * 2**attempt))
+
+    async def send(
+        self,
+        scope: str,
+        request: httpx.Request,
+        send: Callable[[httpx.Request], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Send a request once its buckets allow it, retrying where safe."""
+        host = urlparse(str(request.url)).netloc
+        host_bucket, credential_bucket = self._buckets(host, scope)
+        stats = self.stats[host]
+        retryable = request.method in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            wait = max(host_bucket.reserve(), credential_bucket.reserve())
+            if wait > 0:
+                stats["throttled_seconds"] += wait
+                await self._sleep(wait)
+
+            stats["requests"] += 1
+            try:
+                response = await send(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt, None)
+                logger.warning(f"Retrying {request.method} {host} in {delay:.2f}s: {e}")
+            else:
+                self.observe(host, scope, response)
+                if (
+                    not retryable
+                    or response.status_code not in RETRY_STATUSES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                delay = self.backoff_delay(attempt, response)
+                if delay > self.max_delay:
+                    return response
+                await response.aclose()
+                logger.warning(
+                    f"Retrying {request.method} {host} in {delay:.2f}s after "
+                    f"HTTP {response.status_code}"
+                )
+
+            attempt += 1
+            stats["retries"] += 1
+            await self._sleep(delay)
+
+    def usage(self) -> list[dict[str, Any]]:
+        """Requests, retries and time spent waiting for tokens, per host."""
+        return [{"host": host, **stats} for host, stats in self.stats.items()]
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """An httpx transport that sends requests through a RateLimiter."""
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, limiter: RateLimiter, scope: str
+    ):
+        self._transport = transport
+        self._limiter = limiter
+        self._scope = scope
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._limiter.send(
+            self._scope, request, self._transport.handle_async_request
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+openapi_rate_limiter = RateLimiter(
+    host_rate=settings.OPENAPI_RATE_LIMIT_HOST_RPS,
+    host_burst=settings.OPENAPI_RATE_LIMIT_HOST_BURST,
+    credential_rate=settings.OPENAPI_RATE_LIMIT_CREDENTIAL_RPS,
+    credential_burst=settings.OPENAPI_RATE_LIMIT_CREDENTIAL_BURST,
+    max_retries=settings.OPENAPI_RETRY_ATTEMPTS,
+    backoff=settings.OPENAPI_RETRY_BACKOFF,
+    max_delay=settings.OPENAPI_RETRY_MAX_DELAY,
+)
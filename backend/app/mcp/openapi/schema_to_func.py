@@ -1,11 +1,56 @@
+import hashlib
+import json
 from collections.abc import Callable
 from inspect import Parameter, Signature
-from typing import Any, Union, get_type_hints
+from typing import Any, Union
 
 from pydantic import BaseModel, ConfigDict, Field, create_model
 from pydantic.fields import PydanticUndefined
 
-from .executor import execute_dynamic_function
+from app.core.config import settings
+from app.mcp.utils import LRUCache
+
+from .executor import execute_dynamic_function, response_options
+
+# Compiled input models and signatures keyed by the hash of their schema, so
+# operations repeated across specs, servers and reloads are built only once.
+# Both caches are bounded, as every spec loaded in the process adds to them
+_function_cache: LRUCache = LRUCache(settings.OPENAPI_MODEL_CACHE_SIZE)
+# Nested object models keyed by schema hash, shared across operations
+_nested_model_cache: LRUCache = LRUCache(settings.OPENAPI_MODEL_CACHE_SIZE)
+
+
+def _schema_hash(value: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class LazyModel:
+    """
+    Stands in for the input model of a generated function until it is first used.
+
+    Calling it or reading any model attribute builds the Pydantic model once.
+    """
+
+    def __init__(self, build: Callable[[], type[BaseModel]]):
+        self._build = build
+        self._model: type[BaseModel] | None = None
+
+    @property
+    def compiled(self) -> bool:
+        return self._model is not None
+
+    def resolve(self) -> type[BaseModel]:
+        if self._model is None:
+            self._model = self._build()
+        return self._model
+
+    def __call__(self, *args: Any, **kwargs: Any) -> BaseModel:
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
 
 
 def _create_parameter(
@@ -56,6 +101,35 @@ def schema_to_function(
     metadata = metadata or {}
     config = config or {}
 
+    key = _schema_hash({"schema": schema, "metadata": metadata, "config": config})
+    if key not in _function_cache:
+        _function_cache[key] = _compile_schema(schema, metadata, config)
+    parameters, model = _function_cache[key]
+    options = response_options({p.name for p in parameters})
+    parameters = [*parameters, *options]
+
+    # Create dynamic function
+    async def dynamic_function(**kwargs):
+        """Dynamic function generated from schema."""
+        response = {o.name: kwargs.pop(o.name) for o in options if o.name in kwargs}
+        validated = model(**kwargs)
+        return await execute_dynamic_function(validated, dynamic_function, **response)
+
+    # Add metadata to function
+    dynamic_function.__signature__ = Signature(parameters=parameters)
+    dynamic_function.__annotations__ = {p.name: p.annotation for p in parameters}
+    dynamic_function.__name__ = schema.get("name", "dynamic_function")
+    dynamic_function.__doc__ = schema.get("description", "")
+    dynamic_function.model = model
+    dynamic_function.response_options = [o.name for o in options]
+
+    return dynamic_function
+
+
+def _compile_schema(
+    schema: dict[str, Any], metadata: dict[str, Any], config: dict[str, Any]
+) -> tuple[list[Parameter], LazyModel]:
+    """Build the signature of a schema's function and its not yet compiled input model."""
     # Extract properties and required fields based on schema structure
     if "parameters" in schema and isinstance(schema["parameters"], dict):
         properties = schema["parameters"].get("properties", {})
@@ -71,48 +145,27 @@ def schema_to_function(
         field_type, default_value = _get_type(prop, name, required)
         fields[name] = (field_type, _create_field(prop, is_required, default_value))
 
-    # Create Pydantic model
-    model_name = schema.get("name", "DynamicModel")
-    InputModel = create_model(
-        model_name,
-        __base__=BaseModel,
-        __module__=__name__,
-        model_config=ConfigDict(
-            arbitrary_types_allowed=True,
-            extra="allow" if schema.get("additionalProperties", True) else "forbid",
-            json_schema_extra={**metadata, **config},
-        ),
-        **fields,
-    )
-
     # Create function parameters
     parameters = [
-        _create_parameter(
-            name, properties[name], get_type_hints(InputModel)[name], name in required
-        )
+        _create_parameter(name, properties[name], fields[name][0], name in required)
         for name in fields
     ]
 
-    # Create dynamic function
-    async def dynamic_function(**kwargs):
-        """Dynamic function generated from schema."""
-        validated = InputModel(**kwargs)
-        print("Input is ", validated)
-        return await execute_dynamic_function(validated, dynamic_function)
-
-    # Add metadata to function
-    dynamic_function.__signature__ = Signature(parameters=parameters)
-    dynamic_function.__annotations__ = {p.name: p.annotation for p in parameters}
-    dynamic_function.__name__ = schema.get("name", "dynamic_function")
-    dynamic_function.__doc__ = schema.get("description", "")
-    dynamic_function.model = InputModel
-    print("Signature: ", dynamic_function.__signature__)
-    print("Annotations: ", dynamic_function.__annotations__)
-    print("Name: ", dynamic_function.__name__)
-    print("Doc: ", dynamic_function.__doc__)
-    # print("Model: ", dynamic_function.model.model_json_schema())
+    # The Pydantic model is only needed once the function is called
+    def build_model() -> type[BaseModel]:
+        return create_model(
+            schema.get("name", "DynamicModel"),
+            __base__=BaseModel,
+            __module__=__name__,
+            model_config=ConfigDict(
+                arbitrary_types_allowed=True,
+                extra="allow" if schema.get("additionalProperties", True) else "forbid",
+                json_schema_extra={**metadata, **config},
+            ),
+            **fields,
+        )
 
-    return dynamic_function
+    return parameters, LazyModel(build_model)
 
 
 def _create_field(schema: dict[str, Any], required: bool, default: Any = None) -> Field:
@@ -196,6 +249,10 @@ def _get_type(
         "object": dict,
     }
 
+    # References left unresolved (see SpecIndex) accept any value
+    if "$ref" in schema:
+        return (Any, default)
+
     # Special handling for OpenAI's oneOf/anyOf patterns
     if "oneOf" in schema or "anyOf" in schema:
         # Get the list of possible types
@@ -251,28 +308,7 @@ def _get_type(
 
     # Handle nested objects
     if schema.get("type") == "object" and "properties" in schema:
-        nested_fields = {}
-        nested_required = schema.get("required", [])
-
-        for name, prop in schema["properties"].items():
-            field_type, field_default = _get_type(prop, name, nested_required)
-            nested_fields[name] = (
-                field_type,
-                _create_field(prop, name in nested_required, field_default),
-            )
-
-        model_name = schema.get("title", "NestedModel")
-        model = create_model(
-            model_name,
-            __base__=BaseModel,
-            model_config={
-                "arbitrary_types_allowed": True,
-                "extra": "allow"
-                if schema.get("additionalProperties", True)
-                else "forbid",
-            },
-            **nested_fields,
-        )
+        model = _nested_model(schema)
 
         # Only add nullable if not required
         if not is_required and default is None:
@@ -295,3 +331,33 @@ def _get_type(
     if not is_required and default is None:
         return (base_type | None, default)
     return (base_type, default)
+
+
+def _nested_model(schema: dict[str, Any]) -> type[BaseModel]:
+    """Build the model of a nested object schema, reusing identical schemas."""
+    key = _schema_hash(schema)
+    if key in _nested_model_cache:
+        return _nested_model_cache[key]
+
+    nested_fields = {}
+    nested_required = schema.get("required", [])
+
+    for name, prop in schema["properties"].items():
+        field_type, field_default = _get_type(prop, name, nested_required)
+        nested_fields[name] = (
+            field_type,
+            _create_field(prop, name in nested_required, field_default),
+        )
+
+    model_name = schema.get("title", "NestedModel")
+    model = create_model(
+        model_name,
+        __base__=BaseModel,
+        model_config={
+            "arbitrary_types_allowed": True,
+            "extra": "allow" if schema.get("additionalProperties", True) else "forbid",
+        },
+        **nested_fields,
+    )
+    _nested_model_cache[key] = model
+    return model
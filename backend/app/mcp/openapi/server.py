@@ -0,0 +1,233 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi import HTTPException
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ToolError
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.credentials import openapi_credentials
+from app.mcp.openapi.executor import (
+    EndpointConfig,
+    execute_endpoint,
+    execute_many,
+    translate_fn_to_endpoint,
+)
+from app.mcp.openapi.pagination import Paginator
+from app.mcp.openapi.schema_to_func import schema_to_function
+from app.mcp.openapi.spec_index import SpecIndex
+from app.models.mcp.server import MCPServer
+
+logger = get_logger(__name__)
+
+# Bundled tool catalogs, one directory per provider holding a tools.json
+PROVIDERS_DIR = Path(__file__).parent
+BATCH_TOOL = "execute_many"
+PAGINATE_TOOL = "fetch_all_pages"
+
+
+class OpenAPIConnection:
+    """Where and how the operations of an OpenAPI server are called."""
+
+    def __init__(self, base_url: str, headers: dict[str, str] | None = None):
+        self.base_url = base_url
+        self.headers = headers or {}
+
+
+def load_tool_definitions(mcp_server: MCPServer) -> list[dict[str, Any]]:
+    """
+    Get the operations an OpenAPI server exposes as tools.
+
+    Definitions use the format of the bundled tools.json catalogs, a list of
+    {"id", "tool_schema", "tool_metadata"} entries. They are read inline from
+    the server's `tools` setting, built from the OpenAPI document in its `spec`
+    setting (only the operationIds listed in `operations`, if set), or read
+    from the catalog named by its `provider` setting.
+
+    Raises:
+        ValueError: If neither setting names usable definitions
+    """
+    server_settings = mcp_server.settings or {}
+    if server_settings.get("tools"):
+        return server_settings["tools"]
+    if server_settings.get("spec"):
+        index = SpecIndex(server_settings["spec"])
+        operation_ids = server_settings.get("operations") or index.operation_ids()
+        try:
+            return [index.definition(operation_id) for operation_id in operation_ids]
+        except KeyError as e:
+            raise ValueError(
+                f"OpenAPI server {mcp_server.id} has no operation {e.args[0]!r}"
+            ) from e
+
+    provider = server_settings.get("provider")
+    providers = {path.parent.name: path for path in PROVIDERS_DIR.glob("*/tools.json")}
+    if provider not in providers:
+        raise ValueError(
+            f"OpenAPI server {mcp_server.id} needs inline tools or one of the "
+            f"providers {sorted(providers)}, got {provider!r}"
+        )
+    return json.loads(providers[provider].read_text())
+
+
+def _operation_tool(
+    definition: dict[str, Any], connection: OpenAPIConnection, auth_profile: str
+) -> Callable:
+    """Wrap one operation in a tool function that calls the API directly."""
+    metadata = definition.get("tool_metadata") or {}
+    fn = schema_to_function(definition["tool_schema"], metadata)
+
+    def build_endpoint(**kwargs: Any) -> EndpointConfig:
+        options = {
+            name: kwargs.pop(name) for name in fn.response_options if name in kwargs
+        }
+        endpoint = translate_fn_to_endpoint(
+            metadata=metadata,
+            connection=connection,
+            fn=fn,
+            model_instance=fn.model(**kwargs),
+            **options,
+        )
+        endpoint.headers = {**connection.headers, **(endpoint.headers or {})}
+        endpoint.auth_profile = auth_profile
+        return endpoint
+
+    async def call_operation(**kwargs: Any) -> Any:
+        try:
+            response = await execute_endpoint(build_endpoint(**kwargs))
+        except HTTPException as e:
+            raise ToolError(e.detail) from e
+        if response.error is not None:
+            raise ToolError(f"HTTP {response.status_code}: {response.error}")
+        if response.truncated:
+            return {"data": response.data, "truncated": True}
+        return response.data
+
+    call_operation.__signature__ = fn.__signature__
+    call_operation.__annotations__ = fn.__annotations__
+    call_operation.build_endpoint = build_endpoint
+    call_operation.metadata = metadata
+    return call_operation
+
+
+def create_openapi_server(mcp_server: MCPServer) -> FastMCP:
+    """
+    Build an in-process MCP server whose tools call the operations of an API.
+
+    The API is reached at the server's `base_url` setting, or its url, with the
+    `headers` setting and the server's secrets sent on every request, along
+    with the credentials of its `auth` setting, a {"type", "config"} entry
+    whose type is an AuthType (OAuth2 tokens are fetched and refreshed by the
+    shared credential cache). Besides one tool per operation, the server has
+    an `execute_many` tool to fan one operation out over a list of argument
+    sets, and a `fetch_all_pages` tool to gather every page of a list
+    operation.
+
+    Args:
+        mcp_server: An MCP server of kind MCPTemplateKind.OPENAPI
+
+    Returns:
+        FastMCP: The server, to be connected with a FastMCPTransport
+    """
+    server_settings = mcp_server.settings or {}
+    connection = OpenAPIConnection(
+        base_url=server_settings.get("base_url") or mcp_server.url or "",
+        headers={
+            **(server_settings.get("headers") or {}),
+            **(mcp_server.secrets or {}),
+        },
+    )
+
+    auth = server_settings.get("auth")
+    if auth:
+        openapi_credentials.register(
+            mcp_server.id, auth["type"], auth.get("config") or {}
+        )
+    else:
+        openapi_credentials.forget(mcp_server.id)
+
+    server = FastMCP(mcp_server.name, instructions=mcp_server.instructions)
+    operations: dict[str, Callable] = {}
+    for definition in load_tool_definitions(mcp_server):
+        schema = definition["tool_schema"]
+        name = definition.get("id") or schema["name"]
+        operations[name] = _operation_tool(
+            definition, connection, auth_profile=mcp_server.id
+        )
+        server.add_tool(
+            operations[name],
+            name=name,
+            description=schema.get("description"),
+            tags=set((definition.get("tool_metadata") or {}).get("tags") or []),
+        )
+
+    async def call_many(
+        tool: str, arguments: list[dict[str, Any]], ctx: Context
+    ) -> list[dict[str, Any]]:
+        if tool not in operations:
+            raise ToolError(f"Unknown tool {tool!r}")
+        if len(arguments) > settings.OPENAPI_BATCH_MAX_ITEMS:
+            raise ToolError(
+                f"At most {settings.OPENAPI_BATCH_MAX_ITEMS} argument sets per batch, "
+                f"got {len(arguments)}"
+            )
+        results = []
+        async for item in execute_many(operations[tool], arguments):
+            results.append(item.model_dump())
+            await ctx.report_progress(len(results), len(arguments))
+        return results
+
+    async def fetch_all_pages(
+        tool: str,
+        arguments: dict[str, Any],
+        ctx: Context,
+        max_items: int | None = None,
+    ) -> dict[str, Any]:
+        if tool not in operations:
+            raise ToolError(f"Unknown tool {tool!r}")
+        operation = operations[tool]
+        try:
+            pages = Paginator(
+                operation.build_endpoint(**arguments),
+                metadata=operation.metadata,
+                max_items=max_items,
+            )
+            items = []
+            async for item in pages:
+                items.append(item)
+                if len(items) % 100 == 0:
+                    await ctx.report_progress(len(items), pages.max_items)
+        except ValidationError as e:
+            raise ToolError(str(e)) from e
+        except HTTPException as e:
+            raise ToolError(f"HTTP {e.status_code}: {e.detail}") from e
+        return {"items": items, "pages": pages.pages, "truncated": pages.truncated}
+
+    server.add_tool(
+        fetch_all_pages,
+        name=PAGINATE_TOOL,
+        description=(
+            "Call one of the other tools that lists items and follow its "
+            "pagination, returning the items of every page. Stops at max_items "
+            "or the server's size caps, with truncated set if items were left."
+        ),
+    )
+    server.add_tool(
+        call_many,
+        name=BATCH_TOOL,
+        description=(
+            "Call one of the other tools once per argument set, concurrently. "
+            "Returns one entry per argument set in the order the calls finish, "
+            "with the index of its argument set and either a result or an error."
+        ),
+    )
+
+    logger.info(
+        f"Created in-process OpenAPI server {mcp_server.id} with "
+        f"{len(server._tool_manager.list_tools())} tools"
+    )
+    return server
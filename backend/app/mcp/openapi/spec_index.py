@@ -0,0 +1,250 @@
+import keyword
+import re
+from collections.abc import Callable
+from typing import Any
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.schema_to_func import schema_to_function
+
+logger = get_logger(__name__)
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+_NOT_IDENTIFIER = re.compile(r"\W")
+
+
+def _field_name(name: str) -> str:
+    """A Python identifier for a parameter name such as X-Request-Id or filter[q]."""
+    field = _NOT_IDENTIFIER.sub("_", name)
+    if not field or field[0].isdigit() or keyword.iskeyword(field):
+        field = f"{field}_"
+    return field
+
+
+class SpecIndex:
+    """
+    Index of the operations of an OpenAPI (or Swagger 2) document.
+
+    Building the index only records where each operation is. An operation is
+    turned into a tool definition, in the format of the bundled tools.json
+    catalogs, the first time it is asked for by operationId. `$ref`s are
+    resolved once each and the resolved schemas are shared by every operation
+    using them. A reference to a schema that is still being resolved, such as
+    a tree node listing its children, is cut into a plain object schema, and
+    so are references nested more than `max_ref_depth` deep, which keeps the
+    schemas of heavily cross-referenced specs from growing exponentially.
+    """
+
+    def __init__(self, spec: dict[str, Any], max_ref_depth: int | None = None):
+        self.spec = spec
+        self.max_ref_depth = max_ref_depth or settings.OPENAPI_SPEC_MAX_REF_DEPTH
+        # operationId -> (path, method)
+        self._operations: dict[str, tuple[str, str]] = {}
+        self._definitions: dict[str, dict[str, Any]] = {}
+        self._functions: dict[str, Callable] = {}
+        # Resolved schemas per ref and the nesting depth left for them
+        self._resolved: dict[tuple[str, int], Any] = {}
+        self.cycles = 0
+        self.depth_cuts = 0
+
+        for path, path_item in (spec.get("paths") or {}).items():
+            if not isinstance(path_item, dict):
+                continue
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                operation_id = operation.get("operationId") or _field_name(
+                    f"{method}_{path.strip('/')}"
+                )
+                if operation_id in self._operations:
+                    logger.warning(f"Duplicate operationId {operation_id} at {path}")
+                    continue
+                self._operations[operation_id] = (path, method)
+
+    def operation_ids(self) -> list[str]:
+        return list(self._operations)
+
+    def _pointer(self, ref: str) -> Any:
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $refs are supported, got {ref!r}")
+        node: Any = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, list):
+                node = node[int(part)]
+            elif isinstance(node, dict) and part in node:
+                node = node[part]
+            else:
+                raise ValueError(f"Unresolvable $ref {ref!r}")
+        return node
+
+    def _resolve_ref(self, ref: str, stack: list[str]) -> Any:
+        depth_left = self.max_ref_depth - len(stack)
+        if (ref, depth_left) in self._resolved:
+            return self._resolved[(ref, depth_left)]
+        name = ref.rsplit("/", 1)[-1]
+        if ref in stack or depth_left <= 0:
+            if ref in stack:
+                self.cycles += 1
+            else:
+                self.depth_cuts += 1
+            return {"type": "object", "title": name}
+
+        stack.append(ref)
+        try:
+            resolved = self.resolve(self._pointer(ref), stack)
+        finally:
+            stack.pop()
+        if isinstance(resolved, dict) and "title" not in resolved:
+            resolved = {"title": name, **resolved}
+        self._resolved[(ref, depth_left)] = resolved
+        return resolved
+
+    def resolve(self, node: Any, stack: list[str] | None = None) -> Any:
+        """A copy of a node with every `$ref` replaced by what it points to."""
+        stack = [] if stack is None else stack
+        if isinstance(node, list):
+            return [self.resolve(item, stack) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        if isinstance(node.get("$ref"), str):
+            resolved = self._resolve_ref(node["$ref"], stack)
+            siblings = {k: v for k, v in node.items() if k != "$ref"}
+            if siblings and isinstance(resolved, dict):
+                return {**resolved, **self.resolve(siblings, stack)}
+            return resolved
+
+        resolved = {key: self.resolve(value, stack) for key, value in node.items()}
+        if "allOf" in resolved and all(isinstance(s, dict) for s in resolved["allOf"]):
+            resolved = self._merge_all_of(resolved)
+        return resolved
+
+    @staticmethod
+    def _merge_all_of(schema: dict[str, Any]) -> dict[str, Any]:
+        merged = {k: v for k, v in schema.items() if k != "allOf"}
+        properties = dict(merged.get("properties") or {})
+        required = list(merged.get("required") or [])
+        for part in schema["allOf"]:
+            for key, value in part.items():
+                if key not in ("properties", "required"):
+                    merged.setdefault(key, value)
+            properties.update(part.get("properties") or {})
+            required += [
+                name for name in part.get("required") or [] if name not in required
+            ]
+        if properties:
+            merged["properties"] = properties
+            merged.setdefault("type", "object")
+        if required:
+            merged["required"] = required
+        return merged
+
+    def definition(self, operation_id: str) -> dict[str, Any]:
+        """
+        The tool definition of an operation, built on first use.
+
+        Raises:
+            KeyError: If the spec has no operation with this operationId
+        """
+        if operation_id in self._definitions:
+            return self._definitions[operation_id]
+
+        path, method = self._operations[operation_id]
+        path_item = self.spec["paths"][path]
+        operation = path_item[method]
+
+        properties: dict[str, Any] = {}
+        required: list[str] = []
+        metadata: dict[str, Any] = {
+            "path": path,
+            "method": method.upper(),
+            "tags": operation.get("tags", []),
+        }
+
+        parameters = {}
+        for parameter in [
+            *(path_item.get("parameters") or []),
+            *(operation.get("parameters") or []),
+        ]:
+            parameter = self.resolve(parameter)
+            # Operation parameters override path item parameters
+            parameters[(parameter.get("name"), parameter.get("in"))] = parameter
+
+        body_schema = None
+        for (name, location), parameter in parameters.items():
+            if location == "body":
+                body_schema = parameter.get("schema")
+                continue
+            if location not in ("path", "query", "header", "cookie") or not name:
+                continue
+            schema = parameter.get("schema") or {
+                key: parameter[key]
+                for key in ("type", "items", "enum", "default", "format")
+                if key in parameter
+            }
+            field = _field_name(name)
+            if field in properties:
+                field = f"{field}_{location}"
+            properties[field] = {
+                **schema,
+                "description": parameter.get(
+                    "description", schema.get("description", "")
+                ),
+            }
+            metadata[field] = {"type": "parameter", "in": location, "name": name}
+            if parameter.get("required") or location == "path":
+                required.append(field)
+
+        request_body = self.resolve(operation.get("requestBody") or {})
+        for content_type, media in (request_body.get("content") or {}).items():
+            if "json" in content_type:
+                body_schema = media.get("schema")
+                break
+        if isinstance(body_schema, dict) and body_schema.get("properties"):
+            for name, schema in body_schema["properties"].items():
+                field = _field_name(name)
+                if field in properties:
+                    field = f"body_{field}"
+                properties[field] = schema
+                metadata[field] = {"name": name}
+                if name in (body_schema.get("required") or []):
+                    required.append(field)
+        elif body_schema is not None:
+            logger.debug(f"Skipping non-object request body of {operation_id}")
+
+        definition = {
+            "id": operation_id,
+            "tool_schema": {
+                "name": operation_id,
+                "description": operation.get("summary")
+                or operation.get("description", ""),
+                "parameters": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": required,
+                },
+            },
+            "tool_metadata": metadata,
+        }
+        self._definitions[operation_id] = definition
+        return definition
+
+    def function(self, operation_id: str) -> Callable:
+        """The dynamic function of an operation, generated on first use."""
+        if operation_id not in self._functions:
+            definition = self.definition(operation_id)
+            self._functions[operation_id] = schema_to_function(
+                definition["tool_schema"], definition["tool_metadata"]
+            )
+        return self._functions[operation_id]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "operations": len(self._operations),
+            "materialized": len(self._definitions),
+            "resolved_refs": len(self._resolved),
+            "cycles": self.cycles,
+            "depth_cuts": self.depth_cuts,
+        }
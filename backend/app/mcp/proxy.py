@@ -1,10 +1,15 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime
 from typing import Any, Literal
 
 import mcp.types
 from fastmcp import FastMCP
 from fastmcp.client import Client
-from fastmcp.client.transports import StdioTransport
+from fastmcp.exceptions import ToolError
+from fastmcp.server.context import Context
+from fastmcp.server.dependencies import get_context
 from fastmcp.server.proxy import FastMCPProxy
 from fastmcp.tools.tool import Tool
 from mcp.shared.exceptions import McpError
@@ -14,15 +19,36 @@ from mcp.types import (
 
 from app.core.logger import get_logger
 from app.mcp.queue_manager import queue_manager
+from app.mcp.results import FETCH_CHUNK_TOOL, fetch_chunk
+from app.mcp.stats import server_stats
+from app.mcp.traffic import traffic_recorder
+from app.mcp.transports import create_transport
+from app.mcp.validation import ArgumentValidationError, ToolArgumentValidator
+from app.models.mcp.catalog import MCPToolCatalog
 from app.models.mcp.server import MCPServer
 
 logger = get_logger(__name__)
 
+# Called with (server_id, tools, content_hash) whenever the tool catalog changes
+CatalogChangeHandler = Callable[[str, list[dict[str, Any]], str], Awaitable[None]]
+
 
 def _proxy_passthrough():
     pass
 
 
+def _progress_context() -> Context | None:
+    """The MCP request context, if the current request asked for progress updates."""
+    try:
+        context = get_context()
+        meta = context.request_context.meta
+    except (LookupError, RuntimeError):
+        return None
+    if meta is None or meta.progressToken is None:
+        return None
+    return context
+
+
 class ProxyTool(Tool):
     def __init__(self, client: Client, **kwargs):
         super().__init__(**kwargs)
@@ -45,11 +71,25 @@ class MCPProxy(FastMCPProxy):
         self,
         mcp_server: MCPServer,
         tool_group: str = None,
+        catalog: MCPToolCatalog | None = None,
+        on_catalog_change: CatalogChangeHandler | None = None,
         **kwargs,
     ):
         self.mcp_server = mcp_server
         self.client_initialized = False
 
+        # Last known tool catalog, served until the live list_tools arrives
+        self.catalog_tools: list[mcp.types.Tool] | None = None
+        self.catalog_hash: str | None = None
+        if catalog:
+            self.catalog_tools = [
+                mcp.types.Tool.model_validate(tool) for tool in catalog.tools
+            ]
+            self.catalog_hash = catalog.content_hash
+        self.on_catalog_change = on_catalog_change
+        self.argument_validator = ToolArgumentValidator()
+        self._load_validators()
+
         # Runtime state variables moved from MCPServer
         self.state: Literal[
             "pending",
@@ -75,19 +115,17 @@ class MCPProxy(FastMCPProxy):
         }
         self.tool_group = tool_group
         logger.info(f"Initializing MCP proxy for server {self.mcp_server.id}")
-        self.client = Client(
-            transport=StdioTransport(
-                command=self.mcp_server.run.command,
-                cwd=self.mcp_server.run.cwd,
-                env={
-                    **(self.mcp_server.run.env or {}),
-                    **(self.mcp_server.secrets or {}),
-                },
-                args=self.mcp_server.run.args,
-            ),
-        )
+        self.client = Client(transport=create_transport(self.mcp_server))
 
         super().__init__(self.client, **kwargs)
+        self.add_tool(
+            self._fetch_result_chunk,
+            name=FETCH_CHUNK_TOOL,
+            description=(
+                "Read the remainder of a truncated tool result, one chunk at a time, "
+                "using the token from the truncation notice."
+            ),
+        )
         logger.info(
             f"MCP proxy instance created for server {self.mcp_server.id} with state: {self.state}"
         )
@@ -153,10 +191,10 @@ class MCPProxy(FastMCPProxy):
             if self.client_initialized:
                 logger.info(f"Shutting down MCP proxy for server {self.mcp_server.id}")
                 try:
-                    # Create a new task in the same event loop
                     await self.client.__aexit__(None, None, None)
-                    async with self.client:
-                        pass
+                    # Stdio transports keep their subprocess alive between
+                    # sessions, closing the transport is what terminates it
+                    await self.client.close()
                 except Exception as e:
                     logger.critical(
                         f"Error during client cleanup for server {self.mcp_server.id}: {e}"
@@ -189,13 +227,77 @@ class MCPProxy(FastMCPProxy):
             )
             return False
 
+    async def reconcile_catalog(self) -> bool:
+        """
+        Fetch the live tool catalog and replace the persisted snapshot if it changed.
+
+        Returns:
+            bool: True if the catalog changed, False otherwise
+        """
+        try:
+            client_tools = await self.client.list_tools()
+        except McpError as e:
+            if e.error.code != METHOD_NOT_FOUND:
+                raise
+            client_tools = []
+        return await self.update_catalog(client_tools)
+
+    async def health_check(self) -> bool:
+        """
+        Ping the upstream MCP server and record the result.
+
+        Returns:
+            bool: True if the server answered, False otherwise
+        """
+        if not self.client_initialized or not self.client.is_connected():
+            return False
+
+        start_time = datetime.now()
+        try:
+            await self.client.ping()
+            self.last_ping_time = datetime.now()
+            self.stats["last_ping_latency"] = (
+                self.last_ping_time - start_time
+            ).total_seconds()
+            if self.state == "disconnected":
+                prev_state = self.state
+                self.state = "running"
+                logger.info(
+                    f"State transition: {prev_state} → {self.state} for server {self.mcp_server.id}"
+                )
+            return True
+        except Exception as e:
+            self.connection_errors["count"] += 1
+            self.connection_errors["last_error"] = str(e)
+            if self.state == "running":
+                prev_state = self.state
+                self.state = "disconnected"
+                logger.warning(
+                    f"State transition: {prev_state} → {self.state} for server {self.mcp_server.id} due to failed ping: {e}"
+                )
+            return False
+
     def get_transport_key(self) -> str:
         """Get a unique key for storing transports."""
         return f"{self.mcp_server.id}"
 
-    async def get_tools(self) -> dict[str, Tool]:
-        tools = await super().get_tools()
-        server_tools = {tool.name: tool for tool in (self.mcp_server.tools or [])}
+    async def _list_client_tools(self) -> list[mcp.types.Tool]:
+        """
+        List the upstream tools, or the persisted catalog while the client warms up.
+
+        Returns:
+            list[mcp.types.Tool]: The tools advertised by the upstream server
+        """
+        if not self.client_initialized or not self.client.is_connected():
+            if self.catalog_tools is not None:
+                logger.info(
+                    f"Serving persisted tool catalog for server {self.mcp_server.id} while it is {self.state}"
+                )
+                return self.catalog_tools
+            logger.warning(
+                f"No tools available for server {self.mcp_server.id} while it is {self.state}"
+            )
+            return []
 
         try:
             logger.info(
@@ -217,12 +319,62 @@ class MCPProxy(FastMCPProxy):
                 )
                 raise e
 
+        await self.update_catalog(client_tools)
+        return client_tools
+
+    async def update_catalog(self, client_tools: list[mcp.types.Tool]) -> bool:
+        """
+        Record the live tool catalog and persist it if it changed.
+
+        Args:
+            client_tools: The tools returned by the upstream list_tools
+
+        Returns:
+            bool: True if the catalog differed from the previous snapshot
+        """
+        tools = [
+            tool.model_dump(mode="json", exclude_none=True) for tool in client_tools
+        ]
+        content_hash = MCPToolCatalog.compute_hash(tools)
+        self.catalog_tools = list(client_tools)
+        if content_hash == self.catalog_hash:
+            return False
+
+        logger.info(
+            f"Tool catalog changed for server {self.mcp_server.id} ({len(tools)} tools, hash {content_hash[:12]})"
+        )
+        self.catalog_hash = content_hash
+        self._load_validators()
+        if self.on_catalog_change:
+            try:
+                await self.on_catalog_change(self.mcp_server.id, tools, content_hash)
+            except Exception as e:
+                logger.error(
+                    f"Error persisting tool catalog for server {self.mcp_server.id}: {e}"
+                )
+        return True
+
+    def _load_validators(self) -> None:
+        """Compile argument validators from the configured tools and the catalog."""
+        schemas = {tool.name: tool.parameters for tool in (self.mcp_server.tools or [])}
+        for tool in self.catalog_tools or []:
+            schemas[tool.name] = tool.inputSchema
+        self.argument_validator.load(schemas)
+
+    async def get_tools(self) -> dict[str, Tool]:
+        # Skip FastMCPProxy.get_tools, which opens the client and lists the
+        # upstream tools itself
+        tools = await FastMCP.get_tools(self)
+        server_tools = {tool.name: tool for tool in (self.mcp_server.tools or [])}
+
+        client_tools = await self._list_client_tools()
+
         for tool in client_tools:
             if tool.name in server_tools and not server_tools[tool.name].status:
                 logger.info(
                     f"Skipping tool {tool.name} because it is not enabled in the server configuration"
                 )
-                del tools[tool.name]
+                tools.pop(tool.name, None)
             else:
                 tool_proxy = await ProxyTool.from_client(self.client, tool)
                 tools[tool_proxy.name] = tool_proxy
@@ -233,21 +385,132 @@ class MCPProxy(FastMCPProxy):
         logger.info(f"Returning {len(tools)} tools for server {self.mcp_server.id}")
         return tools
 
+    async def _fetch_result_chunk(self, token: str, index: int = 0) -> list[Any]:
+        """Serve a stored chunk of a result that was truncated by the queue worker."""
+        try:
+            return await fetch_chunk(
+                queue_manager.redis, self.mcp_server.id, token, index
+            )
+        except ValueError as e:
+            raise ToolError(str(e)) from e
+
     async def _mcp_call_tool(self, key: str, arguments: dict[str, Any]) -> Any:
-        """Call a tool with the given arguments using Redis queue, respecting MCP server tool configuration."""
+        """Call a tool through the queue, recording a sample of calls when tracing is enabled."""
+        if key == FETCH_CHUNK_TOOL:
+            # Served from Redis by the gateway, not by the upstream server
+            return await FastMCP._mcp_call_tool(self, key, arguments)
+
+        if not traffic_recorder.should_record():
+            result, _ = await self._queue_tool_call(key, arguments)
+            return result
+
+        started_at = time.time()
+        start = time.perf_counter()
+        result: Any = None
+        ok = False
         try:
-            # Check if tool is configured and enabled in MCP server
-            server_tools = {tool.name: tool for tool in (self.mcp_server.tools or [])}
-            if key in server_tools and not server_tools[key].status:
-                logger.warning(
-                    f"Attempt to call disabled tool {key} on server {self.mcp_server.id}"
+            result, ok = await self._queue_tool_call(key, arguments)
+            return result
+        finally:
+            traffic_recorder.record(
+                server_id=self.mcp_server.id,
+                tool_name=key,
+                arguments=arguments,
+                started_at=started_at,
+                latency=time.perf_counter() - start,
+                result=result,
+                ok=ok,
+            )
+
+    def _check_tool_call(self, key: str, arguments: dict[str, Any]) -> None:
+        """
+        Reject calls to disabled tools and calls with malformed arguments.
+
+        Raises:
+            McpError: If the tool is disabled in the server configuration
+            ToolError: If the arguments do not match the tool's input schema
+        """
+        # Check if tool is configured and enabled in MCP server
+        server_tools = {tool.name: tool for tool in (self.mcp_server.tools or [])}
+        if key in server_tools and not server_tools[key].status:
+            logger.warning(
+                f"Attempt to call disabled tool {key} on server {self.mcp_server.id}"
+            )
+            raise McpError(
+                error=mcp.types.Error(
+                    code="TOOL_DISABLED",
+                    message=f"Tool {key} is disabled in MCP server configuration",
                 )
-                raise McpError(
-                    error=mcp.types.Error(
-                        code="TOOL_DISABLED",
-                        message=f"Tool {key} is disabled in MCP server configuration",
+            )
+
+        # Reject malformed arguments before they reach the queue
+        try:
+            self.argument_validator.validate(key, arguments)
+        except ArgumentValidationError as e:
+            logger.warning(
+                f"Rejected call to tool {key} on server {self.mcp_server.id}: {e}"
+            )
+            raise ToolError(str(e)) from e
+        finally:
+            self.stats["validation"] = self.argument_validator.stats()
+
+    async def start_tool_call(self, key: str, arguments: dict[str, Any]) -> str:
+        """
+        Queue a tool call whose progress and outcome are published to its event stream.
+
+        Unlike MCP calls this does not wait for the result, callers follow it with
+        queue_manager.stream_events and may cancel it with queue_manager.cancel_tool_call.
+
+        Args:
+            key: The name of the tool
+            arguments: The call arguments
+
+        Returns:
+            str: The request ID of the queued call
+        """
+        self._check_tool_call(key, arguments)
+        if not self.client_initialized or not self.client.is_connected():
+            raise RuntimeError(f"MCP server {self.mcp_server.id} is not connected")
+
+        self.stats["requests"] += 1
+        request_id = await queue_manager.enqueue_tool_call(
+            proxy_id=self.mcp_server.id,
+            tool_name=key,
+            arguments=arguments,
+            timeout=300,
+            stream=True,
+        )
+        logger.info(
+            f"Queued streamed call {request_id} of tool {key} on server {self.mcp_server.id}"
+        )
+        return request_id
+
+    async def _relay_progress(self, request_id: str, context: Context) -> None:
+        """Forward progress events of a queued call to the MCP client that made it."""
+        try:
+            async for event in queue_manager.stream_events(request_id):
+                if event["type"] == "progress":
+                    await context.report_progress(
+                        event["progress"], event.get("total"), event.get("message")
                     )
-                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Stopped relaying progress of tool call {request_id}: {e}")
+
+    async def _queue_tool_call(
+        self, key: str, arguments: dict[str, Any]
+    ) -> tuple[Any, bool]:
+        """
+        Call a tool with the given arguments using Redis queue, respecting MCP server tool configuration.
+
+        Returns:
+            tuple: The result, an empty list if the call failed, and whether
+            the call succeeded
+        """
+        start_time: datetime | None = None
+        try:
+            self._check_tool_call(key, arguments)
 
             # Execute tool call via queue
             logger.info(
@@ -260,7 +523,10 @@ class MCPProxy(FastMCPProxy):
                 logger.critical(
                     f"Tool call attempted on disconnected client for server {self.mcp_server.id}"
                 )
-                return []
+                return [], False
+
+            # Stream progress back only when the MCP client asked for it
+            progress_context = _progress_context()
 
             # Enqueue the tool call and wait for result
             request_id = await queue_manager.enqueue_tool_call(
@@ -268,27 +534,51 @@ class MCPProxy(FastMCPProxy):
                 tool_name=key,
                 arguments=arguments,
                 timeout=300,
+                stream=progress_context is not None,
+            )
+            relay = (
+                asyncio.create_task(self._relay_progress(request_id, progress_context))
+                if progress_context
+                else None
             )
 
             # Wait for the result from the queue
-            result = await queue_manager.wait_for_result(request_id, timeout=300)
+            try:
+                result = await queue_manager.wait_for_result(request_id, timeout=300)
+            except asyncio.CancelledError:
+                # The MCP client cancelled its request, stop the upstream call too
+                await queue_manager.cancel_tool_call(request_id)
+                raise
+            finally:
+                if relay:
+                    relay.cancel()
             response_time = (datetime.now() - start_time).total_seconds()
             self.stats["last_response_time"] = response_time
+            server_stats.record_call(self.mcp_server.id, response_time, ok=True)
             self.last_ping_time = datetime.now()
 
             logger.info(
                 f"Tool {key} call completed via queue in {response_time:.3f}s on server {self.mcp_server.id}"
             )
-            return result
+            return result, True
 
+        except ToolError:
+            # Argument errors are the caller's to fix, report them as such
+            raise
         except Exception as e:
             self.stats["errors"] += 1
+            if start_time:
+                server_stats.record_call(
+                    self.mcp_server.id,
+                    (datetime.now() - start_time).total_seconds(),
+                    ok=False,
+                )
             self.connection_errors["count"] += 1
             self.connection_errors["last_error"] = str(e)
             logger.critical(
                 f"Error calling tool {key} on server {self.mcp_server.id}: {e}"
             )
-            return []
+            return [], False
 
     def mount(self, app: FastMCP) -> None:
         """
@@ -327,12 +617,15 @@ class MCPProxy(FastMCPProxy):
             # Check if critical configuration has changed
             needs_restart = (
                 self.mcp_server.run != updated_server.run
+                or self.mcp_server.url != updated_server.url
+                or self.mcp_server.transport != updated_server.transport
                 or self.mcp_server.secrets != updated_server.secrets
                 or self.mcp_server.settings != updated_server.settings
             )
 
             # Update the server reference
             self.mcp_server = updated_server
+            self._load_validators()
 
             if needs_restart:
                 logger.info(
@@ -341,6 +634,7 @@ class MCPProxy(FastMCPProxy):
                 # If critical config changed, we need to restart the client
                 if self.client_initialized:
                     await self.shutdown()
+                self.client = Client(transport=create_transport(self.mcp_server))
                 await self.initialize()
             else:
                 # For non-critical updates, just update the state
@@ -1,13 +1,16 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 from typing import Any
 
 from redis.asyncio import Redis
 
 from app.core.config import settings
+from app.mcp.results import bound_result, max_result_size
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +23,15 @@ class ToolCallRequest:
         tool_name: str,
         arguments: dict[str, Any],
         timeout: int = 300,
+        stream: bool = False,
     ):
         self.request_id = request_id
         self.proxy_id = proxy_id
         self.tool_name = tool_name
         self.arguments = arguments
         self.timeout = timeout
+        # Whether progress and the outcome are written to the request's stream
+        self.stream = stream
         self.created_at = datetime.utcnow()
         self.expires_at = self.created_at + timedelta(seconds=timeout)
 
@@ -36,6 +42,7 @@ class ToolCallRequest:
             "tool_name": self.tool_name,
             "arguments": self.arguments,
             "timeout": self.timeout,
+            "stream": self.stream,
             "created_at": self.created_at.isoformat(),
             "expires_at": self.expires_at.isoformat(),
         }
@@ -48,6 +55,7 @@ class ToolCallRequest:
             tool_name=data["tool_name"],
             arguments=data["arguments"],
             timeout=data["timeout"],
+            stream=data.get("stream", False),
         )
         request.created_at = datetime.fromisoformat(data["created_at"])
         request.expires_at = datetime.fromisoformat(data["expires_at"])
@@ -61,11 +69,17 @@ class RedisQueueManager:
         self._running = False
         self._worker_task: asyncio.Task | None = None
         self._response_handlers: dict[str, asyncio.Future] = {}
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
 
         # Queue names
         self.tool_queue = "mcp:tool_calls"
         self.response_channel = "mcp:responses"
+        self.cancel_channel = "mcp:cancellations"
         self.result_key_prefix = "mcp:result:"
+        self.event_stream_prefix = "mcp:events:"
+        self.cancelled_key_prefix = "mcp:cancelled:"
+        self.call_key_prefix = "mcp:call:"
 
     async def connect(self) -> None:
         try:
@@ -83,7 +97,7 @@ class RedisQueueManager:
 
             # Set up pub/sub for response handling
             self.pubsub = self.redis.pubsub()
-            await self.pubsub.subscribe(self.response_channel)
+            await self.pubsub.subscribe(self.response_channel, self.cancel_channel)
 
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
@@ -98,7 +112,7 @@ class RedisQueueManager:
                 pass
 
         if self.pubsub:
-            await self.pubsub.unsubscribe(self.response_channel)
+            await self.pubsub.unsubscribe(self.response_channel, self.cancel_channel)
             await self.pubsub.close()
 
         if self.redis:
@@ -112,6 +126,7 @@ class RedisQueueManager:
         tool_name: str,
         arguments: dict[str, Any],
         timeout: int = 300,
+        stream: bool = False,
     ) -> str:
         if not self.redis:
             raise RuntimeError("Redis not connected")
@@ -123,8 +138,18 @@ class RedisQueueManager:
             tool_name=tool_name,
             arguments=arguments,
             timeout=timeout,
+            stream=stream,
         )
 
+        if stream:
+            # Streamed calls are followed and cancelled by request ID, record
+            # which server they belong to for as long as their events are kept
+            await self.redis.set(
+                f"{self.call_key_prefix}{request_id}",
+                proxy_id,
+                ex=timeout + settings.MCP_EVENT_STREAM_TTL,
+            )
+
         # Add to queue
         await self.redis.lpush(self.tool_queue, json.dumps(request.to_dict()))
 
@@ -154,6 +179,10 @@ class RedisQueueManager:
         if message["type"] != "message":
             return
 
+        if message.get("channel") == self.cancel_channel:
+            self._cancel_in_flight(message["data"])
+            return
+
         try:
             data = json.loads(message["data"])
             request_id = data.get("request_id")
@@ -178,14 +207,111 @@ class RedisQueueManager:
         async for message in self.pubsub.listen():
             await self._handle_response_message(message)
 
+    async def publish_event(self, request_id: str, event: dict[str, Any]) -> None:
+        """
+        Append an event to a tool call's stream.
+
+        Args:
+            request_id: The ID of the tool call
+            event: The event, with a "type" of progress, result or error
+        """
+        key = f"{self.event_stream_prefix}{request_id}"
+        await self.redis.xadd(
+            key,
+            {"event": json.dumps(event)},
+            maxlen=settings.MCP_EVENT_STREAM_MAXLEN,
+            approximate=True,
+        )
+        await self.redis.expire(key, settings.MCP_EVENT_STREAM_TTL)
+
+    async def call_proxy_id(self, request_id: str) -> str | None:
+        """The server a streamed tool call was queued for, None if unknown or expired."""
+        return await self.redis.get(f"{self.call_key_prefix}{request_id}")
+
+    async def stream_events(
+        self, request_id: str, block_ms: int = 5000, timeout: float | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Follow the events of a tool call until its result or error arrives.
+
+        Events are read from the start of the stream, so subscribers that attach
+        late still see earlier progress. The stream ends with an error event if
+        the call is unknown or expired, or if no outcome arrives in time.
+
+        Args:
+            request_id: The ID of the tool call
+            block_ms: Milliseconds to block per read while waiting for events
+            timeout: Seconds to follow the call, defaults to
+                settings.MCP_EVENT_STREAM_TTL
+
+        Yields:
+            dict: Events in the order they were published
+        """
+        key = f"{self.event_stream_prefix}{request_id}"
+        deadline = time.monotonic() + (
+            settings.MCP_EVENT_STREAM_TTL if timeout is None else timeout
+        )
+        last_id = "0"
+        response = None
+        while True:
+            if not response and await self.call_proxy_id(request_id) is None:
+                yield {"type": "error", "error": "Unknown or expired tool call"}
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield {"type": "error", "error": "Timed out waiting for the tool call"}
+                return
+            response = await self.redis.xread(
+                {key: last_id}, block=max(1, min(block_ms, int(remaining * 1000)))
+            )
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    event = json.loads(fields["event"])
+                    yield event
+                    if event["type"] in ("result", "error"):
+                        return
+
+    async def cancel_tool_call(self, request_id: str) -> None:
+        """
+        Cancel a tool call, whether it is still queued or already running.
+
+        Every node is notified so the one running the call can interrupt it;
+        a marker stops the call from starting if it has not been picked up yet.
+
+        Args:
+            request_id: The ID of the tool call
+        """
+        await self.redis.set(
+            f"{self.cancelled_key_prefix}{request_id}",
+            "1",
+            ex=settings.MCP_EVENT_STREAM_TTL,
+        )
+        await self.redis.publish(self.cancel_channel, request_id)
+        logger.info(f"Requested cancellation of tool call {request_id}")
+
+    def _cancel_in_flight(self, request_id: str) -> None:
+        task = self._in_flight.get(request_id)
+        if task and not task.done():
+            logger.info(f"Cancelling in-flight tool call {request_id}")
+            self._cancelled.add(request_id)
+            task.cancel()
+
     async def process_tool_calls(self, proxy_manager: dict[str, Any]) -> None:
         if not self.redis:
             raise RuntimeError("Redis not connected")
 
         logger.info("Starting tool call processor")
+        slots = asyncio.Semaphore(settings.MCP_QUEUE_CONCURRENCY)
 
         while self._running:
+            # Only take a request off the queue once there is capacity to run it
+            await slots.acquire()
+            started = False
             try:
+                if not self._running:
+                    break
+
                 # Block and wait for a tool call request
                 result = await self.redis.brpop(self.tool_queue, timeout=1)
 
@@ -193,27 +319,90 @@ class RedisQueueManager:
                     continue
 
                 _, message_data = result
+
+                if not self._running:
+                    # Draining started while we were waiting on the queue, hand
+                    # the request back so another node can pick it up
+                    await self.requeue(message_data)
+                    break
+
                 request_data = json.loads(message_data)
                 request = ToolCallRequest.from_dict(request_data)
 
                 # Check if request has expired
                 if datetime.utcnow() > request.expires_at:
                     logger.warning(f"Tool call {request.request_id} expired, skipping")
+                    await self._publish_response(
+                        request,
+                        {
+                            "request_id": request.request_id,
+                            "error": "Tool call expired before it started",
+                            "success": False,
+                            "result": [],
+                        },
+                    )
                     continue
 
-                # Process the tool call
-                await self._process_single_tool_call(request, proxy_manager)
+                # Process the tool call without blocking the queue
+                self._start_tool_call(request, proxy_manager, slots)
+                started = True
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error processing tool calls: {e}")
                 await asyncio.sleep(1)
+            finally:
+                if not started:
+                    slots.release()
+
+    def _start_tool_call(
+        self,
+        request: ToolCallRequest,
+        proxy_manager: dict[str, Any],
+        slots: asyncio.Semaphore,
+    ) -> None:
+        task = asyncio.create_task(
+            self._process_single_tool_call(request, proxy_manager)
+        )
+        self._in_flight[request.request_id] = task
+
+        def _on_done(_: asyncio.Task) -> None:
+            self._in_flight.pop(request.request_id, None)
+            slots.release()
+
+        task.add_done_callback(_on_done)
+
+    async def requeue(self, message_data: str) -> None:
+        """Push a raw request back to the consuming end of the tool queue."""
+        await self.redis.rpush(self.tool_queue, message_data)
+        logger.info("Returned unstarted tool call to the queue")
 
     async def _process_single_tool_call(
         self, request: ToolCallRequest, proxy_manager: dict[str, Any]
     ) -> None:
+        progress_handler = None
+        if request.stream:
+
+            async def progress_handler(
+                progress: float, total: float | None, message: str | None
+            ) -> None:
+                await self.publish_event(
+                    request.request_id,
+                    {
+                        "type": "progress",
+                        "progress": progress,
+                        "total": total,
+                        "message": message,
+                    },
+                )
+
         try:
+            if request.stream and await self.redis.get(
+                f"{self.cancelled_key_prefix}{request.request_id}"
+            ):
+                raise Exception("Tool call cancelled by caller")
+
             # Get the proxy from the manager
             proxy = proxy_manager.get(request.proxy_id)
             if not proxy:
@@ -223,15 +412,49 @@ class RedisQueueManager:
             if not proxy.client or not proxy.client.is_connected():
                 raise Exception(f"Proxy {request.proxy_id} client not connected")
 
-            result = await proxy.client.call_tool(request.tool_name, request.arguments)
+            result = await proxy.client.call_tool(
+                request.tool_name,
+                request.arguments,
+                progress_handler=progress_handler,
+            )
+
+            # Keep oversized results out of the response channel, the caller
+            # pages through the rest with the fetch_result_chunk tool
+            bounded = await bound_result(
+                self.redis,
+                request.proxy_id,
+                result,
+                max_result_size(proxy.mcp_server),
+            )
 
             # Publish the result
             response = {
                 "request_id": request.request_id,
-                "result": result,
+                "result": bounded.content,
                 "success": True,
             }
-
+            if bounded.continuation:
+                response["continuation"] = bounded.continuation
+
+        except asyncio.CancelledError:
+            if request.request_id in self._cancelled:
+                self._cancelled.discard(request.request_id)
+                error = "Tool call cancelled by caller"
+            else:
+                # Interrupted by a drain deadline, fail the caller fast instead
+                # of leaving it to wait for the call timeout
+                error = "Tool call interrupted by server shutdown"
+            logger.warning(f"Tool call {request.request_id}: {error}")
+            await self._publish_response(
+                request,
+                {
+                    "request_id": request.request_id,
+                    "error": error,
+                    "success": False,
+                    "result": [],
+                },
+            )
+            raise
         except Exception as e:
             logger.error(f"Error executing tool call {request.request_id}: {e}")
             response = {
@@ -242,7 +465,51 @@ class RedisQueueManager:
             }
 
         # Publish response
+        await self._publish_response(request, response)
+
+    async def _publish_response(
+        self, request: ToolCallRequest, response: dict[str, Any]
+    ) -> None:
+        """Deliver the outcome of a tool call to its caller and, if requested, its stream."""
         await self.redis.publish(self.response_channel, json.dumps(response))
+        if request.stream:
+            if response["success"]:
+                event = {"type": "result", "result": response["result"]}
+            else:
+                event = {"type": "error", "error": response["error"]}
+            await self.publish_event(request.request_id, event)
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stop taking tool calls off the queue and let in-flight calls finish.
+
+        Calls still running when the deadline passes are cancelled, which
+        publishes an error response so their callers fail fast.
+
+        Args:
+            timeout: Seconds to wait for in-flight calls to complete
+        """
+        self._running = False
+
+        in_flight = list(self._in_flight.values())
+        if not in_flight:
+            logger.info("No in-flight tool calls to drain")
+            return
+
+        logger.info(
+            f"Draining {len(in_flight)} in-flight tool calls with a {timeout}s deadline"
+        )
+        _, pending = await asyncio.wait(in_flight, timeout=timeout)
+
+        if pending:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                f"Cancelled {len(pending)} tool calls still running after the drain deadline"
+            )
+        else:
+            logger.info("All in-flight tool calls drained")
 
     async def start_worker(self, proxy_manager: dict[str, Any]) -> None:
         self._running = True
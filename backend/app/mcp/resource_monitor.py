@@ -0,0 +1,171 @@
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Literal
+
+import psutil
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.models.mcp.server import MCPServerResourceSample
+
+logger = get_logger(__name__)
+
+# Set in the environment of every stdio MCP server so its process tree can be
+# told apart from other children of this process
+PROCESS_MARKER_ENV = "CENTROID_MCP_SERVER_ID"
+
+LimitStatus = Literal["ok", "soft", "hard"]
+
+
+class ResourceMonitor:
+    """
+    Samples CPU, memory, file descriptors and threads of MCP server processes.
+
+    Each stdio server is identified by the PROCESS_MARKER_ENV variable in its
+    environment; the sample covers that process and all of its descendants.
+    A bounded history of samples is kept per server.
+    """
+
+    def __init__(self, history_size: int | None = None):
+        self._history_size = history_size or settings.MCP_RESOURCE_HISTORY_SIZE
+        self._history: dict[str, deque[MCPServerResourceSample]] = {}
+        # psutil computes cpu_percent from the previous call on the same
+        # Process object, so the objects are kept between samples
+        self._processes: dict[int, psutil.Process] = {}
+        self._owners: dict[int, str | None] = {}
+
+    def _owner(self, process: psutil.Process) -> str | None:
+        """Return the MCP server ID a process was started for, if any."""
+        if process.pid not in self._owners:
+            try:
+                self._owners[process.pid] = process.environ().get(PROCESS_MARKER_ENV)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._owners[process.pid] = None
+        return self._owners[process.pid]
+
+    def _find_processes(self, server_ids: set[str]) -> dict[str, list[psutil.Process]]:
+        """Find the process trees of MCP servers among our descendants."""
+        children = psutil.Process().children(recursive=True)
+        live_pids = {child.pid for child in children}
+
+        # Drop bookkeeping for processes that have exited
+        for pid in set(self._processes) | set(self._owners):
+            if pid not in live_pids:
+                self._processes.pop(pid, None)
+                self._owners.pop(pid, None)
+
+        trees: dict[str, dict[int, psutil.Process]] = {}
+        for child in children:
+            owner = self._owner(child)
+            if owner not in server_ids:
+                continue
+            tree = trees.setdefault(owner, {})
+            tree[child.pid] = child
+            try:
+                for descendant in child.children(recursive=True):
+                    tree[descendant.pid] = descendant
+            except psutil.NoSuchProcess:
+                continue
+
+        return {
+            server_id: [
+                self._processes.setdefault(pid, proc) for pid, proc in tree.items()
+            ]
+            for server_id, tree in trees.items()
+        }
+
+    def _measure(self, processes: list[psutil.Process]) -> MCPServerResourceSample:
+        cpu_percent = 0.0
+        rss_bytes = open_fds = threads = 0
+        counted = 0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    cpu_percent += process.cpu_percent(interval=None)
+                    rss_bytes += process.memory_info().rss
+                    threads += process.num_threads()
+                    if hasattr(process, "num_fds"):
+                        open_fds += process.num_fds()
+                counted += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+        return MCPServerResourceSample(
+            timestamp=datetime.now(),
+            processes=counted,
+            cpu_percent=round(cpu_percent, 2),
+            rss_bytes=rss_bytes,
+            open_fds=open_fds,
+            threads=threads,
+        )
+
+    def sample_all(
+        self, server_ids: Iterable[str]
+    ) -> dict[str, MCPServerResourceSample]:
+        """
+        Measure the process trees of MCP servers and add them to their history.
+
+        The descendants of this process are listed once for all servers. This
+        blocks on psutil, so async callers should run it in a thread.
+
+        Args:
+            server_ids: The IDs of the MCP servers
+
+        Returns:
+            The samples by server ID, without the servers no process was found for
+        """
+        samples = {}
+        for server_id, processes in self._find_processes(set(server_ids)).items():
+            sample = self._measure(processes)
+            history = self._history.setdefault(
+                server_id, deque(maxlen=self._history_size)
+            )
+            history.append(sample)
+            samples[server_id] = sample
+        return samples
+
+    def sample(self, server_id: str) -> MCPServerResourceSample | None:
+        """
+        Measure the process tree of an MCP server and add it to its history.
+
+        Args:
+            server_id: The ID of the MCP server
+
+        Returns:
+            The sample, or None if no process was found for the server
+        """
+        return self.sample_all([server_id]).get(server_id)
+
+    def history(self, server_id: str) -> list[MCPServerResourceSample]:
+        """Get the retained samples for an MCP server, oldest first."""
+        return list(self._history.get(server_id, ()))
+
+    def forget(self, server_id: str) -> None:
+        """Drop the history of an MCP server that has been removed."""
+        self._history.pop(server_id, None)
+
+    def check_limits(self, sample: MCPServerResourceSample) -> LimitStatus:
+        """Compare a sample against the configured soft and hard limits."""
+        rss_mb = sample.rss_bytes / (1024 * 1024)
+
+        def exceeds(value: float, limit: float | None) -> bool:
+            return limit is not None and value > limit
+
+        if (
+            exceeds(rss_mb, settings.MCP_PROCESS_RSS_HARD_LIMIT_MB)
+            or exceeds(sample.open_fds, settings.MCP_PROCESS_FDS_HARD_LIMIT)
+            or exceeds(sample.cpu_percent, settings.MCP_PROCESS_CPU_HARD_LIMIT_PERCENT)
+        ):
+            return "hard"
+        if (
+            exceeds(rss_mb, settings.MCP_PROCESS_RSS_SOFT_LIMIT_MB)
+            or exceeds(sample.open_fds, settings.MCP_PROCESS_FDS_SOFT_LIMIT)
+            or exceeds(sample.cpu_percent, settings.MCP_PROCESS_CPU_SOFT_LIMIT_PERCENT)
+        ):
+            return "soft"
+        return "ok"
+
+
+# Global resource monitor instance
+resource_monitor = ResourceMonitor()
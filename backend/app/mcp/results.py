@@ -0,0 +1,182 @@
+import json
+import uuid
+from typing import Any
+
+from mcp.types import TextContent
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.models.mcp.server import MCPServer
+
+logger = get_logger(__name__)
+
+# Name of the tool every proxied server exposes to page through truncated results
+FETCH_CHUNK_TOOL = "fetch_result_chunk"
+
+CHUNK_KEY_PREFIX = "mcp:result-chunks:"
+
+
+def max_result_size(mcp_server: MCPServer) -> int | None:
+    """
+    The largest result, in characters, a server may return inline.
+
+    Servers override the global MCP_MAX_RESULT_SIZE with `max_result_size` in
+    their settings; 0 or None disables the limit.
+    """
+    server_settings = mcp_server.settings or {}
+    limit = server_settings.get("max_result_size", settings.MCP_MAX_RESULT_SIZE)
+    return int(limit) if limit else None
+
+
+def _content_text(content: BaseModel) -> str:
+    """The splittable payload of a content item."""
+    if isinstance(content, TextContent):
+        return content.text
+    return content.model_dump_json()
+
+
+class BoundedResult:
+    """A tool result cut down to a size limit, with the remainder stored in chunks."""
+
+    def __init__(
+        self,
+        content: list[dict[str, Any]],
+        token: str | None = None,
+        chunks: int = 0,
+        remaining: int = 0,
+    ):
+        self.content = content
+        self.token = token
+        self.chunks = chunks
+        self.remaining = remaining
+
+    @property
+    def continuation(self) -> dict[str, Any] | None:
+        if not self.token:
+            return None
+        return {
+            "token": self.token,
+            "chunks": self.chunks,
+            "remaining": self.remaining,
+        }
+
+
+async def bound_result(
+    redis: Redis,
+    server_id: str,
+    contents: list[BaseModel],
+    limit: int | None,
+    chunk_size: int | None = None,
+) -> BoundedResult:
+    """
+    Serialize a tool result, moving everything past `limit` into Redis chunks.
+
+    Text is split at the limit; other content types are kept whole inline while
+    they fit and are otherwise stored as their JSON. The caller gets the inline
+    part plus a notice telling it how to fetch the rest with FETCH_CHUNK_TOOL.
+
+    Args:
+        redis: The Redis client to store chunks in
+        server_id: The ID of the MCP server that produced the result
+        contents: The content items returned by the upstream server
+        limit: Maximum characters of the inline result, None for no limit
+        chunk_size: Characters in each stored chunk
+
+    Returns:
+        BoundedResult: The inline content and the continuation, if any
+    """
+    if limit is None or sum(len(_content_text(c)) for c in contents) <= limit:
+        return BoundedResult([content.model_dump(mode="json") for content in contents])
+
+    chunk_size = chunk_size or settings.MCP_RESULT_CHUNK_SIZE
+    token = uuid.uuid4().hex
+    inline: list[dict[str, Any]] = []
+    budget = limit
+    chunks = 0
+    remaining = 0
+
+    for content in contents:
+        text = _content_text(content)
+        if len(text) <= budget:
+            inline.append(content.model_dump(mode="json"))
+            budget -= len(text)
+            continue
+
+        if budget and isinstance(content, TextContent):
+            inline.append({"type": "text", "text": text[:budget]})
+            text = text[budget:]
+        budget = 0
+
+        for start in range(0, len(text), chunk_size):
+            await redis.set(
+                f"{CHUNK_KEY_PREFIX}{token}:{chunks}",
+                text[start : start + chunk_size],
+                ex=settings.MCP_RESULT_CHUNK_TTL,
+            )
+            chunks += 1
+        remaining += len(text)
+
+    await redis.set(
+        f"{CHUNK_KEY_PREFIX}{token}",
+        json.dumps({"server_id": server_id, "chunks": chunks}),
+        ex=settings.MCP_RESULT_CHUNK_TTL,
+    )
+    inline.append(
+        {
+            "type": "text",
+            "text": (
+                f"[Result truncated at {limit} characters, {remaining} remain in "
+                f"{chunks} chunks. Call the {FETCH_CHUNK_TOOL} tool with "
+                f'token "{token}" and index 0 to {chunks - 1} to read them.]'
+            ),
+        }
+    )
+    logger.info(
+        f"Truncated result from server {server_id}: {remaining} characters moved to {chunks} chunks"
+    )
+    return BoundedResult(inline, token=token, chunks=chunks, remaining=remaining)
+
+
+async def fetch_chunk(
+    redis: Redis, server_id: str, token: str, index: int
+) -> list[TextContent]:
+    """
+    Read one stored chunk of a truncated result.
+
+    Args:
+        redis: The Redis client the chunks are stored in
+        server_id: The ID of the MCP server the chunk is requested through
+        token: The continuation token from the truncation notice
+        index: The zero-based chunk index
+
+    Returns:
+        list[TextContent]: The chunk, followed by a pointer to the next one
+
+    Raises:
+        ValueError: If the token is unknown, expired, from another server, or
+            the index is out of range
+    """
+    meta = await redis.get(f"{CHUNK_KEY_PREFIX}{token}")
+    if not meta:
+        raise ValueError(f"Unknown or expired continuation token {token}")
+    meta = json.loads(meta)
+    if meta["server_id"] != server_id:
+        raise ValueError(f"Continuation token {token} belongs to another server")
+    if not 0 <= index < meta["chunks"]:
+        raise ValueError(f"Chunk index must be between 0 and {meta['chunks'] - 1}")
+
+    chunk = await redis.get(f"{CHUNK_KEY_PREFIX}{token}:{index}")
+    if chunk is None:
+        raise ValueError(f"Chunk {index} of token {token} has expired")
+
+    contents = [TextContent(type="text", text=chunk)]
+    if index + 1 < meta["chunks"]:
+        contents.append(
+            TextContent(
+                type="text",
+                text=f"[Chunk {index + 1} of {meta['chunks']}, next index is {index + 1}.]",
+            )
+        )
+    return contents
@@ -0,0 +1,345 @@
+import random
+import re
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.utils import percentile
+from app.models.mcp.stats import MCPServerStats, MCPServerStatsPoint
+
+logger = get_logger(__name__)
+
+MINUTE = 60
+HOUR = 3600
+
+_RANGE_PATTERN = re.compile(r"^(\d+)([mhd])$")
+_RANGE_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_range(value: str) -> timedelta:
+    """
+    Parse a stats range such as "30m", "6h" or "7d".
+
+    Raises:
+        ValueError: If the range is malformed or empty
+    """
+    match = _RANGE_PATTERN.match(value)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(
+            f"Invalid range {value!r}, expected a number followed by m, h or d"
+        )
+    return timedelta(**{_RANGE_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def bucket_start(timestamp: datetime, resolution: int) -> datetime:
+    """The start of the bucket of `resolution` seconds containing a timestamp."""
+    epoch = int(timestamp.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % resolution, timezone.utc)
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # SQLite drops the timezone of stored timestamps, which are all UTC
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def merge_points(
+    points: Iterable[MCPServerStatsPoint], start: datetime, resolution: int
+) -> MCPServerStatsPoint:
+    """
+    Combine buckets into one covering all of them.
+
+    Exact percentiles cannot be recovered from aggregates: the median is the
+    call-weighted mean of the medians, and p95, p99 and max are the largest of
+    the merged values, which makes them upper bounds.
+    """
+    merged = MCPServerStatsPoint(bucket_start=start, resolution=resolution)
+    weighted_p50 = 0.0
+    for point in points:
+        merged.calls += point.calls
+        merged.errors += point.errors
+        merged.restarts += point.restarts
+        if point.latency_p50_ms is not None:
+            weighted_p50 += point.latency_p50_ms * point.calls
+        for field in ("latency_p95_ms", "latency_p99_ms", "latency_max_ms"):
+            value = getattr(point, field)
+            if value is not None:
+                current = getattr(merged, field)
+                setattr(
+                    merged, field, value if current is None else max(current, value)
+                )
+    if merged.calls:
+        merged.latency_p50_ms = round(weighted_p50 / merged.calls, 3)
+    return merged
+
+
+class _OpenBucket:
+    """The minute currently being recorded for one server."""
+
+    def __init__(self, start: datetime, max_samples: int):
+        self.start = start
+        self.calls = 0
+        self.errors = 0
+        self.restarts = 0
+        self.max_latency = 0.0
+        # Reservoir sample of latencies, so busy servers stay bounded
+        self.latencies: list[float] = []
+        self._max_samples = max_samples
+
+    def record_call(self, latency_ms: float, ok: bool) -> None:
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+        self.max_latency = max(self.max_latency, latency_ms)
+        if len(self.latencies) < self._max_samples:
+            self.latencies.append(latency_ms)
+        else:
+            slot = random.randrange(self.calls)
+            if slot < self._max_samples:
+                self.latencies[slot] = latency_ms
+
+    def to_point(self) -> MCPServerStatsPoint:
+        point = MCPServerStatsPoint(
+            bucket_start=self.start,
+            resolution=MINUTE,
+            calls=self.calls,
+            errors=self.errors,
+            restarts=self.restarts,
+        )
+        if self.latencies:
+            point.latency_p50_ms = round(percentile(self.latencies, 50), 3)
+            point.latency_p95_ms = round(percentile(self.latencies, 95), 3)
+            point.latency_p99_ms = round(percentile(self.latencies, 99), 3)
+            point.latency_max_ms = round(self.max_latency, 3)
+        return point
+
+
+class ServerStatsHistory:
+    """
+    Per-minute history of proxy calls, errors, latencies and restarts.
+
+    Recent minutes live in a bounded ring per server. compact() periodically
+    writes closed minutes to the mcp_server_stats table, folds minutes older
+    than MCP_STATS_MINUTE_RETENTION_HOURS into hourly rows and drops hourly
+    rows older than MCP_STATS_HOUR_RETENTION_DAYS.
+    """
+
+    def __init__(
+        self,
+        history_minutes: int | None = None,
+        latency_samples: int | None = None,
+        clock: Callable[[], datetime] | None = None,
+    ):
+        self._history_minutes = history_minutes or settings.MCP_STATS_HISTORY_MINUTES
+        self._latency_samples = latency_samples or settings.MCP_STATS_LATENCY_SAMPLES
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._open: dict[str, _OpenBucket] = {}
+        self._ring: dict[str, deque[MCPServerStatsPoint]] = {}
+        # Newest minute of each server already written to the database
+        self._compacted_until: dict[str, datetime] = {}
+
+    def _bucket(self, server_id: str) -> _OpenBucket:
+        """The open bucket of a server, closing the previous one on a new minute."""
+        start = bucket_start(self._clock(), MINUTE)
+        bucket = self._open.get(server_id)
+        if bucket is None or bucket.start != start:
+            if bucket is not None:
+                self._close(server_id, bucket)
+            bucket = self._open[server_id] = _OpenBucket(start, self._latency_samples)
+        return bucket
+
+    def _close(self, server_id: str, bucket: _OpenBucket) -> None:
+        ring = self._ring.setdefault(server_id, deque(maxlen=self._history_minutes))
+        ring.append(bucket.to_point())
+
+    def record_call(self, server_id: str, latency: float, ok: bool) -> None:
+        """Count a completed tool call, with its latency in seconds."""
+        self._bucket(server_id).record_call(latency * 1000, ok)
+
+    def record_restart(self, server_id: str) -> None:
+        """Count a restart of an MCP server."""
+        self._bucket(server_id).restarts += 1
+
+    def forget(self, server_id: str) -> None:
+        """Drop the history of an MCP server that has been removed."""
+        self._open.pop(server_id, None)
+        self._ring.pop(server_id, None)
+        self._compacted_until.pop(server_id, None)
+
+    def _roll(self) -> None:
+        """Close every open bucket whose minute has passed."""
+        start = bucket_start(self._clock(), MINUTE)
+        for server_id, bucket in list(self._open.items()):
+            if bucket.start != start:
+                self._close(server_id, bucket)
+                del self._open[server_id]
+
+    def _uncompacted(self, server_id: str) -> list[MCPServerStatsPoint]:
+        """Minutes of a server not yet in the database, including the open one."""
+        self._roll()
+        compacted_until = self._compacted_until.get(server_id)
+        points = [
+            point
+            for point in self._ring.get(server_id, ())
+            if compacted_until is None or point.bucket_start > compacted_until
+        ]
+        if server_id in self._open:
+            points.append(self._open[server_id].to_point())
+        return points
+
+    def compact(self, session: Session, include_open: bool = False) -> int:
+        """
+        Write closed minutes to the database and downsample old ones.
+
+        Args:
+            session: Database session to write with
+            include_open: Also write the minute still being recorded, for shutdown
+
+        Returns:
+            int: Number of minute buckets written
+        """
+        self._roll()
+        if include_open:
+            for server_id, bucket in list(self._open.items()):
+                self._close(server_id, bucket)
+            self._open.clear()
+
+        written = 0
+        # Only advanced once the buckets are committed, so a failed commit
+        # writes them again on the next compaction
+        compacted: dict[str, datetime] = {}
+        for server_id, ring in self._ring.items():
+            compacted_until = self._compacted_until.get(server_id)
+            for point in ring:
+                if (
+                    compacted_until is not None
+                    and point.bucket_start <= compacted_until
+                ):
+                    continue
+                self._upsert(session, server_id, point)
+                written += 1
+            if ring:
+                compacted[server_id] = ring[-1].bucket_start
+
+        now = self._clock()
+        downsampled = self._downsample(
+            session,
+            bucket_start(
+                now - timedelta(hours=settings.MCP_STATS_MINUTE_RETENTION_HOURS), HOUR
+            ),
+        )
+        expired = session.exec(
+            select(MCPServerStats).where(
+                col(MCPServerStats.resolution) == HOUR,
+                col(MCPServerStats.bucket_start)
+                < now - timedelta(days=settings.MCP_STATS_HOUR_RETENTION_DAYS),
+            )
+        ).all()
+        for row in expired:
+            session.delete(row)
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        self._compacted_until.update(compacted)
+        logger.info(
+            f"Compacted server stats: {written} minute buckets written, "
+            f"{downsampled} downsampled to hours"
+        )
+        return written
+
+    def _upsert(
+        self, session: Session, server_id: str, point: MCPServerStatsPoint
+    ) -> None:
+        """Add a bucket to the database, merging it into an existing row."""
+        row = session.get(
+            MCPServerStats, (server_id, point.resolution, point.bucket_start)
+        )
+        if row is not None:
+            point = merge_points(
+                [MCPServerStatsPoint.model_validate(row), point],
+                point.bucket_start,
+                point.resolution,
+            )
+            session.delete(row)
+            session.flush()
+        session.add(
+            MCPServerStats(server_id=server_id, **point.model_dump(by_alias=False))
+        )
+
+    def _downsample(self, session: Session, cutoff: datetime) -> int:
+        """Fold minute rows older than `cutoff` into hourly rows."""
+        rows = session.exec(
+            select(MCPServerStats).where(
+                col(MCPServerStats.resolution) == MINUTE,
+                col(MCPServerStats.bucket_start) < cutoff,
+            )
+        ).all()
+        hours: dict[tuple[str, datetime], list[MCPServerStatsPoint]] = {}
+        for row in rows:
+            point = MCPServerStatsPoint.model_validate(row)
+            point.bucket_start = _as_utc(point.bucket_start)
+            hour = bucket_start(point.bucket_start, HOUR)
+            hours.setdefault((row.server_id, hour), []).append(point)
+            session.delete(row)
+        session.flush()
+
+        for (server_id, hour), points in hours.items():
+            self._upsert(session, server_id, merge_points(points, hour, HOUR))
+        return len(rows)
+
+    def query(
+        self, session: Session, server_id: str, span: timedelta
+    ) -> tuple[int, list[MCPServerStatsPoint]]:
+        """
+        Get the stats history of a server, oldest first.
+
+        Spans within MCP_STATS_MINUTE_RETENTION_HOURS are served per minute,
+        longer ones per hour.
+
+        Args:
+            session: Database session to read compacted buckets from
+            server_id: The ID of the MCP server
+            span: How far back to look
+
+        Returns:
+            tuple[int, list[MCPServerStatsPoint]]: The resolution and the buckets
+        """
+        resolution = (
+            MINUTE
+            if span <= timedelta(hours=settings.MCP_STATS_MINUTE_RETENTION_HOURS)
+            else HOUR
+        )
+        since = bucket_start(self._clock() - span, resolution)
+
+        rows = session.exec(
+            select(MCPServerStats).where(
+                MCPServerStats.server_id == server_id,
+                col(MCPServerStats.bucket_start) >= since,
+            )
+        ).all()
+        minutes = [MCPServerStatsPoint.model_validate(row) for row in rows]
+        minutes.extend(self._uncompacted(server_id))
+
+        buckets: dict[datetime, list[MCPServerStatsPoint]] = {}
+        for point in minutes:
+            point.bucket_start = _as_utc(point.bucket_start)
+            if point.bucket_start < since or point.resolution > resolution:
+                continue
+            start = bucket_start(point.bucket_start, resolution)
+            buckets.setdefault(start, []).append(point)
+
+        return resolution, [
+            merge_points(points, start, resolution)
+            for start, points in sorted(buckets.items())
+        ]
+
+
+# Global stats history instance
+server_stats = ServerStatsHistory()
@@ -0,0 +1,119 @@
+import json
+import random
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic_core import to_json
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def argument_shape(value: Any) -> Any:
+    """
+    Reduce tool call arguments to their structure, dropping the values.
+
+    Strings, numbers and other scalars become their type name; dicts keep their
+    keys and lists are described by their first item.
+    """
+    if isinstance(value, dict):
+        return {key: argument_shape(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [argument_shape(value[0])] if value else []
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+
+def result_size(result: Any) -> int:
+    """Size in bytes of a tool result once serialized to JSON."""
+    try:
+        return len(to_json(result, fallback=str))
+    except Exception:
+        return 0
+
+
+class TrafficRecorder:
+    """
+    Writes a sample of proxied tool calls to an NDJSON trace.
+
+    Each line records when the call started, the server and tool, the shape of
+    the arguments, the latency, the result size and whether the call succeeded.
+    Argument values and results themselves are never written.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        sample_rate: float | None = None,
+        enabled: bool | None = None,
+    ):
+        self.path = Path(path or settings.mcp_trace_path)
+        self.sample_rate = (
+            settings.MCP_TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.enabled = settings.MCP_TRACE_ENABLED if enabled is None else enabled
+        self._file: IO[str] | None = None
+
+    def should_record(self) -> bool:
+        """Decide whether the next call is part of the sample."""
+        return self.enabled and random.random() < self.sample_rate
+
+    def record(
+        self,
+        server_id: str,
+        tool_name: str,
+        arguments: dict[str, Any],
+        started_at: float,
+        latency: float,
+        result: Any,
+        ok: bool,
+    ) -> None:
+        """
+        Append one tool call to the trace.
+
+        Args:
+            server_id: The ID of the MCP server
+            tool_name: The name of the tool called
+            arguments: The call arguments, only their shape is written
+            started_at: Epoch time the call started
+            latency: Seconds the call took
+            result: The tool result, only its size is written
+            ok: Whether the call succeeded
+        """
+        entry = {
+            "ts": round(started_at, 6),
+            "server": server_id,
+            "tool": tool_name,
+            "args": argument_shape(arguments),
+            "latency_ms": round(latency * 1000, 3),
+            "result_bytes": result_size(result),
+            "ok": ok,
+        }
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+                logger.info(f"Recording sampled tool calls to {self.path}")
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+        except OSError as e:
+            logger.error(f"Error writing tool call trace to {self.path}: {e}")
+
+    def close(self) -> None:
+        """Close the trace file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# Global traffic recorder instance
+traffic_recorder = TrafficRecorder()
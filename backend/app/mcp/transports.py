@@ -0,0 +1,225 @@
+import contextlib
+from collections.abc import AsyncIterator
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+from fastmcp.client.transports import (
+    ClientTransport,
+    FastMCPTransport,
+    SessionKwargs,
+    SSETransport,
+    StdioTransport,
+    StreamableHttpTransport,
+)
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from typing_extensions import Unpack
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.openapi.server import create_openapi_server
+from app.mcp.resource_monitor import PROCESS_MARKER_ENV
+from app.models.mcp.server import MCPServer
+from app.models.mcp.template import MCPTemplateKind
+
+logger = get_logger(__name__)
+
+# Transports that talk to a hosted MCP endpoint instead of a local subprocess
+SSE_TRANSPORTS = {"sse"}
+STREAMABLE_HTTP_TRANSPORTS = {"http", "streamable-http", "streamable_http"}
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper handed to per-session httpx clients.
+
+    The MCP client libraries close their httpx client when a session ends, which
+    would also close the pooled connections. This wrapper leaves the underlying
+    transport open so the pool outlives individual sessions.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # The pool owns the underlying transport
+        pass
+
+
+class HTTPConnectionPool:
+    """Keep-alive connection pools for remote MCP upstreams, one per origin."""
+
+    def __init__(self):
+        self._transports: dict[str, httpx.AsyncHTTPTransport] = {}
+
+    def _get_transport(self, url: str) -> httpx.AsyncHTTPTransport:
+        origin = _origin(url)
+        transport = self._transports.get(origin)
+        if transport is None:
+            logger.info(f"Creating MCP upstream connection pool for {origin}")
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.MCP_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.MCP_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._transports[origin] = transport
+        return transport
+
+    def client_factory(self, url: str):
+        """
+        Build an httpx client factory for the MCP client libraries.
+
+        Clients follow redirects, but drop their headers, which carry the
+        server's secrets, from requests redirected to another origin. httpx
+        itself only drops the Authorization header.
+        """
+        transport = _SharedTransport(self._get_transport(url))
+        origin = _origin(url)
+
+        def factory(
+            headers: dict[str, str] | None = None,
+            timeout: httpx.Timeout | None = None,
+            auth: httpx.Auth | None = None,
+        ) -> httpx.AsyncClient:
+            async def strip_cross_origin_headers(request: httpx.Request) -> None:
+                if _origin(str(request.url)) != origin:
+                    for name in headers or {}:
+                        request.headers.pop(name, None)
+
+            return httpx.AsyncClient(
+                transport=transport,
+                headers=headers,
+                timeout=timeout or httpx.Timeout(30.0),
+                auth=auth,
+                follow_redirects=True,
+                event_hooks={"request": [strip_cross_origin_headers]},
+            )
+
+        return factory
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        for origin, transport in list(self._transports.items()):
+            try:
+                await transport.aclose()
+            except Exception as e:
+                logger.error(f"Error closing connection pool for {origin}: {e}")
+        self._transports.clear()
+
+
+http_pool = HTTPConnectionPool()
+
+
+class PooledSSETransport(SSETransport):
+    """SSE transport whose HTTP connections come from the shared pool."""
+
+    @contextlib.asynccontextmanager
+    async def connect_session(
+        self, **session_kwargs: Unpack[SessionKwargs]
+    ) -> AsyncIterator[ClientSession]:
+        # Unlike the stock transport, incoming request headers are not
+        # forwarded, so our own credentials never reach third-party upstreams
+        client_kwargs: dict[str, Any] = {
+            "headers": self.headers,
+            "httpx_client_factory": http_pool.client_factory(self.url),
+        }
+        if self.sse_read_timeout is not None:
+            client_kwargs["sse_read_timeout"] = self.sse_read_timeout.total_seconds()
+        if session_kwargs.get("read_timeout_seconds") is not None:
+            client_kwargs["timeout"] = session_kwargs[
+                "read_timeout_seconds"
+            ].total_seconds()
+
+        async with sse_client(self.url, **client_kwargs) as transport:
+            read_stream, write_stream = transport
+            async with ClientSession(
+                read_stream, write_stream, **session_kwargs
+            ) as session:
+                yield session
+
+
+class PooledStreamableHttpTransport(StreamableHttpTransport):
+    """Streamable HTTP transport whose HTTP connections come from the shared pool."""
+
+    @contextlib.asynccontextmanager
+    async def connect_session(
+        self, **session_kwargs: Unpack[SessionKwargs]
+    ) -> AsyncIterator[ClientSession]:
+        client_kwargs: dict[str, Any] = {
+            "headers": self.headers,
+            "httpx_client_factory": http_pool.client_factory(self.url),
+        }
+        if self.sse_read_timeout is not None:
+            client_kwargs["sse_read_timeout"] = self.sse_read_timeout
+        if session_kwargs.get("read_timeout_seconds") is not None:
+            client_kwargs["timeout"] = session_kwargs["read_timeout_seconds"]
+
+        async with streamablehttp_client(self.url, **client_kwargs) as transport:
+            read_stream, write_stream, _ = transport
+            async with ClientSession(
+                read_stream, write_stream, **session_kwargs
+            ) as session:
+                yield session
+
+
+def is_remote(mcp_server: MCPServer) -> bool:
+    """Whether the server is reached over HTTP rather than a local subprocess."""
+    return bool(mcp_server.url) and (
+        mcp_server.transport in SSE_TRANSPORTS | STREAMABLE_HTTP_TRANSPORTS
+    )
+
+
+def create_transport(mcp_server: MCPServer) -> ClientTransport:
+    """
+    Build the client transport for an MCP server.
+
+    OpenAPI servers run in-process and are reached through memory streams.
+    Servers with a `url` and an HTTP transport are reached over SSE or streamable
+    HTTP, with their secrets sent as request headers. Everything else is spawned
+    as a stdio subprocess from its run configuration, with secrets in the env.
+
+    Args:
+        mcp_server: The MCP server to connect to
+
+    Returns:
+        ClientTransport: The transport for the server's client
+    """
+    if mcp_server.kind == MCPTemplateKind.OPENAPI:
+        return FastMCPTransport(create_openapi_server(mcp_server))
+
+    if is_remote(mcp_server):
+        headers = {
+            **((mcp_server.settings or {}).get("headers") or {}),
+            **(mcp_server.secrets or {}),
+        }
+        if mcp_server.transport in SSE_TRANSPORTS:
+            return PooledSSETransport(url=mcp_server.url, headers=headers)
+        return PooledStreamableHttpTransport(url=mcp_server.url, headers=headers)
+
+    if not mcp_server.run:
+        raise ValueError(
+            f"MCP server {mcp_server.id} has neither a run configuration nor a url"
+        )
+
+    return StdioTransport(
+        command=mcp_server.run.command,
+        cwd=mcp_server.run.cwd,
+        env={
+            **(mcp_server.run.env or {}),
+            **(mcp_server.secrets or {}),
+            PROCESS_MARKER_ENV: mcp_server.id,
+        },
+        args=mcp_server.run.args,
+    )
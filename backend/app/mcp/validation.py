@@ -0,0 +1,132 @@
+import hashlib
+import json
+import time
+from typing import Any
+
+from jsonschema import SchemaError
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.mcp.utils import LRUCache
+
+logger = get_logger(__name__)
+
+
+class ArgumentValidationError(ValueError):
+    """Raised when tool call arguments do not match the tool's input schema."""
+
+    def __init__(self, tool_name: str, errors: list[str]):
+        self.tool_name = tool_name
+        self.errors = errors
+        super().__init__(f"Invalid arguments for tool {tool_name}: {'; '.join(errors)}")
+
+
+# Compiled validators shared across servers, keyed by schema hash, since many
+# servers expose tools with identical schemas; the least recently used ones are
+# dropped past MCP_VALIDATOR_CACHE_SIZE
+_validator_cache: LRUCache = LRUCache(settings.MCP_VALIDATOR_CACHE_SIZE)
+
+
+def _schema_hash(schema: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+
+def compile_validator(schema: dict[str, Any] | None) -> Validator | None:
+    """
+    Compile a tool input schema into a reusable validator.
+
+    Args:
+        schema: The JSON schema of the tool's arguments
+
+    Returns:
+        The validator, or None if the schema is missing or itself invalid
+    """
+    if not schema:
+        return None
+
+    key = _schema_hash(schema)
+    if key in _validator_cache:
+        return _validator_cache[key]
+
+    validator_cls = validator_for(schema)
+    try:
+        validator_cls.check_schema(schema)
+        validator: Validator | None = validator_cls(schema)
+    except SchemaError as e:
+        logger.warning(f"Skipping argument validation for invalid schema: {e.message}")
+        validator = None
+
+    _validator_cache[key] = validator
+    return validator
+
+
+class ToolArgumentValidator:
+    """
+    Validates tool call arguments of one MCP server before they are queued.
+
+    Keeps counters of validated and rejected calls along with the total time
+    spent validating, which are reported in the server's stats.
+    """
+
+    def __init__(self):
+        self._validators: dict[str, Validator | None] = {}
+        self.validated = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def load(self, schemas: dict[str, dict[str, Any] | None]) -> None:
+        """
+        Compile the input schemas of a server's tools, replacing the previous set.
+
+        Args:
+            schemas: Input schema per tool name
+        """
+        self._validators = {
+            name: compile_validator(schema) for name, schema in schemas.items()
+        }
+        logger.debug(f"Compiled argument validators for {len(schemas)} tools")
+
+    def validate(self, tool_name: str, arguments: dict[str, Any]) -> None:
+        """
+        Check arguments against the tool's input schema.
+
+        Tools without a known or valid schema are let through unchecked.
+
+        Args:
+            tool_name: The name of the tool being called
+            arguments: The call arguments
+
+        Raises:
+            ArgumentValidationError: If the arguments do not match the schema
+        """
+        validator = self._validators.get(tool_name)
+        if validator is None:
+            return
+
+        start_time = time.perf_counter()
+        errors = sorted(validator.iter_errors(arguments), key=lambda e: list(e.path))
+        self.total_seconds += time.perf_counter() - start_time
+        self.validated += 1
+
+        if errors:
+            self.rejected += 1
+            raise ArgumentValidationError(
+                tool_name,
+                [
+                    f"{'/'.join(str(p) for p in error.path) or '<root>'}: {error.message}"
+                    for error in errors
+                ],
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Summarize validation counts and cost."""
+        return {
+            "validated": self.validated,
+            "rejected": self.rejected,
+            "total_seconds": round(self.total_seconds, 6),
+            "avg_microseconds": round(self.total_seconds / self.validated * 1e6, 2)
+            if self.validated
+            else None,
+        }
@@ -12,6 +12,7 @@ from .document import (
     DocumentUpdate,
 )
 from .item import Item, ItemBase, ItemCreate, ItemOut, ItemsOut, ItemUpdate
+from .mcp.catalog import MCPToolCatalog
 from .mcp.server import (
     MCPRunConfig,
     MCPServer,
@@ -19,13 +20,16 @@ from .mcp.server import (
     MCPServerCreate,
     MCPServerOut,
     MCPServerOutWithTemplate,
+    MCPServerResourceSample,
     MCPServersOut,
     MCPServersOutWithTemplate,
     MCPServerState,
     MCPServerStatus,
     MCPServerUpdate,
     MCPTool,
+    MCPToolCallOut,
 )
+from .mcp.stats import MCPServerStats, MCPServerStatsOut, MCPServerStatsPoint
 from .mcp.template import (
     MCPTemplate,
     MCPTemplateBase,
@@ -44,6 +48,7 @@ from .project import (
     ProjectUpdate,
 )
 from .secret import (
+    AuthType,
     Secret,
     SecretBase,
     SecretCreate,
@@ -188,6 +193,12 @@ __all__ = [
     "MCPServerStatus",
     "MCPServerOutWithTemplate",
     "MCPServersOutWithTemplate",
+    "MCPServerResourceSample",
+    "MCPToolCatalog",
+    "MCPServerStats",
+    "MCPServerStatsOut",
+    "MCPServerStatsPoint",
+    "MCPToolCallOut",
     "MCPRunConfig",
     "MCPTool",
     "MCPTemplate",
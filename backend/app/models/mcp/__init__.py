@@ -1,5 +1,6 @@
 """MCP-related models."""
 
+from app.models.mcp.catalog import MCPToolCatalog
 from app.models.mcp.server import (
     MCPRunConfig,
     MCPServer,
@@ -7,6 +8,7 @@ from app.models.mcp.server import (
     MCPServerCreate,
     MCPServerOut,
     MCPServerOutWithTemplate,
+    MCPServerResourceSample,
     MCPServerSearch,
     MCPServersOut,
     MCPServersOutWithTemplate,
@@ -14,6 +16,12 @@ from app.models.mcp.server import (
     MCPServerStatus,
     MCPServerUpdate,
     MCPTool,
+    MCPToolCallOut,
+)
+from app.models.mcp.stats import (
+    MCPServerStats,
+    MCPServerStatsOut,
+    MCPServerStatsPoint,
 )
 from app.models.mcp.template import (
     MCPTemplate,
@@ -43,6 +51,12 @@ __all__ = [
     "MCPServersOut",
     "MCPServerOutWithTemplate",
     "MCPServersOutWithTemplate",
+    "MCPServerResourceSample",
+    "MCPToolCatalog",
+    "MCPServerStats",
+    "MCPServerStatsOut",
+    "MCPServerStatsPoint",
+    "MCPToolCallOut",
     # Template models
     "MCPTemplateBase",
     "MCPTemplateCreate",
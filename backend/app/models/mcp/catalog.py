@@ -0,0 +1,42 @@
+"""Persisted snapshot of the tools an MCP server advertises."""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, Column, DateTime, func
+from sqlmodel import Field, SQLModel
+
+
+class MCPToolCatalog(SQLModel, table=True):
+    """Last tool catalog discovered from a running MCP server."""
+
+    __tablename__ = "mcp_tool_catalogs"
+
+    server_id: str = Field(
+        primary_key=True,
+        foreign_key="mcp_servers.id",
+        ondelete="CASCADE",
+        description="ID of the MCP server the catalog belongs to",
+    )
+    tools: list[dict[str, Any]] = Field(
+        default_factory=list,
+        sa_column=Column(JSON),
+        description="Tool definitions as returned by list_tools",
+    )
+    content_hash: str = Field(description="SHA-256 of the canonical tool definitions")
+    updated_at: datetime = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": func.now(), "server_default": func.now()},
+        description="Timestamp when the catalog last changed",
+    )
+
+    @staticmethod
+    def compute_hash(tools: list[dict[str, Any]]) -> str:
+        """Hash tool definitions independently of their order."""
+        canonical = json.dumps(
+            sorted(tools, key=lambda tool: tool.get("name", "")), sort_keys=True
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
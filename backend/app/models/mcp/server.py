@@ -114,6 +114,10 @@ class MCPServerBase(CamelModel):
         default=MCPTemplateKind.OFFICIAL, description="Kind of MCP server", index=True
     )
     transport: str = Field(description="Transport type for the MCP server")
+    url: str | None = Field(
+        default=None,
+        description="URL of a hosted MCP endpoint, used by the sse and http transports",
+    )
     version: str = Field(description="Version of the MCP server")
     template_id: str | None = Field(
         default=None,
@@ -205,6 +209,23 @@ class MCPServerOut(MCPServerBase):
     instructions: str | None
 
 
+class MCPServerResourceSample(CamelModel):
+    """Resource usage of an MCP server's process tree at a point in time."""
+
+    timestamp: datetime = Field(description="When the sample was taken")
+    processes: int = Field(description="Number of processes in the tree")
+    cpu_percent: float = Field(description="CPU usage summed across processes")
+    rss_bytes: int = Field(description="Resident memory summed across processes")
+    open_fds: int = Field(description="Open file descriptors across processes")
+    threads: int = Field(description="Threads across processes")
+
+
+class MCPToolCallOut(CamelModel):
+    """A queued tool call whose events can be followed."""
+
+    request_id: str = Field(description="ID of the queued tool call")
+
+
 class MCPServersOut(CamelModel):
     """Model for MCP servers output."""
 
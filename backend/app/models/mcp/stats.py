@@ -0,0 +1,65 @@
+"""Time series of MCP proxy call statistics."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+from app.models.base import CamelModel
+
+
+class MCPServerStatsBase(CamelModel):
+    """Aggregated proxy activity of an MCP server over one time bucket."""
+
+    calls: int = Field(default=0, description="Tool calls completed")
+    errors: int = Field(default=0, description="Tool calls that failed")
+    restarts: int = Field(default=0, description="Times the server was restarted")
+    latency_p50_ms: float | None = Field(
+        default=None, description="Median tool call latency"
+    )
+    latency_p95_ms: float | None = Field(
+        default=None, description="95th percentile tool call latency"
+    )
+    latency_p99_ms: float | None = Field(
+        default=None, description="99th percentile tool call latency"
+    )
+    latency_max_ms: float | None = Field(
+        default=None, description="Slowest tool call latency"
+    )
+
+
+class MCPServerStats(MCPServerStatsBase, SQLModel, table=True):
+    """Compacted stats bucket of an MCP server."""
+
+    __tablename__ = "mcp_server_stats"
+
+    server_id: str = Field(
+        primary_key=True,
+        foreign_key="mcp_servers.id",
+        ondelete="CASCADE",
+        description="ID of the MCP server the bucket belongs to",
+    )
+    resolution: int = Field(
+        primary_key=True, description="Length of the bucket in seconds"
+    )
+    bucket_start: datetime = Field(
+        primary_key=True,
+        sa_type=DateTime(timezone=True),
+        description="Start of the bucket, in UTC",
+    )
+
+
+class MCPServerStatsPoint(MCPServerStatsBase):
+    """One bucket of an MCP server's stats history."""
+
+    bucket_start: datetime = Field(description="Start of the bucket, in UTC")
+    resolution: int = Field(description="Length of the bucket in seconds")
+
+
+class MCPServerStatsOut(CamelModel):
+    """Stats history of an MCP server over a requested range."""
+
+    server_id: str
+    range: str
+    resolution: int
+    data: list[MCPServerStatsPoint]
@@ -1,6 +1,7 @@
 """Model for secrets."""
 
 from datetime import datetime
+from enum import Enum
 from typing import TYPE_CHECKING
 
 import nanoid
@@ -35,6 +36,15 @@ def decrypt_string(encrypted_data: str) -> str:
     return f.decrypt(encrypted_data.encode()).decode()
 
 
+class AuthType(str, Enum):
+    """Kinds of credentials an API connection authenticates with."""
+
+    TOKEN = "token"
+    API_KEY = "api_key"
+    BASIC = "basic"
+    OAUTH2 = "oauth2"
+
+
 class SecretBase(CamelModel):
     """Base model for secrets."""
 
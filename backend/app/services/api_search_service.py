@@ -1,23 +1,38 @@
+import hashlib
 import json
+import time
+import uuid
+from collections.abc import Callable
+from enum import Enum
+from itertools import islice
 from pathlib import Path
 
 import chromadb
+from chromadb.api.models.Collection import Collection
+from chromadb.api.types import EmbeddingFunction
 from chromadb.config import Settings
-from pydantic import BaseModel
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from pydantic import BaseModel, ValidationError
 
 from app.core.config import settings
 from app.core.logger import get_logger
-from app.services.utils import APIEndpoint, parse_api_collection
+from app.services.file_service import original_filename
+from app.services.fts_index import EndpointFTSIndex
+from app.services.utils import APIEndpoint, iter_api_collection
 
 logger = get_logger(__name__, service="api_search_service")
 
 
 class ChromaDBMetadata(BaseModel):
     file_id: str
+    # The API collection the endpoint belongs to, shared by all of its uploads
+    source: str | None = None
     method: str | None = None
     url: str | None = None
     name: str | None = None
     folder: str | None = None
+    # Hash of the endpoint document, to re-embed only endpoints that changed
+    hash: str | None = None
 
 
 # Initialize ChromaDB client
@@ -25,78 +40,212 @@ chroma_client = chromadb.PersistentClient(
     path=str(Path(settings.UPLOAD_DIR) / ".chromadb"),
     settings=Settings(anonymized_telemetry=False),
 )
+embedding_function: EmbeddingFunction = DefaultEmbeddingFunction()
+# Keyword index of the same endpoints, for exact path and name queries
+fts_index = EndpointFTSIndex(Path(settings.UPLOAD_DIR) / ".fts" / "endpoints.db")
 
 
-def store_embeddings(project_id: str, file_id: str, content: dict):
-    """Store endpoints in ChromaDB with their embeddings."""
-    try:
-        # First check if this is a supported API collection
-        if not isinstance(content, dict) or not (
-            content.get("info", {})
-            .get("schema", "")
-            .startswith("https://schema.getpostman.com")
-            or content.get("openapi")
-            or content.get("swagger")
-        ):
-            logger.warning(f"Unsupported API collection format for file_id: {file_id}")
-            return
+class SearchMode(str, Enum):
+    """How endpoints are ranked against a query."""
 
-        # Parse the collection
-        endpoints = parse_api_collection(content)
-        if not endpoints:
-            logger.warning(f"No endpoints found in collection for file_id: {file_id}")
-            return
+    SEMANTIC = "semantic"
+    FTS = "fts"
+    HYBRID = "hybrid"
 
-        logger.info(f"Found {len(endpoints)} API endpoints to process")
 
-        collection = chroma_client.get_or_create_collection(
-            name=project_id,
-            metadata={"hnsw:space": "cosine"},
-        )
+class EndpointMatch(BaseModel):
+    id: str
+    document: str
+    metadata: dict
+    # Cosine distance in semantic mode, lower is better. BM25 score in fts
+    # mode and reciprocal rank fusion score in hybrid mode, higher is better
+    score: float
+    # 1-based rank of the endpoint in the semantic and fts rankings
+    ranks: dict[str, int] = {}
+
+
+class EmbeddingResult(BaseModel):
+    endpoints: int = 0
+    # Endpoints already embedded with the same content, and embedded
+    # endpoints that are no longer in the collection
+    unchanged: int = 0
+    removed: int = 0
+    # Endpoints that could not be read, with the first few of their errors
+    skipped: int = 0
+    errors: list[str] = []
+    # Seconds spent extracting endpoints and embedding them into ChromaDB
+    extract_seconds: float = 0.0
+    embed_seconds: float = 0.0
+
+
+# Endpoint errors kept per file, the rest are only counted
+MAX_ENDPOINT_ERRORS = 20
+
+
+def get_collection(project_id: str) -> Collection:
+    return chroma_client.get_or_create_collection(
+        name=project_id,
+        metadata={"hnsw:space": "cosine"},
+        embedding_function=embedding_function,
+    )
+
+
+# Share of the indexed endpoints of a collection that an upload can remove
+# before it is logged as a warning
+REMOVAL_WARNING_RATIO = 0.5
+
+
+def collection_source(file_id: str, content: dict) -> str:
+    """
+    Key of the API collection a file holds, shared by its re-uploads.
+
+    Unrelated specs often share a file name such as openapi.json, so the key
+    is the name the file was uploaded with, whatever its timestamp prefix,
+    and the Postman collection id or the spec title.
+    """
+    info = content.get("info")
+    info = info if isinstance(info, dict) else {}
+    identity = info.get("_postman_id") or info.get("title") or info.get("name")
+    filename = original_filename(file_id)
+    return f"{filename}:{identity}" if identity else filename
+
+
+def indexed_endpoints(collection: Collection, source: str) -> dict[str, dict]:
+    """Metadata of the embedded endpoints of every upload of a collection, by id."""
+    indexed = collection.get(where={"source": source}, include=["metadatas"])
+    return dict(zip(indexed["ids"], indexed["metadatas"], strict=True))
+
+
+def store_embeddings(
+    project_id: str,
+    file_id: str,
+    content: dict,
+    on_progress: Callable[[EmbeddingResult], None] | None = None,
+) -> EmbeddingResult:
+    """
+    Store endpoints in ChromaDB with their embeddings.
+
+    Endpoints are extracted and embedded in batches, calling `on_progress`
+    after each one. Endpoints that cannot be read are skipped.
 
-        # Process endpoints in smaller batches to prevent memory issues
-        batch_size = 50
-        for i in range(0, len(endpoints), batch_size):
-            batch = endpoints[i : i + batch_size]
-            documents = []
-            metadatas = []
-            ids = []
+    Re-uploads of a collection are indexed incrementally: endpoint documents
+    are keyed by the collection's source and the endpoint id and carry a hash
+    of their content, so only new and changed endpoints are embedded.
+    Unchanged endpoints are moved over to the new file_id, and endpoints
+    left over from earlier uploads of the collection are deleted. Endpoints
+    indexed before documents had a source are left to their file.
 
-            for endpoint in batch:
+    Raises:
+        ValueError: If the content is not a supported API collection
+    """
+    # First check if this is a supported API collection
+    if not isinstance(content, dict) or not (
+        content.get("info", {})
+        .get("schema", "")
+        .startswith("https://schema.getpostman.com")
+        or content.get("openapi")
+        or content.get("swagger")
+    ):
+        raise ValueError(f"Unsupported API collection format for file_id: {file_id}")
+
+    source = collection_source(file_id, content)
+    collection = get_collection(project_id)
+    indexed = indexed_endpoints(collection, source)
+    seen: set[str] = set()
+
+    # Endpoints are extracted and stored in smaller batches to prevent
+    # memory issues with large specs
+    result = EmbeddingResult()
+    endpoints = iter_api_collection(content, file_id)
+    batch_size = 50
+    while True:
+        started = time.perf_counter()
+        batch = list(islice(endpoints, batch_size))
+        if not batch:
+            break
+        documents = []
+        metadatas = []
+        ids = []
+        moved_metadatas = []
+        moved_ids = []
+
+        for endpoint in batch:
+            try:
                 endpoint_model = APIEndpoint(**endpoint)
-                # Use the request object to access method and url
-                doc_id = f"{file_id}_{endpoint_model.id}"
-
-                # Serialize the entire endpoint model to JSON
-                doc_text = json.dumps(endpoint_model.model_dump(), indent=2)
-
-                metadata = ChromaDBMetadata(
-                    file_id=file_id,
-                    method=endpoint_model.request.method,
-                    url="/".join(endpoint_model.request.url.path)
-                    or "",  # Use raw URL string
-                    name=endpoint_model.request.name or endpoint_model.name,
-                    folder=endpoint_model.folder,  # Updated to match the model field name
-                )
+            except ValidationError as e:
+                result.skipped += 1
+                if len(result.errors) < MAX_ENDPOINT_ERRORS:
+                    result.errors.append(f"{endpoint.get('name')}: {e}")
+                continue
+            url = "/".join(endpoint_model.request.url.path or [])
+            # Postman requests may have no id, fall back to method and path
+            endpoint_id = endpoint_model.id or str(
+                uuid.uuid5(uuid.NAMESPACE_URL, f"{endpoint_model.request.method} {url}")
+            )
+            doc_id = f"{source}_{endpoint_id}"
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
 
-                documents.append(doc_text)
-                metadatas.append(metadata.model_dump())
-                ids.append(doc_id)
+            # Serialize the entire endpoint model to JSON
+            doc_text = json.dumps(endpoint_model.model_dump(), indent=2)
 
-            # Add batch of documents to collection
-            if documents:
-                collection.add(documents=documents, metadatas=metadatas, ids=ids)
-                logger.debug(
-                    f"Processing API endpoints: {i + 1} to {min(i + batch_size, len(endpoints))} of {len(endpoints)}"
-                )
+            metadata = ChromaDBMetadata(
+                file_id=file_id,
+                source=source,
+                method=endpoint_model.request.method,
+                url=url,
+                name=endpoint_model.request.name or endpoint_model.name,
+                folder=endpoint_model.folder,  # Updated to match the model field name
+                hash=hashlib.sha256(doc_text.encode()).hexdigest(),
+            ).model_dump(exclude_none=True)
 
-        logger.info("Successfully processed and stored all API endpoints")
+            previous = indexed.get(doc_id)
+            if previous is not None and previous.get("hash") == metadata["hash"]:
+                result.unchanged += 1
+                if previous != metadata:
+                    moved_metadatas.append(metadata)
+                    moved_ids.append(doc_id)
+                continue
+            documents.append(doc_text)
+            metadatas.append(metadata)
+            ids.append(doc_id)
+        result.extract_seconds += time.perf_counter() - started
 
-    except Exception as e:
-        logger.error(
-            f"Error storing embeddings for file_id {file_id}: {str(e)}", exc_info=True
+        started = time.perf_counter()
+        if moved_ids:
+            # Metadata only, their embeddings are kept
+            collection.update(ids=moved_ids, metadatas=moved_metadatas)
+            fts_index.move(project_id, moved_ids, file_id)
+        if documents:
+            collection.upsert(documents=documents, metadatas=metadatas, ids=ids)
+            fts_index.upsert(project_id, ids, metadatas)
+            logger.debug(f"Embedded {len(documents)} API endpoints of {file_id}")
+        result.embed_seconds += time.perf_counter() - started
+        result.endpoints = len(seen)
+        if on_progress is not None:
+            on_progress(result)
+
+    removed = [doc_id for doc_id in indexed if doc_id not in seen]
+    if removed:
+        collection.delete(ids=removed)
+        fts_index.delete(project_id, ids=removed)
+        result.removed = len(removed)
+        if len(removed) > len(indexed) * REMOVAL_WARNING_RATIO:
+            logger.warning(
+                f"Upload {file_id} removed {len(removed)} of the {len(indexed)} "
+                f"endpoints indexed for {source}"
+            )
+
+    if not result.endpoints:
+        logger.warning(f"No endpoints found in collection for file_id: {file_id}")
+    else:
+        logger.info(
+            f"Successfully processed {result.endpoints} API endpoints for "
+            f"file_id: {file_id}, {result.endpoints - result.unchanged} embedded, "
+            f"{result.unchanged} unchanged and {result.removed} removed"
         )
-        logger.error(f"Error storing embeddings: {str(e)}")
+    return result
 
 
 def delete_embeddings(project_id: str, file_id: str):
@@ -105,8 +254,11 @@ def delete_embeddings(project_id: str, file_id: str):
         logger.info(
             f"Attempting to delete embeddings for file_id: {file_id} in project: {project_id}"
         )
-        collection = chroma_client.get_collection(name=project_id)
+        collection = chroma_client.get_collection(
+            name=project_id, embedding_function=embedding_function
+        )
         collection.delete(where={"file_id": file_id})
+        fts_index.delete(project_id, file_id=file_id)
         logger.info(f"Successfully deleted embeddings for file_id: {file_id}")
     except Exception as e:
         logger.error(
@@ -114,20 +266,92 @@ def delete_embeddings(project_id: str, file_id: str):
         )
 
 
+def _backfill_fts_index(collection: Collection, project_id: str) -> None:
+    """Index endpoints embedded before the keyword index existed."""
+    if fts_index.count(project_id) or not collection.count():
+        return
+    indexed = collection.get(include=["metadatas"])
+    fts_index.upsert(project_id, indexed["ids"], indexed["metadatas"])
+    logger.info(f"Indexed {len(indexed['ids'])} endpoints of {project_id} by keyword")
+
+
 def search_endpoints(
-    project_id: str, query: str, limit: int = 10, where: dict | None = None
-):
-    """Search for API endpoints using semantic similarity."""
-    collection = chroma_client.get_collection(name=project_id)
+    project_id: str,
+    query: str,
+    limit: int = 10,
+    where: dict | None = None,
+    mode: SearchMode = SearchMode.HYBRID,
+) -> list[EndpointMatch]:
+    """
+    Search for API endpoints, best matches first.
+
+    Semantic mode ranks endpoints by the similarity of their embeddings to
+    the query's, fts mode by the BM25 score of the query's words in their
+    method, path, name and folder. Hybrid mode fuses the two rankings of
+    the top SEARCH_CANDIDATES endpoints each with reciprocal rank fusion,
+    so exact path and operation name queries rank well along with loosely
+    worded ones.
+    """
+    collection = chroma_client.get_collection(
+        name=project_id, embedding_function=embedding_function
+    )
     logger.info(
-        f"Searching for {query} in {project_id} with limit {limit} and where {where}"
+        f"Searching for {query} in {project_id} with limit {limit}, "
+        f"mode {mode.value} and where {where}"
     )
+    candidates = max(limit, settings.SEARCH_CANDIDATES)
+    matches: dict[str, EndpointMatch] = {}
+    rankings: dict[str, list[str]] = {}
 
-    results = collection.query(
-        query_texts=[query],
-        n_results=limit,
-        where=where,
-        include=["documents", "metadatas", "distances"],
-    )
+    if mode in (SearchMode.SEMANTIC, SearchMode.HYBRID):
+        results = collection.query(
+            query_texts=[query],
+            n_results=limit if mode == SearchMode.SEMANTIC else candidates,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+        for doc_id, document, metadata, distance in zip(
+            results["ids"][0],
+            results["documents"][0],
+            results["metadatas"][0],
+            results["distances"][0],
+            strict=True,
+        ):
+            matches[doc_id] = EndpointMatch(
+                id=doc_id, document=document, metadata=metadata, score=distance
+            )
+        rankings[SearchMode.SEMANTIC.value] = results["ids"][0]
+
+    if mode in (SearchMode.FTS, SearchMode.HYBRID):
+        _backfill_fts_index(collection, project_id)
+        hits = dict(fts_index.search(project_id, query, candidates))
+        missing = [doc_id for doc_id in hits if doc_id not in matches]
+        if missing:
+            # Fetches the documents of keyword matches and applies the filter
+            found = collection.get(
+                ids=missing, where=where, include=["documents", "metadatas"]
+            )
+            for doc_id, document, metadata in zip(
+                found["ids"], found["documents"], found["metadatas"], strict=True
+            ):
+                matches[doc_id] = EndpointMatch(
+                    id=doc_id, document=document, metadata=metadata, score=0.0
+                )
+        ranking = [doc_id for doc_id in hits if doc_id in matches]
+        rankings[SearchMode.FTS.value] = ranking
+        if mode == SearchMode.FTS:
+            for doc_id in ranking:
+                matches[doc_id].score = hits[doc_id]
 
-    return results
+    for name, ranking in rankings.items():
+        for rank, doc_id in enumerate(ranking, start=1):
+            matches[doc_id].ranks[name] = rank
+    if mode == SearchMode.HYBRID:
+        for match in matches.values():
+            match.score = sum(
+                1 / (settings.SEARCH_RRF_K + rank) for rank in match.ranks.values()
+            )
+        ranked = sorted(matches.values(), key=lambda match: -match.score)
+    else:
+        ranked = [matches[doc_id] for doc_id in rankings[mode.value]]
+    return ranked[:limit]
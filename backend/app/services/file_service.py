@@ -1,3 +1,4 @@
+import re
 import shutil
 from datetime import datetime
 from pathlib import Path
@@ -9,6 +10,10 @@ from app.core.logger import get_logger
 
 logger = get_logger(__name__, service="file_service")
 
+# Uploads are saved as "<timestamp>_<filename>" so re-uploads never collide
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+TIMESTAMP_PREFIX = re.compile(r"^\d{8}_\d{6}_")
+
 
 async def upload_files_to_project(
     project_id: str, files: list[UploadFile]
@@ -23,7 +28,7 @@ async def upload_files_to_project(
 
     for upload_file in files:
         filename = Path(upload_file.filename).name
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
         safe_filename = f"{timestamp}_{filename}"
         file_path = upload_dir / safe_filename
 
@@ -49,3 +54,8 @@ def ensure_upload_dir(project_id: str) -> Path:
     upload_path = Path(settings.UPLOAD_DIR) / project_id
     upload_path.mkdir(parents=True, exist_ok=True)
     return upload_path
+
+
+def original_filename(safe_filename: str) -> str:
+    """The name a file was uploaded with, without its timestamp prefix."""
+    return TIMESTAMP_PREFIX.sub("", Path(safe_filename).name, count=1)
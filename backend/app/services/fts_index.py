@@ -0,0 +1,191 @@
+import hashlib
+import re
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+# Splits camelCase and snake_case operation names into words, so that
+# "listRepoIssues" also matches "list issues"
+WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+TOKEN = re.compile(r"\w+")
+
+
+def keywords(text: str | None) -> str:
+    """The words of a method, path, name or folder, with camelCase split."""
+    tokens = TOKEN.findall(text or "")
+    words = [word.lower() for token in tokens for word in WORD.findall(token)]
+    return " ".join(dict.fromkeys([token.lower() for token in tokens] + words))
+
+
+def match_query(query: str) -> str | None:
+    """An FTS5 query matching any word of a free text query."""
+    terms = dict.fromkeys(keywords(query).split())
+    return " OR ".join(f'"{term}"' for term in terms) or None
+
+
+class EndpointFTSIndex:
+    """
+    BM25 keyword index of the API endpoints embedded in ChromaDB.
+
+    Endpoints are indexed by method, path, name and folder in an SQLite FTS5
+    table per project next to the ChromaDB collections, under the same
+    document ids, so exact path and operation name queries that embeddings
+    rank poorly can be matched by keyword and fused with the vector ranking.
+    Per-project tables keep the matching and BM25 statistics of a project
+    independent of the others.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    project_id TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    file_id TEXT,
+                    UNIQUE (project_id, doc_id)
+                );
+                CREATE INDEX IF NOT EXISTS documents_file
+                    ON documents (project_id, file_id);
+                """
+            )
+            if self._exists(conn, "endpoints"):
+                # Endpoints of all projects used to share one table; they are
+                # indexed again per project on their next search
+                conn.executescript("DROP TABLE endpoints; DELETE FROM documents;")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One connection per call, as ingestion jobs write from worker threads
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            yield conn
+
+    @staticmethod
+    def _table(project_id: str) -> str:
+        return f"endpoints_{hashlib.sha256(project_id.encode()).hexdigest()[:16]}"
+
+    @staticmethod
+    def _exists(conn: sqlite3.Connection, table: str) -> bool:
+        return (
+            conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            ).fetchone()
+            is not None
+        )
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, table: str, rows: list[tuple[int]]) -> None:
+        conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", rows)
+        conn.executemany("DELETE FROM documents WHERE id = ?", rows)
+
+    def upsert(self, project_id: str, ids: list[str], metadatas: list[dict]) -> None:
+        """Index endpoints by their ChromaDB document ids and metadata."""
+        table = self._table(project_id)
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                'USING fts5(method, path, name, folder, tokenize = "porter")'
+            )
+            for doc_id, metadata in zip(ids, metadatas, strict=True):
+                self._delete(
+                    conn,
+                    table,
+                    conn.execute(
+                        "SELECT id FROM documents WHERE project_id = ? AND doc_id = ?",
+                        (project_id, doc_id),
+                    ).fetchall(),
+                )
+                row = conn.execute(
+                    "INSERT INTO documents (project_id, doc_id, file_id) "
+                    "VALUES (?, ?, ?)",
+                    (project_id, doc_id, metadata.get("file_id")),
+                ).lastrowid
+                conn.execute(
+                    f"INSERT INTO {table} (rowid, method, path, name, folder) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        row,
+                        keywords(metadata.get("method")),
+                        keywords(metadata.get("url")),
+                        keywords(metadata.get("name")),
+                        keywords(metadata.get("folder")),
+                    ),
+                )
+
+    def move(self, project_id: str, ids: list[str], file_id: str) -> None:
+        """Assign indexed endpoints to another upload of their file."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE documents SET file_id = ? WHERE project_id = ? AND doc_id = ?",
+                [(file_id, project_id, doc_id) for doc_id in ids],
+            )
+
+    def delete(
+        self,
+        project_id: str,
+        ids: Iterable[str] | None = None,
+        file_id: str | None = None,
+    ) -> None:
+        """Remove endpoints by id or file, or all endpoints of a project."""
+        table = self._table(project_id)
+        with self._connect() as conn:
+            if not self._exists(conn, table):
+                return
+            if ids is not None:
+                rows = [
+                    row
+                    for doc_id in ids
+                    for row in conn.execute(
+                        "SELECT id FROM documents WHERE project_id = ? AND doc_id = ?",
+                        (project_id, doc_id),
+                    )
+                ]
+            elif file_id is not None:
+                rows = conn.execute(
+                    "SELECT id FROM documents WHERE project_id = ? AND file_id = ?",
+                    (project_id, file_id),
+                ).fetchall()
+            else:
+                conn.execute(f"DROP TABLE {table}")
+                conn.execute(
+                    "DELETE FROM documents WHERE project_id = ?", (project_id,)
+                )
+                return
+            self._delete(conn, table, rows)
+
+    def count(self, project_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT count(*) FROM documents WHERE project_id = ?", (project_id,)
+            ).fetchone()[0]
+
+    def search(
+        self, project_id: str, query: str, limit: int = 10
+    ) -> list[tuple[str, float]]:
+        """
+        Endpoints of a project matching any word of a query, best first.
+
+        Returns:
+            list: (document id, BM25 score) pairs, higher scores matching better
+        """
+        match = match_query(query)
+        if match is None:
+            return []
+        table = self._table(project_id)
+        with self._connect() as conn:
+            if not self._exists(conn, table):
+                return []
+            rows = conn.execute(
+                # bm25() is lower for better matches; paths and names weigh
+                # more than methods and folders
+                f"SELECT documents.doc_id, -bm25({table}, 1.0, 4.0, 3.0, 1.0) "
+                f"AS score FROM {table} JOIN documents ON documents.id = "
+                f"{table}.rowid WHERE {table} MATCH ? ORDER BY score DESC LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [(doc_id, score) for doc_id, score in rows]
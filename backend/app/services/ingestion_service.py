@@ -0,0 +1,180 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import yaml
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.services.api_search_service import EmbeddingResult, store_embeddings
+from app.services.file_service import original_filename
+
+logger = get_logger(__name__, service="ingestion_service")
+
+
+class IngestionJobStatus(str, Enum):
+    """Ingestion job status."""
+
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class IngestionJob(BaseModel):
+    """Embedding of one uploaded API collection."""
+
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    project_id: str
+    # Upload path of the file, relative to the upload directory
+    file: str
+    status: IngestionJobStatus = IngestionJobStatus.QUEUED
+    endpoints_processed: int = 0
+    endpoints_skipped: int = 0
+    # Endpoints kept from an earlier upload of the file, and those deleted
+    endpoints_unchanged: int = 0
+    endpoints_removed: int = 0
+    error: str | None = None
+    # Errors of endpoints that could not be read, the first few of them
+    endpoint_errors: list[str] = []
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # Seconds spent waiting, parsing the file, extracting and embedding endpoints
+    timings: dict[str, float] = {}
+
+
+def load_collection(path: Path) -> Any:
+    """Parse an uploaded JSON or YAML file."""
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f) if path.suffix.lower() == ".json" else yaml.safe_load(f)
+
+
+class IngestionQueue:
+    """
+    Jobs embedding uploaded API collections, run by a pool of worker threads.
+
+    Parsing specs and embedding their endpoints is CPU bound and ChromaDB's
+    client is synchronous, so jobs run outside of the event loop. Jobs are
+    kept in memory; the oldest finished ones are dropped once more than
+    `retained` are kept. Jobs for uploads of the same file in a project run
+    one at a time, as each one updates the endpoints indexed by the others.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        retained: int | None = None,
+        ingest: Callable[..., EmbeddingResult] = store_embeddings,
+    ):
+        self.workers = workers or settings.INGESTION_WORKERS
+        self.retained = retained or settings.INGESTION_JOBS_RETAINED
+        self._ingest = ingest
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+        self._lock = threading.Lock()
+        # Lock held while a job for a (project_id, original filename) runs,
+        # with the number of its jobs running or waiting for it
+        self._source_locks: dict[tuple[str, str], tuple[threading.Lock, int]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def submit(self, project_id: str, file: str) -> IngestionJob:
+        """Queue the embedding of an uploaded file and return its job at once."""
+        job = IngestionJob(project_id=project_id, file=file)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="ingestion"
+                )
+            self._jobs[job.id] = job
+            self._prune()
+            self._executor.submit(self._run, job)
+        logger.info(f"Queued ingestion job {job.id} for {file}")
+        return job
+
+    def _prune(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in (IngestionJobStatus.COMPLETED, IngestionJobStatus.FAILED)
+        ]
+        for job_id in finished[: max(len(self._jobs) - self.retained, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob) -> None:
+        key = (job.project_id, original_filename(job.file))
+        with self._lock:
+            source_lock, jobs = self._source_locks.get(key, (threading.Lock(), 0))
+            self._source_locks[key] = (source_lock, jobs + 1)
+        try:
+            with source_lock:
+                self._run_job(job)
+        finally:
+            with self._lock:
+                source_lock, jobs = self._source_locks.pop(key)
+                if jobs > 1:
+                    self._source_locks[key] = (source_lock, jobs - 1)
+
+    def _run_job(self, job: IngestionJob) -> None:
+        job.status = IngestionJobStatus.RUNNING
+        job.started_at = datetime.now()
+        job.timings["queued"] = round(
+            (job.started_at - job.created_at).total_seconds(), 3
+        )
+        started = time.perf_counter()
+
+        def progress(result: EmbeddingResult) -> None:
+            job.endpoints_processed = result.endpoints
+            job.endpoints_skipped = result.skipped
+            job.endpoints_unchanged = result.unchanged
+            job.endpoints_removed = result.removed
+
+        try:
+            content = load_collection(Path(settings.UPLOAD_DIR) / job.file)
+            job.timings["parse"] = round(time.perf_counter() - started, 3)
+            result = self._ingest(
+                job.project_id, Path(job.file).name, content, on_progress=progress
+            )
+            progress(result)
+            job.endpoint_errors = result.errors
+            job.timings["extract"] = round(result.extract_seconds, 3)
+            job.timings["embed"] = round(result.embed_seconds, 3)
+            job.status = IngestionJobStatus.COMPLETED
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} for {job.file} failed: {e}")
+            job.error = str(e)
+            job.status = IngestionJobStatus.FAILED
+        finally:
+            job.finished_at = datetime.now()
+            job.timings["total"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Ingestion job {job.id} {job.status.value.lower()}: "
+            f"{job.endpoints_processed} endpoints in {job.timings['total']}s"
+        )
+
+    def get(self, job_id: str) -> IngestionJob | None:
+        return self._jobs.get(job_id)
+
+    def list(self, project_id: str | None = None) -> list[IngestionJob]:
+        """Jobs of a project, or all jobs, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if project_id in (None, job.project_id)]
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping the jobs that did not start yet."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+ingestion_queue = IngestionQueue()
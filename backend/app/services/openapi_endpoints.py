@@ -0,0 +1,271 @@
+import json
+import uuid
+from collections.abc import Iterator
+from http import HTTPStatus
+from typing import Any
+
+from app.core.logger import get_logger
+from app.mcp.openapi.spec_index import HTTP_METHODS, SpecIndex
+
+logger = get_logger(__name__)
+
+BASE_URL = "{{baseUrl}}"
+# Nesting of generated examples below which objects and arrays are left empty
+MAX_EXAMPLE_DEPTH = 4
+
+
+def example_value(schema: Any, depth: int = 0) -> Any:
+    """
+    An example of a resolved schema: its example, default or first enum
+    value, or else a placeholder such as "<string>" built from its type.
+    """
+    if not isinstance(schema, dict):
+        return None
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("oneOf", "anyOf"):
+        if schema.get(key):
+            return example_value(schema[key][0], depth)
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), None)
+    if schema_type is None and "properties" in schema:
+        schema_type = "object"
+    if schema_type == "object":
+        if depth >= MAX_EXAMPLE_DEPTH:
+            return {}
+        return {
+            name: example_value(value, depth + 1)
+            for name, value in (schema.get("properties") or {}).items()
+        }
+    if schema_type == "array":
+        if depth >= MAX_EXAMPLE_DEPTH:
+            return []
+        return [example_value(schema.get("items"), depth + 1)]
+    if schema_type == "integer" and schema.get("format") == "int64":
+        return "<long>"
+    return f"<{schema.get('format') or schema_type or 'string'}>"
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _description(text: str | None) -> dict[str, str] | None:
+    return {"content": text, "type": "text/plain"} if text else None
+
+
+def _media_example(media: dict[str, Any]) -> Any:
+    if "example" in media:
+        return media["example"]
+    for example in (media.get("examples") or {}).values():
+        if isinstance(example, dict) and "value" in example:
+            return example["value"]
+    return example_value(media.get("schema"))
+
+
+def _json_media(content: dict[str, Any]) -> tuple[str, dict[str, Any]] | None:
+    """The JSON media type of a content map if it has one, else its first one."""
+    for content_type, media in content.items():
+        if "json" in content_type:
+            return content_type, media or {}
+    for content_type, media in content.items():
+        return content_type, media or {}
+    return None
+
+
+def _request_body(
+    request_body: dict[str, Any], body_parameter: dict[str, Any] | None, consumes: list
+) -> tuple[str | None, dict[str, Any] | None]:
+    """The content type and Postman body of an operation's request body."""
+    if body_parameter is not None:
+        # Swagger 2 body parameter
+        content_type = _json_media(
+            {t: {} for t in consumes} or {"application/json": {}}
+        )[0]
+        content = {content_type: {"schema": body_parameter.get("schema")}}
+    else:
+        content = request_body.get("content") or {}
+    media = _json_media(content)
+    if media is None:
+        return None, None
+    content_type, media_object = media
+
+    if content_type in ("application/x-www-form-urlencoded", "multipart/form-data"):
+        mode = "urlencoded" if "urlencoded" in content_type else "formdata"
+        fields = example_value(media_object.get("schema")) or {}
+        return content_type, {
+            "mode": mode,
+            mode: [
+                {"key": key, "value": _text(value)}
+                for key, value in (fields.items() if isinstance(fields, dict) else [])
+            ],
+        }
+    language = "json" if "json" in content_type else "text"
+    return content_type, {
+        "mode": "raw",
+        "raw": _text(_media_example(media_object)),
+        "options": {"raw": {"headerFamily": language, "language": language}},
+    }
+
+
+def _endpoint(
+    index: SpecIndex,
+    path: str,
+    method: str,
+    path_item: dict[str, Any],
+    operation: dict[str, Any],
+) -> dict[str, Any]:
+    parameters: dict[tuple[str, str], dict[str, Any]] = {}
+    for parameter in [
+        *(path_item.get("parameters") or []),
+        *(operation.get("parameters") or []),
+    ]:
+        parameter = index.resolve(parameter)
+        parameters[(parameter.get("name"), parameter.get("in"))] = parameter
+
+    query, variables, headers = [], [], []
+    body_parameter = None
+    for (name, location), parameter in parameters.items():
+        if location == "body":
+            body_parameter = parameter
+            continue
+        # Swagger 2 parameters carry their schema inline
+        schema = parameter.get("schema") or parameter
+        value = parameter.get("example", example_value(schema))
+        entry = {"key": name, "value": _text(value) if value is not None else None}
+        if parameter.get("description"):
+            entry["description"] = _description(parameter["description"])
+        if location == "query":
+            query.append({**entry, "disabled": not parameter.get("required", False)})
+        elif location == "path":
+            variables.append(entry)
+        elif location == "header":
+            headers.append(entry)
+
+    segments = [segment for segment in path.split("/") if segment]
+    url_path = [
+        f":{segment[1:-1]}"
+        if segment.startswith("{") and segment.endswith("}")
+        else segment
+        for segment in segments
+    ]
+    raw = f"{BASE_URL}/{'/'.join(url_path)}"
+    enabled_query = [q for q in query if not q["disabled"]]
+    if enabled_query:
+        raw += "?" + "&".join(f"{q['key']}={q['value']}" for q in enabled_query)
+
+    content_type, body = _request_body(
+        index.resolve(operation.get("requestBody") or {}),
+        body_parameter,
+        operation.get("consumes") or index.spec.get("consumes") or [],
+    )
+    if content_type:
+        headers.append({"key": "Content-Type", "value": content_type})
+
+    responses = index.resolve(operation.get("responses") or {})
+    accept = next(
+        (
+            content_type
+            for response in responses.values()
+            if isinstance(response, dict)
+            for content_type in (response.get("content") or {})
+        ),
+        None,
+    ) or next(iter(operation.get("produces") or index.spec.get("produces") or []), None)
+    if accept:
+        headers.append({"key": "Accept", "value": accept})
+
+    name = operation.get("summary") or operation.get("operationId") or path
+    request = {
+        "name": name,
+        "description": _description(operation.get("description")),
+        "url": {
+            "raw": raw,
+            "path": url_path,
+            "host": [BASE_URL],
+            "query": query,
+            "variable": variables,
+        },
+        "method": method.upper(),
+        "header": headers,
+        "body": body,
+        "auth": None,
+    }
+
+    endpoint_id = uuid.uuid5(uuid.NAMESPACE_URL, f"{method.upper()} {path}")
+    return {
+        "id": str(endpoint_id),
+        "name": name,
+        "request": request,
+        "response": [
+            _response(endpoint_id, status, response, request)
+            for status, response in responses.items()
+            if isinstance(response, dict)
+        ],
+        "event": [],
+        "folder": (operation.get("tags") or [""])[0],
+    }
+
+
+def _response(
+    endpoint_id: uuid.UUID,
+    status: str,
+    response: dict[str, Any],
+    request: dict[str, Any],
+) -> dict[str, Any]:
+    code = int(status) if str(status).isdigit() else None
+    try:
+        status_text = HTTPStatus(code).phrase if code else None
+    except ValueError:
+        status_text = None
+
+    header, body = [], None
+    if response.get("content"):
+        content_type, media = _json_media(response["content"])
+        header.append({"key": "Content-Type", "value": content_type})
+        body = _text(_media_example(media))
+    elif response.get("schema"):
+        # Swagger 2 responses carry their schema inline
+        header.append({"key": "Content-Type", "value": "application/json"})
+        body = _text(example_value(response["schema"]))
+
+    return {
+        "id": str(uuid.uuid5(endpoint_id, str(status))),
+        "name": response.get("description") or str(status),
+        "originalRequest": request,
+        "status": status_text,
+        "code": code,
+        "header": header,
+        "body": body,
+        "cookie": [],
+    }
+
+
+def iter_openapi_endpoints(spec: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """
+    Extract the endpoints of an OpenAPI 3 or Swagger 2 spec, one at a time.
+
+    Endpoints have the APIEndpoint shape of converted Postman collections:
+    requests on a {{baseUrl}} host with example parameter values and bodies,
+    one response per documented status, and the operation's first tag as
+    folder. `$ref`s are resolved once per spec and shared between endpoints.
+    Endpoint ids are derived from method and path, so they are stable across
+    uploads of the same spec.
+    """
+    index = SpecIndex(spec)
+    for path, path_item in (spec.get("paths") or {}).items():
+        if not isinstance(path_item, dict):
+            continue
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            try:
+                yield _endpoint(index, path, method, path_item, operation)
+            except (ValueError, TypeError, KeyError) as e:
+                logger.warning(f"Skipping {method.upper()} {path}: {e}")
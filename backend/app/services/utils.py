@@ -1,12 +1,10 @@
-import json
-import os
-import subprocess
-import tempfile
+from collections.abc import Iterator
 from typing import Any
 
 from pydantic import BaseModel
 
 from app.core.logger import get_logger
+from app.services.openapi_endpoints import iter_openapi_endpoints
 
 logger = get_logger(__name__)
 
@@ -151,67 +149,30 @@ def process_folder(
             process_folder(subfolder, current_path, endpoints)
 
 
-def parse_api_collection(
+def iter_api_collection(
     content: dict[str, Any], file_id: str = ""
-) -> list[dict[str, Any]]:
-    """Parse an API collection and extract endpoints with their metadata."""
+) -> Iterator[dict[str, Any]]:
+    """
+    Extract the endpoints of an API collection, one at a time.
 
-    # Handle OpenAPI format
+    OpenAPI and Swagger specs are walked directly; see iter_openapi_endpoints.
+    """
     if content.get("openapi") or content.get("swagger"):
         logger.info(
-            f"Converting OpenAPI/Swagger spec to Postman format for file_id: {file_id}"
-        )
-
-        # Convert OpenAPI to Postman format
-        with tempfile.NamedTemporaryFile(
-            suffix=".json", mode="w", delete=False
-        ) as input_file:
-            json.dump(content, input_file)
-            input_path = input_file.name
-
-        output_path = os.path.join(tempfile.gettempdir(), f"{file_id}_postman.json")
-        logger.debug(
-            f"Created temporary files - Input: {input_path}, Output: {output_path}"
+            f"Extracting endpoints of OpenAPI/Swagger spec for file_id: {file_id}"
         )
+        yield from iter_openapi_endpoints(content)
+        return
 
-        try:
-            cmd = [
-                "openapi2postmanv2",
-                "-s",
-                input_path,
-                "-o",
-                output_path,
-                "-p",
-                "-O",
-                "folderStrategy=Tags,requestParametersResolution=Example,optimizeConversion=false,stackLimit=50",
-            ]
-            logger.debug(f"Executing conversion command: {' '.join(cmd)}")
-            subprocess.run(cmd, check=True)
-
-            with open(output_path) as f:
-                content = json.load(f)
-            logger.info("Successfully converted OpenAPI spec to Postman format")
-
-        except Exception as e:
-            logger.error(
-                f"Error converting OpenAPI to Postman: {str(e)}", exc_info=True
-            )
-            return []
-
-        finally:
-            # Cleanup temporary files
-            try:
-                os.unlink(input_path)
-                os.unlink(output_path)
-                logger.debug("Cleaned up temporary files")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temporary files: {str(e)}")
-
-    # Continue with existing Postman collection parsing
     collection = APICollection(**content)
-    endpoints = []
-
     for folder in collection.item:
+        endpoints: list[dict[str, Any]] = []
         process_folder(folder, endpoints=endpoints)
+        yield from endpoints
+
 
-    return endpoints
+def parse_api_collection(
+    content: dict[str, Any], file_id: str = ""
+) -> list[dict[str, Any]]:
+    """Parse an API collection and extract endpoints with their metadata."""
+    return list(iter_api_collection(content, file_id))
@@ -0,0 +1,252 @@
+"""
+Benchmark of the recall and latency of endpoint search modes.
+
+Indexes a generated GitHub-like API, or an OpenAPI spec file, in an
+in-memory ChromaDB collection and keyword index, then searches for sampled
+endpoints by "METHOD /path", by operationId and by summary in semantic,
+fts and hybrid mode. Reports the share of queries whose endpoint is among
+the first `limit` results (recall@limit), and search latencies.
+
+Embeddings use ChromaDB's default model, or a local hashing of the
+documents' words when the model cannot be loaded or --embedding hashing is
+given; semantic recall is only meaningful with the model.
+
+    python -m app.tests.benchmarks.endpoint_search --resources 80 --queries 200
+    python -m app.tests.benchmarks.endpoint_search --spec api.github.com.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import chromadb
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+from app.mcp.openapi.spec_index import HTTP_METHODS
+from app.services import api_search_service
+from app.services.api_search_service import (
+    SearchMode,
+    search_endpoints,
+    store_embeddings,
+)
+from app.services.fts_index import EndpointFTSIndex, keywords
+
+PROJECT = "benchmark"
+QUERY_KINDS = ("path", "operation", "summary")
+# Resources whose singular drops their last letter
+NOUNS = [
+    "repos", "issues", "pulls", "comments", "labels", "milestones", "releases",
+    "assets", "hooks", "keys", "teams", "members", "projects", "columns",
+    "cards", "gists", "commits", "refs", "tags", "checks", "runs", "jobs",
+    "artifacts", "secrets", "variables", "environments", "deployments",
+    "invitations", "collaborators", "runners",
+]  # fmt: skip
+
+
+class HashingEmbeddings(EmbeddingFunction):
+    """Bag of words hashed into a fixed number of dimensions."""
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for document in input:
+            vector = [0.0] * self.dimensions
+            for word in keywords(document).split():
+                vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+            norm = sum(value * value for value in vector) ** 0.5 or 1.0
+            embeddings.append([value / norm for value in vector])
+        return embeddings
+
+
+def _operation(operation_id: str, summary: str, tag: str) -> dict[str, Any]:
+    return {
+        "operationId": operation_id,
+        "summary": summary,
+        "tags": [tag],
+        "responses": {"200": {"description": "OK"}},
+    }
+
+
+def generate_api(resources: int, seed: int = 0) -> dict[str, Any]:
+    """A spec of nested resources with CRUD operations, like GitHub's."""
+    rng = random.Random(seed)
+    pairs = [(parent, child) for parent in NOUNS for child in NOUNS if parent != child]
+    paths: dict[str, Any] = {}
+    for parent, child in rng.sample(pairs, k=min(resources, len(pairs))):
+        one, other = parent[:-1], child[:-1]
+        collection = f"/{parent}/{{{one}_id}}/{child}"
+        item = f"{collection}/{{{other}_id}}"
+        name = f"{one.capitalize()}{child.capitalize()}"
+        paths[collection] = {
+            "get": _operation(f"list{name}", f"List {child} of a {one}", child),
+            "post": _operation(f"create{name}", f"Create a {other} for a {one}", child),
+        }
+        paths[item] = {
+            "get": _operation(f"get{name}", f"Get a {other} of a {one}", child),
+            "patch": _operation(f"update{name}", f"Update a {other} of a {one}", child),
+            "delete": _operation(
+                f"delete{name}", f"Delete a {other} from a {one}", child
+            ),
+        }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Generated", "version": "1.0.0"},
+        "paths": paths,
+    }
+
+
+def sample_queries(
+    spec: dict[str, Any], count: int, seed: int = 0
+) -> list[dict[str, str]]:
+    """Queries for sampled operations, with the method and url they should find."""
+    operations = [
+        (path, method, operation)
+        for path, path_item in spec.get("paths", {}).items()
+        for method in HTTP_METHODS
+        if isinstance(operation := path_item.get(method), dict)
+    ]
+    queries = []
+    for path, method, operation in random.Random(seed).sample(
+        operations, k=min(count, len(operations))
+    ):
+        url = "/".join(
+            f":{segment[1:-1]}" if segment.startswith("{") else segment
+            for segment in path.split("/")
+            if segment
+        )
+        texts = {
+            "path": f"{method.upper()} {path}",
+            "operation": operation.get("operationId"),
+            "summary": operation.get("summary"),
+        }
+        queries.extend(
+            {"kind": kind, "query": text, "method": method.upper(), "url": url}
+            for kind, text in texts.items()
+            if text
+        )
+    return queries
+
+
+def _embedding_function(name: str) -> tuple[str, EmbeddingFunction]:
+    if name == "default":
+        model = DefaultEmbeddingFunction()
+        try:
+            model(["warm up"])
+            return name, model
+        except Exception:
+            pass
+    return "hashing", HashingEmbeddings()
+
+
+def run_benchmark(
+    spec: dict[str, Any], queries: int = 100, limit: int = 5, embedding: str = "default"
+) -> dict[str, Any]:
+    """
+    Index a spec, then search for sampled endpoints in every mode.
+
+    Returns:
+        dict: Indexing seconds, and recall@limit per query kind and search
+        latencies in milliseconds per mode
+    """
+    embedding, embedding_function = _embedding_function(embedding)
+    client = chromadb.EphemeralClient()
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        mock.patch.multiple(
+            api_search_service,
+            chroma_client=client,
+            embedding_function=embedding_function,
+            fts_index=EndpointFTSIndex(Path(directory) / "fts.db"),
+        ),
+    ):
+        start = time.perf_counter()
+        indexed = store_embeddings(PROJECT, "spec.json", spec)
+        index_time = time.perf_counter() - start
+
+        sampled = sample_queries(spec, queries)
+        modes: dict[str, Any] = {}
+        for mode in SearchMode:
+            found = {kind: [] for kind in QUERY_KINDS}
+            latencies = []
+            for query in sampled:
+                start = time.perf_counter()
+                matches = search_endpoints(PROJECT, query["query"], limit, None, mode)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found[query["kind"]].append(
+                    any(
+                        match.metadata.get("method") == query["method"]
+                        and match.metadata.get("url") == query["url"]
+                        for match in matches
+                    )
+                )
+            latencies.sort()
+            modes[mode.value] = {
+                "recall": {
+                    kind: round(sum(hits) / len(hits), 3)
+                    for kind, hits in found.items()
+                    if hits
+                },
+                "p50_ms": round(statistics.median(latencies), 2),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+            }
+        client.delete_collection(PROJECT)
+
+    return {
+        "endpoints": indexed.endpoints,
+        "queries": len(sampled),
+        "limit": limit,
+        "embedding": embedding,
+        "index_s": round(index_time, 3),
+        "modes": modes,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"{report['endpoints']} endpoints indexed in {report['index_s']}s with "
+        f"{report['embedding']} embeddings, {report['queries']} queries, "
+        f"recall@{report['limit']}",
+        f"  {'mode':<9}"
+        + "".join(f"{kind:>11}" for kind in QUERY_KINDS)
+        + f"{'p50':>10}{'p95':>10}",
+    ]
+    for mode, result in report["modes"].items():
+        lines.append(
+            f"  {mode:<9}"
+            + "".join(f"{result['recall'].get(kind, 0):>11.3f}" for kind in QUERY_KINDS)
+            + f"{result['p50_ms']:>8.2f}ms{result['p95_ms']:>8.2f}ms"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spec", type=Path, help="OpenAPI JSON file to search")
+    parser.add_argument("--resources", type=int, default=80)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--embedding", choices=["default", "hashing"], default="default"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    spec = (
+        json.loads(args.spec.read_text()) if args.spec else generate_api(args.resources)
+    )
+    report = run_benchmark(spec, args.queries, args.limit, args.embedding)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
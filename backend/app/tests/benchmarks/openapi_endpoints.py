@@ -0,0 +1,142 @@
+"""
+Benchmark of extracting the endpoints of large OpenAPI specs.
+
+Compares the native extraction of app.services.openapi_endpoints with the
+previous conversion through the openapi2postmanv2 CLI, run with the options
+parse_api_collection used, on a generated spec or on a spec file. The CLI
+is only run when it is installed (npm install -g openapi-to-postmanv2).
+
+    python -m app.tests.benchmarks.openapi_endpoints --operations 2000 --schemas 300
+    python -m app.tests.benchmarks.openapi_endpoints --spec api.github.com.json
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from app.services.openapi_endpoints import iter_openapi_endpoints
+from app.services.utils import APICollection, process_folder
+from app.tests.benchmarks.spec_index import generate_spec
+
+CLI = "openapi2postmanv2"
+
+
+def run_native(spec: dict[str, Any]) -> dict[str, Any]:
+    start = time.perf_counter()
+    endpoints = iter_openapi_endpoints(spec)
+    next(endpoints)
+    first = time.perf_counter() - start
+    count = 1 + sum(1 for _ in endpoints)
+    elapsed = time.perf_counter() - start
+
+    # Memory is traced in a second pass, as tracing slows extraction down
+    tracemalloc.start()
+    for _ in iter_openapi_endpoints(spec):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "endpoints": count,
+        "first_endpoint_s": round(first, 4),
+        "total_s": round(elapsed, 4),
+        "peak_mib": round(peak / (1024 * 1024), 2),
+    }
+
+
+def run_cli(spec: dict[str, Any]) -> dict[str, Any] | None:
+    """Convert with the CLI as parse_api_collection did, if it is installed."""
+    if shutil.which(CLI) is None:
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = Path(directory) / "spec.json"
+        output_path = Path(directory) / "postman.json"
+        input_path.write_text(json.dumps(spec))
+        start = time.perf_counter()
+        subprocess.run(
+            [
+                CLI,
+                "-s",
+                str(input_path),
+                "-o",
+                str(output_path),
+                "-p",
+                "-O",
+                "folderStrategy=Tags,requestParametersResolution=Example,"
+                "optimizeConversion=false,stackLimit=50",
+            ],
+            check=True,
+            capture_output=True,
+        )
+        collection = APICollection(**json.loads(output_path.read_text()))
+        endpoints: list[dict[str, Any]] = []
+        for folder in collection.item:
+            process_folder(folder, endpoints=endpoints)
+        elapsed = time.perf_counter() - start
+    return {"endpoints": len(endpoints), "total_s": round(elapsed, 4)}
+
+
+def run_benchmark(spec: dict[str, Any], cli: bool = True) -> dict[str, Any]:
+    """
+    Extract the endpoints of a spec natively and, if asked and installed,
+    with the CLI.
+
+    Returns:
+        dict: Endpoints, seconds and peak traced MiB of each extraction
+    """
+    report = {
+        "spec_mib": round(len(json.dumps(spec)) / (1024 * 1024), 2),
+        "native": run_native(spec),
+        "cli": run_cli(spec) if cli else None,
+    }
+    if report["cli"]:
+        report["speedup"] = round(
+            report["cli"]["total_s"] / report["native"]["total_s"], 1
+        )
+    return report
+
+
+def format_report(report: dict[str, Any]) -> str:
+    native = report["native"]
+    lines = [
+        f"{report['spec_mib']} MiB of JSON",
+        f"  native: {native['endpoints']:>6} endpoints {native['total_s']:>9.4f}s "
+        f"(first after {native['first_endpoint_s']:.4f}s) "
+        f"{native['peak_mib']:>8.2f} MiB peak",
+    ]
+    cli = report["cli"]
+    if cli is None:
+        lines.append(f"  cli:    {CLI} not run")
+    else:
+        lines.append(
+            f"  cli:    {cli['endpoints']:>6} endpoints {cli['total_s']:>9.4f}s "
+            f"({report['speedup']}x slower)"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spec", type=Path, help="OpenAPI JSON file to extract")
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--schemas", type=int, default=300)
+    parser.add_argument("--no-cli", action="store_true", help="Skip the CLI")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    spec = (
+        json.loads(args.spec.read_text())
+        if args.spec
+        else generate_spec(args.operations, args.schemas)
+    )
+    report = run_benchmark(spec, cli=not args.no_cli)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark of the MCP proxy call path.
+
+Each call goes through MCPProxy._queue_tool_call, the Redis queue, the queue
+worker and a StdioTransport session to the deterministic fake MCP server in
+app.mcp.loadtest.fake_server. Redis is the in-memory fake unless a URL is given.
+
+    python -m app.tests.benchmarks.proxy_path --levels 1,8,32 --calls 2000
+    python -m app.tests.benchmarks.proxy_path --latency-ms 5 --payload-bytes 65536 \\
+        --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from redis.asyncio import Redis
+
+from app.mcp.loadtest.report import CallResult, LoadReport, summarize
+from app.mcp.proxy import MCPProxy
+from app.mcp.queue_manager import queue_manager
+from app.models import MCPRunConfig, MCPServer
+from app.tests.utils.redis import FakeRedis
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+def fake_stdio_server(latency_ms: float, payload_bytes: int) -> MCPServer:
+    """An MCP server definition running the fake server over stdio."""
+    return MCPServer(
+        id="bench-server",
+        name="Benchmark Server",
+        description="Fake MCP server for benchmarks",
+        transport="stdio",
+        version="1.0.0",
+        run=MCPRunConfig(
+            command=sys.executable,
+            args=[
+                "-m",
+                "app.mcp.loadtest.fake_server",
+                "--transport",
+                "stdio",
+                "--latency-ms",
+                str(latency_ms),
+                "--payload-bytes",
+                str(payload_bytes),
+            ],
+            cwd=str(BACKEND_DIR),
+        ),
+    )
+
+
+async def _timed_call(proxy: MCPProxy, index: int) -> CallResult:
+    start = time.perf_counter()
+    result, ok = await proxy._queue_tool_call("echo", {"index": index})
+    return CallResult(
+        tool="echo", latency=time.perf_counter() - start, ok=ok and bool(result)
+    )
+
+
+async def _run_level(proxy: MCPProxy, concurrency: int, calls: int) -> LoadReport:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> CallResult:
+        async with slots:
+            return await _timed_call(proxy, index)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(i) for i in range(calls)))
+    return summarize(list(results), time.perf_counter() - start)
+
+
+async def run_benchmark(
+    levels: list[int],
+    calls: int,
+    latency_ms: float = 0.0,
+    payload_bytes: int = 64,
+    redis_url: str | None = None,
+) -> dict[int, LoadReport]:
+    """
+    Measure the proxy call path at several concurrency levels.
+
+    Args:
+        levels: Numbers of concurrent callers to measure
+        calls: Calls made at each level
+        latency_ms: Delay of the fake server before answering
+        payload_bytes: Size of the fake server's text result
+        redis_url: Real Redis to use instead of the in-memory fake
+
+    Returns:
+        dict[int, LoadReport]: Report per concurrency level
+    """
+    if redis_url:
+        queue_manager.redis = Redis.from_url(redis_url, decode_responses=True)
+    else:
+        queue_manager.redis = FakeRedis()
+    queue_manager.pubsub = queue_manager.redis.pubsub()
+    await queue_manager.pubsub.subscribe(queue_manager.response_channel)
+
+    proxy = MCPProxy(mcp_server=fake_stdio_server(latency_ms, payload_bytes))
+    if not await proxy.initialize():
+        raise RuntimeError(
+            f"Fake MCP server failed to start: {proxy.connection_errors}"
+        )
+    worker = asyncio.create_task(queue_manager.start_worker({"bench-server": proxy}))
+
+    try:
+        # Warm up the subprocess, the queue and the validators
+        await _run_level(proxy, 1, 10)
+        return {
+            concurrency: await _run_level(proxy, concurrency, calls)
+            for concurrency in levels
+        }
+    finally:
+        await queue_manager.drain(timeout=5)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        await proxy.shutdown()
+        await queue_manager.pubsub.close()
+        await queue_manager.redis.close()
+
+
+def format_reports(reports: dict[int, LoadReport]) -> str:
+    """Render reports as a table, one row per concurrency level."""
+    lines = [
+        f"{'concurrency':>11} {'calls/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    ]
+    for concurrency, report in reports.items():
+        lines.append(
+            f"{concurrency:>11} {report.throughput:>10.1f} "
+            f"{report.latency_ms['p50']:>9.2f} {report.latency_ms['p99']:>9.2f} "
+            f"{report.errors:>7}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", default="1,4,16,64")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=64)
+    parser.add_argument("--redis-url")
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON")
+    args = parser.parse_args()
+
+    reports = asyncio.run(
+        run_benchmark(
+            levels=[int(level) for level in args.levels.split(",")],
+            calls=args.calls,
+            latency_ms=args.latency_ms,
+            payload_bytes=args.payload_bytes,
+            redis_url=args.redis_url,
+        )
+    )
+    if args.json:
+        print(
+            json.dumps(
+                {level: report.to_dict() for level, report in reports.items()},
+                indent=2,
+            )
+        )
+    else:
+        print(format_reports(reports))
+
+
+if __name__ == "__main__":
+    main()
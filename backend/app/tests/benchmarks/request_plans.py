@@ -0,0 +1,203 @@
+"""
+Benchmark of translating tool calls into HTTP requests.
+
+Compares the compiled request plans of app.mcp.openapi.executor with the
+previous translation, which classified every field of the input model on every
+call, on a generated spec of many operations with many parameters.
+
+    python -m app.tests.benchmarks.request_plans --operations 500 --parameters 40
+"""
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import urljoin
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.mcp.openapi.executor import EndpointConfig, translate_fn_to_endpoint
+from app.mcp.openapi.schema_to_func import schema_to_function
+
+LOCATIONS = ["query", "query", "header", "cookie", "body"]
+
+
+class Connection:
+    base_url = "https://api.example.com/v1"
+
+
+def translate_per_call(
+    metadata: dict[str, Any],
+    connection: Any | None,
+    fn: Callable,
+    model_instance: BaseModel,
+) -> EndpointConfig:
+    """The translation before request plans, skipping None values like they do."""
+    runtime_values = model_instance.model_dump()
+    headers: dict[str, str] = {}
+    params: dict[str, Any] = {}
+    body: dict[str, Any] = {}
+    cookies: dict[str, str] = {}
+    path_params: dict[str, str] = {}
+
+    base_url = connection.base_url if connection else ""
+    path = metadata.get("path", "")
+    for field_name in fn.model.model_fields:
+        param_meta = metadata.get(field_name, {})
+        is_parameter = (
+            isinstance(param_meta, dict) and param_meta.get("type") == "parameter"
+        )
+        param_in = param_meta.get("in") if isinstance(param_meta, dict) else None
+        param_name = (
+            param_meta.get("name", field_name)
+            if isinstance(param_meta, dict)
+            else field_name
+        )
+        value = runtime_values.get(field_name)
+        if value is None:
+            continue
+        if is_parameter and param_in:
+            if param_in == "query":
+                params[param_name] = value
+            elif param_in == "header" and isinstance(value, str):
+                headers[param_name] = value
+            elif param_in == "path":
+                path_params[param_name] = str(value)
+            elif param_in == "cookie":
+                cookies[param_name] = str(value)
+        else:
+            body[param_name] = value
+
+    for name, value in path_params.items():
+        path = path.replace(f"{{{name}}}", value)
+    full_url = urljoin(base_url.rstrip("/") + "/", path.lstrip("/"))
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+
+    return EndpointConfig(
+        url=full_url,
+        method=metadata.get("method", "GET"),
+        headers=headers or None,
+        params=params or None,
+        body=body or None,
+        timeout=30.0,
+        max_response_bytes=settings.OPENAPI_RESPONSE_MAX_BYTES,
+    )
+
+
+def generate_operations(
+    operations: int, parameters: int, seed: int = 0
+) -> list[tuple[dict[str, Any], Callable, BaseModel]]:
+    """
+    Generate operations with path, query, header, cookie and body parameters.
+
+    Returns:
+        list: (metadata, function, validated call arguments) per operation
+    """
+    rng = random.Random(seed)
+    generated = []
+    for op in range(operations):
+        properties: dict[str, Any] = {}
+        metadata: dict[str, Any] = {
+            "path": f"/resources{op}/{{owner}}/{{item_id}}/details",
+            "method": rng.choice(["GET", "POST", "PUT"]),
+            "owner": {"type": "parameter", "in": "path"},
+            "item_id": {"type": "parameter", "in": "path", "name": "item_id"},
+        }
+        properties["owner"] = {"type": "string"}
+        properties["item_id"] = {"type": "integer"}
+        arguments: dict[str, Any] = {"owner": f"owner{op}", "item_id": op}
+        for index in range(parameters):
+            name = f"param_{index}"
+            location = rng.choice(LOCATIONS)
+            properties[name] = {"type": "string"}
+            if location != "body":
+                metadata[name] = {"type": "parameter", "in": location}
+            if rng.random() < 0.7:
+                arguments[name] = f"value-{op}-{index}"
+
+        schema = {
+            "name": f"Operation{op}",
+            "type": "object",
+            "properties": properties,
+            "required": ["owner", "item_id"],
+        }
+        fn = schema_to_function(schema, metadata)
+        generated.append((metadata, fn, fn.model(**arguments)))
+    return generated
+
+
+def _time_translations(
+    translate: Callable, calls: list[tuple[dict[str, Any], Callable, BaseModel]]
+) -> float:
+    connection = Connection()
+    start = time.perf_counter()
+    for metadata, fn, instance in calls:
+        translate(
+            metadata=metadata, connection=connection, fn=fn, model_instance=instance
+        )
+    return time.perf_counter() - start
+
+
+def run_benchmark(
+    operations: int, parameters: int, calls: int, seed: int = 0
+) -> dict[str, Any]:
+    """
+    Time both translations over the same calls to random operations.
+
+    The first call of each operation, which compiles its plan, is not timed, so
+    the numbers compare steady-state calls.
+
+    Returns:
+        dict: Microseconds per call of each translation and the speedup
+    """
+    generated = generate_operations(operations, parameters, seed)
+    connection = Connection()
+    for metadata, fn, instance in generated:
+        planned = translate_fn_to_endpoint(metadata, connection, fn, instance)
+        baseline = translate_per_call(metadata, connection, fn, instance)
+        if planned != baseline:
+            raise AssertionError(f"Translations differ: {planned} != {baseline}")
+
+    rng = random.Random(seed)
+    workload = [rng.choice(generated) for _ in range(calls)]
+    baseline_time = _time_translations(translate_per_call, workload)
+    planned_time = _time_translations(translate_fn_to_endpoint, workload)
+    return {
+        "operations": operations,
+        "parameters": parameters,
+        "calls": calls,
+        "per_call_us": round(baseline_time / calls * 1e6, 2),
+        "planned_us": round(planned_time / calls * 1e6, 2),
+        "speedup": round(baseline_time / planned_time, 2),
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    return (
+        f"{report['operations']} operations x {report['parameters']} parameters, "
+        f"{report['calls']} calls\n"
+        f"  per call translation: {report['per_call_us']:>8.2f} us/call\n"
+        f"  request plans:        {report['planned_us']:>8.2f} us/call\n"
+        f"  speedup:              {report['speedup']:>8.2f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--operations", type=int, default=500)
+    parser.add_argument("--parameters", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.operations, args.parameters, args.calls, args.seed)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
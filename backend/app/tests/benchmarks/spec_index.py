@@ -0,0 +1,143 @@
+"""
+Benchmark of indexing large OpenAPI specs and materializing their operations.
+
+Measures the time and traced memory of building a SpecIndex, of the first
+operation asked for, and of materializing every operation, on a generated
+spec with shared and recursive component schemas or on a spec file.
+
+    python -m app.tests.benchmarks.spec_index --operations 3000 --schemas 400
+    python -m app.tests.benchmarks.spec_index --spec api.github.com.json
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from app.mcp.openapi.spec_index import SpecIndex
+
+
+def generate_spec(operations: int, schemas: int, seed: int = 0) -> dict[str, Any]:
+    """A spec whose operations share component schemas that reference each other."""
+    rng = random.Random(seed)
+    components: dict[str, Any] = {}
+    for index in range(schemas):
+        properties: dict[str, Any] = {
+            "id": {"type": "integer"},
+            "name": {"type": "string"},
+        }
+        # References to other schemas, including earlier ones, which makes cycles
+        for ref in rng.sample(range(schemas), k=min(3, schemas)):
+            properties[f"schema_{ref}"] = {"$ref": f"#/components/schemas/Schema{ref}"}
+        properties["items"] = {
+            "type": "array",
+            "items": {"$ref": f"#/components/schemas/Schema{rng.randrange(schemas)}"},
+        }
+        components[f"Schema{index}"] = {"type": "object", "properties": properties}
+
+    paths: dict[str, Any] = {}
+    for index in range(operations):
+        schema = {"$ref": f"#/components/schemas/Schema{rng.randrange(schemas)}"}
+        paths[f"/resources{index}/{{id}}"] = {
+            "parameters": [
+                {
+                    "name": "id",
+                    "in": "path",
+                    "required": True,
+                    "schema": {"type": "string"},
+                }
+            ],
+            "get": {
+                "operationId": f"getResource{index}",
+                "parameters": [
+                    {"name": "page", "in": "query", "schema": {"type": "integer"}}
+                ],
+            },
+            "put": {
+                "operationId": f"updateResource{index}",
+                "requestBody": {
+                    "content": {"application/json": {"schema": schema}},
+                },
+            },
+        }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Generated", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": components},
+    }
+
+
+def _measure(action) -> tuple[Any, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_benchmark(spec: dict[str, Any]) -> dict[str, Any]:
+    """
+    Index a spec, then materialize one and then every operation.
+
+    Returns:
+        dict: Seconds and peak traced MiB of each step, with the index stats
+    """
+    index, index_time, index_peak = _measure(lambda: SpecIndex(spec))
+    operation_ids = index.operation_ids()
+    _, first_time, first_peak = _measure(lambda: index.function(operation_ids[0]))
+    _, all_time, all_peak = _measure(
+        lambda: [index.definition(operation_id) for operation_id in operation_ids]
+    )
+
+    mib = 1024 * 1024
+    return {
+        **index.stats(),
+        "spec_mib": round(len(json.dumps(spec)) / mib, 2),
+        "index_s": round(index_time, 4),
+        "index_peak_mib": round(index_peak / mib, 2),
+        "first_operation_s": round(first_time, 4),
+        "first_operation_peak_mib": round(first_peak / mib, 2),
+        "all_operations_s": round(all_time, 4),
+        "all_operations_peak_mib": round(all_peak / mib, 2),
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    return (
+        f"{report['operations']} operations, {report['spec_mib']} MiB of JSON, "
+        f"{report['resolved_refs']} refs resolved, {report['cycles']} cycles and "
+        f"{report['depth_cuts']} deep refs cut\n"
+        f"  index:            {report['index_s']:>8.4f}s "
+        f"{report['index_peak_mib']:>8.2f} MiB peak\n"
+        f"  first operation:  {report['first_operation_s']:>8.4f}s "
+        f"{report['first_operation_peak_mib']:>8.2f} MiB peak\n"
+        f"  all operations:   {report['all_operations_s']:>8.4f}s "
+        f"{report['all_operations_peak_mib']:>8.2f} MiB peak"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spec", type=Path, help="OpenAPI JSON file to index")
+    parser.add_argument("--operations", type=int, default=3000)
+    parser.add_argument("--schemas", type=int, default=400)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    spec = (
+        json.loads(args.spec.read_text())
+        if args.spec
+        else generate_spec(args.operations, args.schemas)
+    )
+    report = run_benchmark(spec)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import pytest
+
+from app.tests.benchmarks.endpoint_search import generate_api, run_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_endpoint_search_benchmark():
+    """Keyword search finds exact paths, and fusion ranks them above vectors alone."""
+    report = run_benchmark(
+        generate_api(resources=20), queries=20, limit=5, embedding="hashing"
+    )
+
+    assert report["endpoints"] == 100
+    assert set(report["modes"]) == {"semantic", "fts", "hybrid"}
+    assert report["modes"]["fts"]["recall"]["path"] >= 0.9
+    assert (
+        report["modes"]["hybrid"]["recall"]["path"]
+        >= report["modes"]["semantic"]["recall"]["path"]
+    )
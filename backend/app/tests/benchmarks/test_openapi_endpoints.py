@@ -0,0 +1,14 @@
+import pytest
+
+from app.tests.benchmarks.openapi_endpoints import run_benchmark
+from app.tests.benchmarks.spec_index import generate_spec
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_openapi_endpoints_benchmark():
+    """Every generated operation is extracted when the CLI is skipped."""
+    report = run_benchmark(generate_spec(operations=100, schemas=20), cli=False)
+
+    assert report["native"]["endpoints"] == 200
+    assert report["cli"] is None
@@ -0,0 +1,16 @@
+import pytest
+
+from app.tests.benchmarks.proxy_path import run_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.asyncio
+async def test_proxy_path_benchmark():
+    """Calls at each concurrency level reach the fake server and succeed."""
+    reports = await run_benchmark(levels=[1, 8], calls=50, payload_bytes=1024)
+
+    for report in reports.values():
+        assert report.calls == 50
+        assert report.errors == 0
+        assert report.throughput > 0
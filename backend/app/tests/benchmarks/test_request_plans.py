@@ -0,0 +1,13 @@
+import pytest
+
+from app.tests.benchmarks.request_plans import run_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_request_plans_benchmark():
+    """Plans build the same requests as per call translation, and no slower."""
+    report = run_benchmark(operations=50, parameters=20, calls=2000)
+
+    assert report["calls"] == 2000
+    assert report["planned_us"] <= report["per_call_us"]
@@ -0,0 +1,15 @@
+import pytest
+
+from app.tests.benchmarks.spec_index import generate_spec, run_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_spec_index_benchmark():
+    """Recursive schemas of the generated spec hit cycles and depth cuts."""
+    report = run_benchmark(generate_spec(operations=200, schemas=40))
+
+    assert report["operations"] == 400
+    assert report["materialized"] == 400
+    assert report["cycles"] > 0
+    assert report["depth_cuts"] > 0
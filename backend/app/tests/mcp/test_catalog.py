@@ -0,0 +1,84 @@
+import mcp.types
+import pytest
+
+from app.mcp.proxy import MCPProxy
+from app.models import MCPRunConfig, MCPServer, MCPTool, MCPToolCatalog
+
+ECHO = {
+    "name": "echo",
+    "description": "Echo the input",
+    "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}},
+}
+ADD = {
+    "name": "add",
+    "description": "Add two numbers",
+    "inputSchema": {"type": "object", "properties": {"a": {}, "b": {}}},
+}
+
+
+def make_server(**kwargs) -> MCPServer:
+    return MCPServer(
+        id="catalog-server",
+        name="Catalog Server",
+        description="Test server",
+        transport="stdio",
+        version="1.0.0",
+        run=MCPRunConfig(command="true"),
+        **kwargs,
+    )
+
+
+def make_catalog(tools: list[dict]) -> MCPToolCatalog:
+    return MCPToolCatalog(
+        server_id="catalog-server",
+        tools=tools,
+        content_hash=MCPToolCatalog.compute_hash(tools),
+    )
+
+
+def test_hash_ignores_tool_order():
+    assert MCPToolCatalog.compute_hash([ECHO, ADD]) == MCPToolCatalog.compute_hash(
+        [ADD, ECHO]
+    )
+    assert MCPToolCatalog.compute_hash([ECHO]) != MCPToolCatalog.compute_hash(
+        [ECHO, ADD]
+    )
+
+
+@pytest.mark.asyncio
+async def test_persisted_catalog_served_while_warming_up():
+    """Listings work before the upstream handshake, without contacting it."""
+    server = make_server(
+        tools=[MCPTool(name="add", description="", parameters={}, status=False)]
+    )
+    proxy = MCPProxy(mcp_server=server, catalog=make_catalog([ECHO, ADD]))
+
+    tools = await proxy.get_tools()
+
+    assert list(tools) == ["fetch_result_chunk", "echo"]
+    assert tools["echo"].parameters == ECHO["inputSchema"]
+    assert not proxy.client.is_connected()
+
+
+@pytest.mark.asyncio
+async def test_update_catalog_persists_only_changes():
+    saved = []
+
+    async def on_catalog_change(server_id, tools, content_hash):
+        saved.append((server_id, [tool["name"] for tool in tools], content_hash))
+
+    proxy = MCPProxy(
+        mcp_server=make_server(),
+        catalog=make_catalog([ECHO]),
+        on_catalog_change=on_catalog_change,
+    )
+
+    live = [mcp.types.Tool.model_validate(tool) for tool in (ECHO, ADD)]
+    assert not await proxy.update_catalog(live[:1])
+    assert await proxy.update_catalog(live)
+    assert not await proxy.update_catalog(list(reversed(live)))
+
+    assert saved == [
+        ("catalog-server", ["echo", "add"], MCPToolCatalog.compute_hash([ECHO, ADD]))
+    ]
+    assert proxy.catalog_tools == list(reversed(live))
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.mcp.openapi.client_pool import OpenAPIClientPool
+from app.mcp.openapi.executor import EndpointConfig, execute_endpoint
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Answer every request on a keep-alive connection with an empty JSON object,
+    cacheable when the path is /cached.
+    """
+    try:
+        while request := await reader.readuntil(b"\r\n\r\n"):
+            cache = b"Cache-Control: max-age=60\r\n" if b" /cached " in request else b""
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + cache
+                + b"Content-Length: 2\r\n\r\n{}"
+            )
+            await writer.drain()
+    except asyncio.IncompleteReadError:
+        writer.close()
+
+
+@pytest_asyncio.fixture
+async def base_url():
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    yield f"http://{host}:{port}"
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_origin_and_auth_profile():
+    pool = OpenAPIClientPool()
+
+    client = pool.get_client("https://api.github.com/repos/a/b/issues", "conn-1")
+
+    assert pool.get_client("https://api.github.com/user", "conn-1") is client
+    assert pool.get_client("https://api.github.com/user", "conn-2") is not client
+    assert pool.get_client("https://example.com/user", "conn-1") is not client
+    await pool.aclose()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(base_url, monkeypatch):
+    pool = OpenAPIClientPool()
+    monkeypatch.setattr("app.mcp.openapi.executor.openapi_clients", pool)
+
+    for _ in range(5):
+        response = await execute_endpoint(
+            EndpointConfig(url=f"{base_url}/items", method="GET")
+        )
+        assert response.status_code == 200
+
+    [stats] = pool.stats()
+    assert stats["requests"] == 5
+    assert stats["connections"] == 1
+    assert stats["reuse_ratio"] == 0.8
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_are_not_counted_as_requests(base_url, monkeypatch):
+    pool = OpenAPIClientPool()
+    monkeypatch.setattr("app.mcp.openapi.executor.openapi_clients", pool)
+
+    for _ in range(3):
+        response = await execute_endpoint(
+            EndpointConfig(url=f"{base_url}/cached", method="GET")
+        )
+        assert response.status_code == 200
+
+    [stats] = pool.stats()
+    assert stats["requests"] == 1
+    assert stats["connections"] == 1
+    assert stats["reuse_ratio"] == 0.0
+    await pool.aclose()
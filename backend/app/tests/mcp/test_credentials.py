@@ -0,0 +1,207 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.mcp.openapi.credentials import CredentialCache, static_credential
+from app.mcp.openapi.executor import EndpointConfig, execute_endpoint
+from app.models.secret import AuthType
+
+TOKEN_URL = "https://auth.example.com/token"
+API_URL = "https://api.example.com/items"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def use_servers(monkeypatch, handler) -> list[httpx.Request]:
+    """Answer token and API requests with a handler, recording them."""
+    seen: list[httpx.Request] = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+    monkeypatch.setattr(
+        "app.mcp.openapi.executor.openapi_clients.get_client",
+        lambda url, auth_profile=None: client,  # noqa: ARG005
+    )
+    return seen
+
+
+def token_server(tokens: list[dict]):
+    """A token endpoint handing out the given token responses in turn."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == TOKEN_URL:
+            return httpx.Response(200, json=tokens.pop(0))
+        return httpx.Response(200, json={"auth": request.headers["authorization"]})
+
+    return handler
+
+
+def form(request: httpx.Request) -> dict[str, str]:
+    return {key: value[0] for key, value in parse_qs(request.content.decode()).items()}
+
+
+def test_static_credentials_are_prebuilt():
+    assert static_credential(AuthType.TOKEN, {"token": "t"}).headers == {
+        "Authorization": "Bearer t"
+    }
+    assert static_credential(
+        AuthType.BASIC, {"username": "user", "password": "pass"}
+    ).headers == {"Authorization": "Basic dXNlcjpwYXNz"}
+    assert static_credential(
+        AuthType.API_KEY, {"location": "query", "key": "api_key", "value": "k"}
+    ).params == {"api_key": "k"}
+
+    with pytest.raises(ValueError, match="'token'"):
+        static_credential(AuthType.TOKEN, {})
+    with pytest.raises(ValueError):
+        CredentialCache().register("profile", "kerberos", {})
+
+
+@pytest.mark.asyncio
+async def test_client_credentials_tokens_are_cached_and_refreshed_ahead(monkeypatch):
+    clock = FakeClock()
+    requests = use_servers(
+        monkeypatch,
+        token_server(
+            [
+                {"access_token": "first", "expires_in": 600},
+                {"access_token": "second", "expires_in": 600},
+            ]
+        ),
+    )
+    credentials = CredentialCache(refresh_margin=60, clock=clock)
+    credentials.register(
+        "profile",
+        AuthType.OAUTH2,
+        {
+            "token_url": TOKEN_URL,
+            "client_id": "id",
+            "client_secret": "secret",
+            "scope": "read",
+        },
+    )
+
+    # Concurrent first calls share one token request
+    first = await asyncio.gather(*(credentials.get("profile") for _ in range(5)))
+    assert {c.headers["Authorization"] for c in first} == {"Bearer first"}
+    assert form(requests[0]) == {
+        "grant_type": "client_credentials",
+        "scope": "read",
+        "client_id": "id",
+        "client_secret": "secret",
+    }
+
+    clock.now += 500
+    assert (await credentials.get("profile")).headers["Authorization"] == "Bearer first"
+    # Close to expiry, the old token is served while a new one is fetched
+    clock.now += 50
+    assert (await credentials.get("profile")).headers["Authorization"] == "Bearer first"
+    await asyncio.sleep(0.01)
+    assert (await credentials.get("profile")).headers["Authorization"] == (
+        "Bearer second"
+    )
+    assert len(requests) == 2
+    assert credentials.usage() == [
+        {"auth_profile": "profile", "fetches": 2, "expires_in": 600.0}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refresh_tokens_are_used_and_rotated(monkeypatch):
+    requests = use_servers(
+        monkeypatch,
+        token_server(
+            [
+                {"access_token": "a", "refresh_token": "r2", "token_type": "bearer"},
+                {"access_token": "b"},
+            ]
+        ),
+    )
+    credentials = CredentialCache()
+    credentials.register(
+        "profile",
+        AuthType.OAUTH2,
+        {
+            "token_url": TOKEN_URL,
+            "client_id": "id",
+            "client_secret": "secret",
+            "client_auth": "basic",
+            "refresh_token": "r1",
+        },
+    )
+
+    assert (await credentials.get("profile")).headers == {"Authorization": "Bearer a"}
+    assert credentials.invalidate("profile")
+    await credentials.get("profile")
+
+    assert [form(r) for r in requests] == [
+        {"grant_type": "refresh_token", "refresh_token": "r1"},
+        {"grant_type": "refresh_token", "refresh_token": "r2"},
+    ]
+    assert requests[0].headers["authorization"] == "Basic aWQ6c2VjcmV0"
+
+
+@pytest.mark.asyncio
+async def test_requests_are_authenticated_and_retried_on_401(monkeypatch):
+    tokens = iter(["stale", "fresh"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == TOKEN_URL:
+            return httpx.Response(200, json={"access_token": next(tokens)})
+        if request.headers.get("authorization") == "Bearer stale":
+            return httpx.Response(401, json={"message": "Bad credentials"})
+        return httpx.Response(200, json={"params": dict(request.url.params)})
+
+    use_servers(monkeypatch, handler)
+    credentials = CredentialCache()
+    monkeypatch.setattr("app.mcp.openapi.executor.openapi_credentials", credentials)
+    credentials.register(
+        "oauth", AuthType.OAUTH2, {"token_url": TOKEN_URL, "client_id": "id"}
+    )
+    credentials.register(
+        "key", AuthType.API_KEY, {"location": "query", "key": "k", "value": "v"}
+    )
+
+    response = await execute_endpoint(
+        EndpointConfig(url=API_URL, method="GET", auth_profile="oauth")
+    )
+    assert response.status_code == 200
+
+    response = await execute_endpoint(
+        EndpointConfig(url=API_URL, method="GET", auth_profile="key")
+    )
+    assert response.data == {"params": {"k": "v"}}
+
+
+@pytest.mark.asyncio
+async def test_token_errors_are_raised(monkeypatch):
+    use_servers(
+        monkeypatch,
+        lambda request: httpx.Response(  # noqa: ARG005
+            400, json={"error": "invalid_client"}
+        ),
+    )
+    credentials = CredentialCache()
+    monkeypatch.setattr("app.mcp.openapi.executor.openapi_credentials", credentials)
+    credentials.register(
+        "profile", AuthType.OAUTH2, {"token_url": TOKEN_URL, "client_id": "id"}
+    )
+
+    with pytest.raises(HTTPException) as error:
+        await execute_endpoint(
+            EndpointConfig(url=API_URL, method="GET", auth_profile="profile")
+        )
+    assert error.value.status_code == 401
+    assert "invalid_client" in error.value.detail
@@ -1,13 +1,19 @@
+import asyncio
 import json
 from typing import Any
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
+import httpx
 import pytest
 from pydantic import BaseModel
 
+from app.mcp.openapi.client_pool import openapi_clients
 from app.mcp.openapi.executor import (
+    APIResponse,
     EndpointConfig,
     execute_endpoint,
+    execute_many,
+    get_request_plan,
     translate_fn_to_endpoint,
 )
 from app.mcp.openapi.schema_to_func import schema_to_function
@@ -187,19 +193,11 @@ async def test_execute_endpoint_responses():
     """Test endpoint execution with success and error responses."""
     # Test successful response
     success_data = {"id": 1, "title": "Test Issue"}
-    success_response = AsyncMock(
-        status_code=200,
-        text=json.dumps(success_data),
-        json=lambda: success_data,
-    )
+    success_response = httpx.Response(200, json=success_data)
 
     # Test error response
     error_data = {"message": "Not Found"}
-    error_response = AsyncMock(
-        status_code=404,
-        text=json.dumps(error_data),
-        json=lambda: error_data,
-    )
+    error_response = httpx.Response(404, json=error_data)
 
     configs = [
         (
@@ -217,38 +215,69 @@ async def test_execute_endpoint_responses():
                 method="GET",
             ),
             error_response,
-            None,
+            {},
         ),
     ]
 
     for config, mock_response, expected_params in configs:
-        mock_client_instance = AsyncMock()
-        mock_client_instance.request.return_value = mock_response
+        requests: list[httpx.Request] = []
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value = mock_client_instance
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+        def handler(
+            request: httpx.Request, seen=requests, response=mock_response
+        ) -> httpx.Response:
+            seen.append(request)
+            return response
 
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(openapi_clients, "get_client", return_value=client):
             response = await execute_endpoint(config)
 
-            mock_client_instance.request.assert_called_once_with(
-                method="GET",
-                url="https://api.github.com/repos/test/test/issues",
-                headers=None,
-                params=expected_params,
-                json=None,
-            )
+            assert len(requests) == 1
+            assert requests[0].method == "GET"
+            assert requests[0].url.path == "/repos/test/test/issues"
+            assert dict(requests[0].url.params) == expected_params
+            assert requests[0].content == b""
 
             if mock_response.status_code == 200:
                 assert response.status_code == 200
                 assert response.data == success_data
                 assert response.error is None
+                assert response.truncated is False
             else:
                 assert response.status_code == 404
                 assert response.data is None
                 assert response.error == json.dumps(error_data)
 
 
+@pytest.mark.asyncio
+async def test_execute_endpoint_caps_and_projects_responses():
+    """Test that responses are cut at the byte cap and projected to fields."""
+    issues = [
+        {"id": n, "title": f"Issue {n}", "user": {"login": "octocat", "id": 7}}
+        for n in range(100)
+    ]
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=issues))  # noqa: ARG005
+    )
+    url = "https://api.github.com/repos/test/test/issues"
+
+    with patch.object(openapi_clients, "get_client", return_value=client):
+        response = await execute_endpoint(
+            EndpointConfig(url=url, method="GET", fields=["id", "user.login"])
+        )
+        assert response.data[0] == {"id": 0, "user": {"login": "octocat"}}
+        assert (len(response.data), response.truncated) == (100, False)
+
+        response = await execute_endpoint(
+            EndpointConfig(url=url, method="GET", max_response_bytes=1000)
+        )
+        # Only the issues read completely are kept
+        assert response.truncated
+        assert response.size == 1000
+        assert 0 < len(response.data) < 100
+        assert response.data == issues[: len(response.data)]
+
+
 def test_translate_fn_validation():
     """Test function translation validation."""
 
@@ -262,3 +291,184 @@ def test_translate_fn_validation():
             fn=invalid_fn,
             model_instance=TestModel(test_field="test"),
         )
+
+
+def test_request_plan_compiled_once_per_operation():
+    """Test that calls fill in a request plan compiled on the first call."""
+    schema = {
+        "name": "UpdateItem",
+        "type": "object",
+        "properties": {
+            "item_id": {"type": "integer"},
+            "version": {"type": "string"},
+            "session": {"type": "string"},
+            "title": {"type": "string"},
+            "note": {"type": "string"},
+        },
+        "required": ["item_id"],
+    }
+    metadata = {
+        "path": "/items/{id}/{unknown}",
+        "method": "PUT",
+        "headers": {"Accept": "application/json"},
+        "item_id": {"type": "parameter", "in": "path", "name": "id"},
+        "version": {"type": "parameter", "in": "header", "name": "X-Version"},
+        "session": {"type": "parameter", "in": "cookie"},
+    }
+    fn = schema_to_function(schema, metadata)
+    connection = type("Connection", (), {"base_url": "https://api.example.com/v2/"})
+
+    config = translate_fn_to_endpoint(
+        metadata=metadata,
+        connection=connection,
+        fn=fn,
+        model_instance=fn.model(item_id=7, version="3", session="abc", title="Hi"),
+    )
+    plan = get_request_plan(fn, metadata)
+
+    assert config.url == "https://api.example.com/v2/items/7/{unknown}"
+    assert config.method == "PUT"
+    assert config.headers == {
+        "Accept": "application/json",
+        "X-Version": "3",
+        "Cookie": "session=abc",
+    }
+    assert config.params is None
+    assert config.body == {"title": "Hi"}
+
+    config = translate_fn_to_endpoint(
+        metadata=metadata,
+        connection=connection,
+        fn=fn,
+        model_instance=fn.model(item_id=8),
+    )
+    assert get_request_plan(fn, metadata) is plan
+    assert config.url == "https://api.example.com/v2/items/8/{unknown}"
+    assert config.headers == {"Accept": "application/json"}
+    assert config.body is None
+
+
+@pytest.mark.asyncio
+async def test_execute_many_streams_results_under_concurrency_cap():
+    """Test that batches run concurrently, capped, with per-item errors."""
+    in_flight = 0
+    peak = 0
+
+    async def fetch(number: int) -> APIResponse:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (5 - number))
+        in_flight -= 1
+        if number == 3:
+            raise ValueError("bad number")
+        if number == 4:
+            return APIResponse(status_code=404, error="Not Found")
+        return APIResponse(status_code=200, data={"number": number})
+
+    results = [
+        item
+        async for item in execute_many(
+            fetch, [{"number": n} for n in range(5)], concurrency=2
+        )
+    ]
+
+    assert peak == 2
+    assert sorted(item.index for item in results) == [0, 1, 2, 3, 4]
+    by_index = {item.index: item for item in results}
+    assert by_index[0].result == {"number": 0}
+    assert by_index[3].error == "bad number"
+    assert by_index[4].error == "HTTP 404: Not Found"
+    # Results stream in completion order, not argument order
+    assert results[0].index == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_many_cancels_calls_when_closed_early():
+    """Test that calls still running stop when the caller stops reading."""
+    cancelled = []
+
+    async def slow(delay: float) -> str:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return "done"
+
+    batch = execute_many(slow, [{"delay": 0}, {"delay": 10}, {"delay": 10}])
+    first = await anext(batch)
+    await batch.aclose()
+
+    assert first.result == "done"
+    assert cancelled == [10, 10]
+
+
+@pytest.mark.asyncio
+async def test_execute_many_reports_failed_dynamic_function_calls():
+    """Test that a dynamic function timing out in a batch fails its item."""
+    schema = {
+        "name": "GetItem",
+        "type": "object",
+        "properties": {"item_id": {"type": "integer"}},
+        "required": ["item_id"],
+    }
+    metadata = {
+        "app_id": "github",
+        "path": "/items/{item_id}",
+        "method": "GET",
+        "item_id": {"type": "parameter", "in": "path"},
+    }
+    fn = schema_to_function(schema, metadata)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/items/1":
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json={"id": 2})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(openapi_clients, "get_client", return_value=client):
+        results = {
+            item.index: item
+            async for item in execute_many(fn, [{"item_id": 1}, {"item_id": 2}])
+        }
+
+    assert results[0].result is None
+    assert results[0].error.startswith("HTTP 504: Request timed out")
+    assert results[1].result == {"id": 2}
+    assert results[1].error is None
+
+
+@pytest.mark.asyncio
+async def test_dynamic_functions_take_response_options():
+    """Test that callers can project and cap the response of a generated function."""
+    schema = {
+        "name": "ListItems",
+        "type": "object",
+        "properties": {"state": {"type": "string"}},
+    }
+    metadata = {
+        "app_id": "github",
+        "path": "/items",
+        "method": "GET",
+        "state": {"type": "parameter", "in": "query"},
+    }
+    fn = schema_to_function(schema, metadata)
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, json={"total_count": 2, "items": [{"id": 1, "x": 2}, {"id": 2}]}
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(openapi_clients, "get_client", return_value=client):
+        response = await fn(state="open", response_fields=["items.id"])
+        capped = await fn(max_response_bytes=41)
+
+    assert dict(requests[0].url.params) == {"state": "open"}
+    assert requests[0].content == b""
+    assert response.data == {"items": [{"id": 1}, {"id": 2}]}
+    assert capped.truncated
+    assert capped.data == {"total_count": 2, "items": [{"id": 1, "x": 2}]}
@@ -0,0 +1,208 @@
+import httpx
+import pytest
+
+from app.mcp.openapi.http_cache import (
+    CachingTransport,
+    OpenAPIResponseCache,
+    freshness_lifetime,
+)
+
+URL = "https://api.example.com/items"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeAPI:
+    """Answers from a mutable item list, recording the requests it gets."""
+
+    def __init__(self, cache_control: str = "max-age=60"):
+        self.cache_control = cache_control
+        self.etag = '"v1"'
+        self.body = b'[{"id": 1}]'
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.method != "GET":
+            self.etag, self.body = '"v2"', b'[{"id": 1}, {"id": 2}]'
+            return httpx.Response(201)
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304, headers={"Cache-Control": self.cache_control})
+        return httpx.Response(
+            200,
+            headers={"Cache-Control": self.cache_control, "ETag": self.etag},
+            content=self.body,
+        )
+
+
+def make_client(
+    api: FakeAPI, cache: OpenAPIResponseCache, scope: str = "user-1"
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=CachingTransport(httpx.MockTransport(api), cache, scope)
+    )
+
+
+def test_freshness_lifetime():
+    def lifetime(status_code: int = 200, **headers) -> tuple[float, bool]:
+        headers = {k.replace("_", "-"): v for k, v in headers.items()}
+        return freshness_lifetime(httpx.Response(status_code, headers=headers), 300)
+
+    date = "Mon, 19 Oct 2026 12:00:00 GMT"
+    assert lifetime(cache_control="max-age=30, private") == (30.0, True)
+    assert lifetime(cache_control="no-store, max-age=30") == (0.0, False)
+    assert lifetime(cache_control="no-cache", etag='"a"') == (0.0, True)
+    assert lifetime(date=date, expires="Mon, 19 Oct 2026 12:01:00 GMT") == (60.0, True)
+    # 10% of the time since the last modification, capped
+    assert lifetime(date=date, last_modified="Mon, 19 Oct 2026 11:50:00 GMT") == (
+        60.0,
+        True,
+    )
+    assert lifetime(date=date, last_modified="Mon, 12 Oct 2026 12:00:00 GMT") == (
+        300.0,
+        True,
+    )
+    assert lifetime() == (0.0, False)
+    assert lifetime(500, last_modified=date) == (0.0, False)
+
+
+@pytest.mark.asyncio
+async def test_fresh_responses_are_served_then_revalidated():
+    api, clock = FakeAPI(), Clock()
+    cache = OpenAPIResponseCache(memory_bytes=1 << 20, clock=clock)
+
+    async with make_client(api, cache) as client:
+        first = await client.get(URL)
+        second = await client.get(URL)
+        assert second.json() == first.json() == [{"id": 1}]
+        assert len(api.requests) == 1
+
+        # Stale responses are revalidated and refreshed by a 304
+        clock.now += 61
+        third = await client.get(URL)
+        assert third.status_code == 200
+        assert third.json() == [{"id": 1}]
+        assert api.requests[-1].headers["If-None-Match"] == '"v1"'
+        await client.get(URL)
+        assert len(api.requests) == 2
+
+        # Writes invalidate the responses stored for their URL
+        await client.post(URL, json={"id": 2})
+        assert (await client.get(URL)).json() == [{"id": 1}, {"id": 2}]
+        assert "If-None-Match" not in api.requests[-1].headers
+
+        # Callers can ask for revalidation
+        await client.get(URL, headers={"Cache-Control": "no-cache"})
+        assert api.requests[-1].headers["If-None-Match"] == '"v2"'
+
+    assert cache.usage()["hits"] == 2
+    assert cache.usage()["revalidated"] == 2
+    assert cache.usage()["invalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_responses_are_scoped_per_credential():
+    api = FakeAPI()
+    cache = OpenAPIResponseCache(memory_bytes=1 << 20, clock=Clock())
+
+    async with (
+        make_client(api, cache, "user-1") as one,
+        make_client(api, cache, "user-2") as two,
+    ):
+        await one.get(URL, headers={"Authorization": "Bearer a"})
+        await one.get(URL, headers={"Authorization": "Bearer a"})
+        await one.get(URL, headers={"Authorization": "Bearer b"})
+        await two.get(URL, headers={"Authorization": "Bearer a"})
+
+    assert len(api.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_no_store_responses_are_not_stored():
+    api = FakeAPI(cache_control="no-store")
+    cache = OpenAPIResponseCache(memory_bytes=1 << 20, clock=Clock())
+
+    async with make_client(api, cache) as client:
+        await client.get(URL)
+        await client.get(URL)
+
+    assert len(api.requests) == 2
+    assert cache.usage()["memory_entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_spills_to_bounded_disk_tier(tmp_path):
+    api = FakeAPI()
+    api.body = b"x" * 1000
+    cache = OpenAPIResponseCache(
+        memory_bytes=1500, disk_bytes=2500, disk_dir=tmp_path, clock=Clock()
+    )
+
+    async with make_client(api, cache) as client:
+        for page in range(4):
+            await client.get(URL, params={"page": page})
+        usage = cache.usage()
+        assert usage["memory_entries"] == 1
+        assert usage["disk_entries"] == 2
+        assert usage["evicted"] == 1
+        assert usage["disk_bytes"] <= 2500
+
+        # Disk hits move back to memory without a request
+        response = await client.get(URL, params={"page": 2})
+        assert response.content == api.body
+        assert len(api.requests) == 4
+        assert cache.usage()["hits"] == 1
+
+        # The evicted page is requested again
+        await client.get(URL, params={"page": 0})
+        assert len(api.requests) == 5
+
+    # Spilled entries live in a private directory, deleted on close
+    [disk_dir] = tmp_path.iterdir()
+    assert disk_dir.stat().st_mode & 0o777 == 0o700
+    assert any(disk_dir.iterdir())
+    cache.close()
+    assert not disk_dir.exists()
+    assert cache.usage()["memory_entries"] == cache.usage()["disk_entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_large_chunked_responses_are_streamed_through():
+    sent: list[bytes] = []
+
+    async def chunks():
+        for n in range(10):
+            sent.append(bytes([n]) * 100)
+            yield sent[-1]
+
+    def api(request: httpx.Request) -> httpx.Response:  # noqa: ARG001
+        # Without a Content-Length, as the body is chunked
+        return httpx.Response(
+            200, headers={"Cache-Control": "max-age=60"}, content=chunks()
+        )
+
+    cache = OpenAPIResponseCache(
+        memory_bytes=1 << 20, max_entry_bytes=250, clock=Clock()
+    )
+    async with httpx.AsyncClient(
+        transport=CachingTransport(httpx.MockTransport(api), cache, "user-1")
+    ) as client:
+        async with client.stream("GET", URL) as response:
+            assert "content-length" not in response.headers
+            # Buffering stopped once the response outgrew a cache entry
+            assert len(sent) == 3
+            content = await response.aread()
+        assert content == b"".join(sent)
+        assert len(sent) == 10
+
+        sent.clear()
+        assert len((await client.get(URL)).content) == 1000
+
+    assert cache.usage()["memory_entries"] == 0
+    assert cache.usage()["stored"] == 0
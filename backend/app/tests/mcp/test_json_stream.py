@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from app.mcp.openapi.json_stream import JSONStream, project, projection
+
+DOCUMENT = {
+    "total_count": 3,
+    "a:b": [1, {"c": "]}"}],
+    "items": [
+        {"id": n, "body": 'quote " and \\ escape, [brackets]', "user": {"login": "u"}}
+        for n in range(3)
+    ],
+}
+
+
+def decode(text: str, chunk_size: int, fields: list[str] | None = None) -> JSONStream:
+    document = JSONStream(fields)
+    for start in range(0, len(text), chunk_size):
+        document.feed(text[start : start + chunk_size])
+    return document
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1000])
+def test_documents_decode_across_chunk_boundaries(chunk_size):
+    text = json.dumps(DOCUMENT, indent=2)
+    assert decode(text, chunk_size).close() == DOCUMENT
+
+    text = json.dumps(DOCUMENT["items"])
+    assert decode(text, chunk_size).close() == DOCUMENT["items"]
+
+
+def test_cut_documents_keep_complete_items():
+    text = json.dumps(DOCUMENT["items"])
+    document = decode(text[: len(text) - 10], 16)
+
+    assert document.close(partial=True) == DOCUMENT["items"][:2]
+    with pytest.raises(ValueError, match="Unterminated"):
+        document.close()
+
+
+def test_other_documents():
+    assert decode(" 42 ", 2).close() == 42
+    assert decode("<html>Not JSON</html>", 4).close() == "<html>Not JSON</html>"
+    assert decode("", 1).close() is None
+    with pytest.raises(ValueError):
+        decode('{"a": 1, oops}', 4).close()
+
+
+def test_fields_are_projected():
+    assert projection(["user.login", "id"]) == {"user": {"login": {}}, "id": {}}
+    assert project([{"id": 1, "x": 2}], {"id": {}}) == [{"id": 1}]
+
+    text = json.dumps(DOCUMENT)
+    assert decode(text, 5, ["total_count", "items.user.login"]).close() == {
+        "total_count": 3,
+        "items": [{"user": {"login": "u"}}] * 3,
+    }
+    assert decode(json.dumps(DOCUMENT["items"]), 5, ["id"]).close() == [
+        {"id": 0},
+        {"id": 1},
+        {"id": 2},
+    ]
+
+
+def test_cut_envelopes_keep_complete_items():
+    text = json.dumps(DOCUMENT)
+    document = decode(text[: len(text) - 10], 16)
+
+    assert document.close(partial=True) == {
+        "total_count": 3,
+        "a:b": [1, {"c": "]}"}],
+        "items": DOCUMENT["items"][:2],
+    }
+
+    document = decode(text[: len(text) - 10], 16, ["items.id"])
+    assert document.close(partial=True) == {"items": [{"id": 0}, {"id": 1}]}
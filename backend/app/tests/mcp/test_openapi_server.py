@@ -0,0 +1,196 @@
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.client.transports import FastMCPTransport
+from fastmcp.exceptions import ToolError
+
+from app.mcp.openapi.server import (
+    BATCH_TOOL,
+    PAGINATE_TOOL,
+    create_openapi_server,
+    load_tool_definitions,
+)
+from app.mcp.transports import create_transport
+from app.models import MCPServer
+from app.models.mcp.template import MCPTemplateKind
+
+GET_ISSUE = {
+    "id": "get_issue",
+    "tool_schema": {
+        "name": "GetIssue",
+        "description": "Get one issue of a repository",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "repo": {"type": "string"},
+                "number": {"type": "integer"},
+                "fields": {"type": "string", "default": "all"},
+            },
+            "required": ["repo", "number"],
+        },
+    },
+    "tool_metadata": {
+        "path": "/repos/{repo}/issues/{number}",
+        "method": "GET",
+        "repo": {"type": "parameter", "in": "path"},
+        "number": {"type": "parameter", "in": "path"},
+        "fields": {"type": "parameter", "in": "query"},
+    },
+}
+
+
+def make_server(**settings) -> MCPServer:
+    return MCPServer(
+        id="issues-api",
+        name="Issues API",
+        description="Test OpenAPI server",
+        kind=MCPTemplateKind.OPENAPI,
+        transport="openapi",
+        version="1.0.0",
+        url="https://api.example.com",
+        settings=settings,
+    )
+
+
+@pytest.fixture
+def requests(monkeypatch) -> list[httpx.Request]:
+    """Answer API calls from memory, recording the requests made."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path.endswith("/404"):
+            return httpx.Response(404, json={"message": "Not Found"})
+        return httpx.Response(200, json={"title": "Bug"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(
+        "app.mcp.openapi.executor.openapi_clients.get_client",
+        lambda url, auth_profile=None: client,  # noqa: ARG005
+    )
+    return seen
+
+
+def test_openapi_servers_run_in_process():
+    server = make_server(provider="github")
+
+    assert isinstance(create_transport(server), FastMCPTransport)
+    assert load_tool_definitions(server)[0]["id"] == "list_github_issues"
+
+    with pytest.raises(ValueError, match="providers"):
+        load_tool_definitions(make_server(provider="../secrets"))
+
+    spec = {
+        "openapi": "3.0.3",
+        "paths": {
+            "/a": {"get": {"operationId": "getA"}},
+            "/b": {"get": {"operationId": "getB"}},
+        },
+    }
+    definitions = load_tool_definitions(make_server(spec=spec, operations=["getB"]))
+    assert [definition["id"] for definition in definitions] == ["getB"]
+    with pytest.raises(ValueError, match="no operation 'getC'"):
+        load_tool_definitions(make_server(spec=spec, operations=["getC"]))
+
+
+@pytest.mark.asyncio
+async def test_tools_call_the_api(requests):
+    server = make_server(tools=[GET_ISSUE], headers={"Authorization": "Bearer t"})
+
+    async with Client(create_openapi_server(server)) as client:
+        tool, *server_tools = await client.list_tools()
+        assert tool.name == "get_issue"
+        assert {t.name for t in server_tools} == {BATCH_TOOL, PAGINATE_TOOL}
+        assert tool.inputSchema["required"] == ["repo", "number"]
+
+        result = await client.call_tool("get_issue", {"repo": "centroid", "number": 7})
+        assert result[0].text == '{\n  "title": "Bug"\n}'
+
+        with pytest.raises(ToolError, match="HTTP 404"):
+            await client.call_tool("get_issue", {"repo": "centroid", "number": 404})
+
+    request = requests[0]
+    assert (
+        str(request.url) == "https://api.example.com/repos/centroid/issues/7?fields=all"
+    )
+    assert request.headers["Authorization"] == "Bearer t"
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_fans_out_calls(requests):
+    server = make_server(tools=[GET_ISSUE])
+
+    async with Client(create_openapi_server(server)) as client:
+        result = await client.call_tool(
+            BATCH_TOOL,
+            {
+                "tool": "get_issue",
+                "arguments": [
+                    {"repo": "centroid", "number": 1},
+                    {"repo": "centroid", "number": 404},
+                    {"repo": "centroid"},
+                ],
+            },
+        )
+        items = sorted(json.loads(result[0].text), key=lambda item: item["index"])
+
+        with pytest.raises(ToolError, match="Unknown tool"):
+            await client.call_tool(BATCH_TOOL, {"tool": "nope", "arguments": []})
+
+    assert items[0] == {"index": 0, "result": {"title": "Bug"}, "error": None}
+    assert items[1]["error"].startswith("HTTP 404")
+    assert "number" in items[2]["error"]
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_pages_tool_gathers_every_page(monkeypatch):
+    list_issues = {
+        "id": "list_issues",
+        "tool_schema": {
+            "name": "ListIssues",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "page": {"type": "integer", "default": 1},
+                    "per_page": {"type": "integer", "default": 2},
+                },
+            },
+        },
+        "tool_metadata": {
+            "path": "/issues",
+            "method": "GET",
+            "page": {"type": "parameter", "in": "query"},
+            "per_page": {"type": "parameter", "in": "query"},
+        },
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        return httpx.Response(
+            200, json=[{"n": n} for n in range(5)][2 * page - 2 : 2 * page]
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(
+        "app.mcp.openapi.executor.openapi_clients.get_client",
+        lambda url, auth_profile=None: client,  # noqa: ARG005
+    )
+
+    async with Client(create_openapi_server(make_server(tools=[list_issues]))) as mcp:
+        result = await mcp.call_tool(
+            PAGINATE_TOOL, {"tool": "list_issues", "arguments": {}}
+        )
+        pages = json.loads(result[0].text)
+        assert pages == {
+            "items": [{"n": n} for n in range(5)],
+            "pages": 3,
+            "truncated": False,
+        }
+
+        result = await mcp.call_tool(
+            PAGINATE_TOOL, {"tool": "list_issues", "arguments": {}, "max_items": 3}
+        )
+        assert json.loads(result[0].text)["truncated"] is True
@@ -0,0 +1,186 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.mcp.openapi.executor import EndpointConfig
+from app.mcp.openapi.pagination import Paginator, extract_items, next_link
+
+ITEMS = [{"id": n} for n in range(1, 8)]
+URL = "https://api.example.com/items"
+
+
+def use_api(monkeypatch, handler) -> list[httpx.Request]:
+    """Answer API calls with a handler, recording the requests made."""
+    seen: list[httpx.Request] = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+    monkeypatch.setattr(
+        "app.mcp.openapi.executor.openapi_clients.get_client",
+        lambda url, auth_profile=None: client,  # noqa: ARG005
+    )
+    return seen
+
+
+def query(request: httpx.Request, name: str, default: int) -> int:
+    return int(request.url.params.get(name, default))
+
+
+def test_page_parsing():
+    assert (
+        next_link(
+            {
+                "Link": '<https://api.example.com/items?page=3>; rel="next", '
+                '<https://api.example.com/items?page=9>; rel="last"'
+            }
+        )
+        == "https://api.example.com/items?page=3"
+    )
+    assert next_link({"link": '<https://x/?page=1>; rel="prev"'}) is None
+    assert next_link({}) is None
+
+    assert extract_items([1, 2]) == [1, 2]
+    assert extract_items({"data": [1], "total": 1}) == [1]
+    assert extract_items({"issues": [1], "count": 1}) == [1]
+    assert extract_items({"a": [1], "b": [2]}) == []
+
+
+@pytest.mark.asyncio
+async def test_link_headers_are_followed_with_prefetch(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = query(request, "page", 1)
+        headers = {}
+        if page < 3:
+            headers["Link"] = f'<{URL}?page={page + 1}&per_page=3>; rel="next"'
+        return httpx.Response(
+            200, json=ITEMS[(page - 1) * 3 : page * 3], headers=headers
+        )
+
+    requests = use_api(monkeypatch, handler)
+    pages = Paginator(EndpointConfig(url=URL, method="GET", params={"per_page": 3}))
+
+    iterator = aiter(pages)
+    assert await anext(iterator) == {"id": 1}
+    # The second page is requested while the first one is consumed
+    await asyncio.sleep(0.01)
+    assert len(requests) == 2
+
+    items = [{"id": 1}] + [item async for item in iterator]
+    assert items == ITEMS
+    assert (pages.style, pages.pages, pages.truncated) == ("link", 3, False)
+
+
+@pytest.mark.asyncio
+async def test_cursor_fields_are_followed(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params.get("cursor") or 0)
+        body = {"members": ITEMS[start : start + 3], "response_metadata": {}}
+        if start + 3 < len(ITEMS):
+            body["response_metadata"]["next_cursor"] = str(start + 3)
+        return httpx.Response(200, json=body)
+
+    use_api(monkeypatch, handler)
+    pages = Paginator(
+        EndpointConfig(url=URL, method="GET"),
+        metadata={"cursor": {"type": "parameter", "in": "query"}},
+    )
+
+    assert [item async for item in pages] == ITEMS
+    assert (pages.style, pages.pages) == ("cursor", 3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params, style",
+    [({"page": 1, "per_page": 3}, "page"), ({"offset": 0, "limit": 3}, "offset")],
+)
+async def test_page_and_offset_parameters_are_advanced(monkeypatch, params, style):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "page" in request.url.params:
+            start = (query(request, "page", 1) - 1) * 3
+        else:
+            start = query(request, "offset", 0)
+        return httpx.Response(200, json={"results": ITEMS[start : start + 3]})
+
+    requests = use_api(monkeypatch, handler)
+    pages = Paginator(EndpointConfig(url=URL, method="GET", params=params))
+
+    assert [item async for item in pages] == ITEMS
+    # The short third page is the last one
+    assert (pages.style, len(requests)) == (style, 3)
+
+
+@pytest.mark.asyncio
+async def test_item_and_byte_caps_truncate(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = query(request, "page", 1)
+        return httpx.Response(200, json=ITEMS[(page - 1) * 3 : page * 3])
+
+    use_api(monkeypatch, handler)
+    config = EndpointConfig(url=URL, method="GET", params={"page": 1, "per_page": 3})
+
+    pages = Paginator(config, max_items=4)
+    assert [item async for item in pages] == ITEMS[:4]
+    assert pages.truncated
+
+    pages = Paginator(config, max_items=3)
+    assert [item async for item in pages] == ITEMS[:3]
+    assert pages.truncated
+
+    # Each item is 9 bytes of JSON
+    pages = Paginator(config, max_bytes=20)
+    assert [item async for item in pages] == ITEMS[:2]
+    assert (pages.bytes, pages.truncated) == (18, True)
+
+
+@pytest.mark.asyncio
+async def test_page_errors_are_raised(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if query(request, "page", 1) == 2:
+            return httpx.Response(500, json={"message": "boom"})
+        return httpx.Response(200, json=ITEMS[:3])
+
+    use_api(monkeypatch, handler)
+    pages = Paginator(
+        EndpointConfig(url=URL, method="GET", params={"page": 1, "per_page": 3})
+    )
+
+    items = []
+    with pytest.raises(HTTPException) as error:
+        async for item in pages:
+            items.append(item)
+    assert error.value.status_code == 500
+    assert items == ITEMS[:3]
+
+
+@pytest.mark.asyncio
+async def test_next_pages_on_other_hosts_are_not_followed(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        next_url = (
+            "http://api.example.com/items?page=2"
+            if request.url.params.get("insecure")
+            else "https://evil.example.com/items?page=2"
+        )
+        return httpx.Response(200, json={"data": ITEMS[:3], "next": next_url})
+
+    requests = use_api(monkeypatch, handler)
+    for params in (None, {"insecure": 1}):
+        pages = Paginator(EndpointConfig(url=URL, method="GET", params=params))
+        assert [item async for item in pages] == ITEMS[:3]
+        assert (pages.pages, pages.truncated) == (1, True)
+    assert {request.url.host for request in requests} == {"api.example.com"}
+    assert len(requests) == 2
+
+
+def test_caps_cannot_exceed_settings(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAPI_PAGINATION_MAX_ITEMS", 100)
+    config = EndpointConfig(url=URL, method="GET")
+    assert Paginator(config, max_items=10**9).max_items == 100
+    assert Paginator(config, max_items=10).max_items == 10
+    assert Paginator(config).max_items == 100
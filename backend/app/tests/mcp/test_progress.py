@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastmcp import Client, Context, FastMCP
+
+from app.mcp.proxy import MCPProxy
+from app.mcp.queue_manager import queue_manager
+from app.models import MCPRunConfig, MCPServer
+from app.tests.utils.redis import FakeRedis
+
+
+def make_upstream() -> FastMCP:
+    upstream = FastMCP("upstream")
+
+    @upstream.tool()
+    async def deploy(steps: int, ctx: Context) -> str:
+        for step in range(steps):
+            await ctx.report_progress(step + 1, steps)
+        return "deployed"
+
+    return upstream
+
+
+@pytest_asyncio.fixture
+async def gateway(monkeypatch):
+    """Gateway app with one mounted proxy, served by a queue worker on FakeRedis."""
+    redis = FakeRedis()
+    monkeypatch.setattr(queue_manager, "redis", redis)
+    monkeypatch.setattr(queue_manager, "pubsub", redis.pubsub())
+    await queue_manager.pubsub.subscribe(
+        queue_manager.response_channel, queue_manager.cancel_channel
+    )
+
+    proxy = MCPProxy(
+        mcp_server=MCPServer(
+            id="upstream",
+            name="Upstream",
+            description="Test server",
+            transport="stdio",
+            version="1.0.0",
+            run=MCPRunConfig(command="true"),
+        )
+    )
+    proxy.client = Client(make_upstream())
+    assert await proxy.initialize()
+
+    app = FastMCP("gateway")
+    proxy.mount(app)
+    worker = asyncio.create_task(queue_manager.start_worker({"upstream": proxy}))
+
+    yield app
+
+    await queue_manager.drain(timeout=1)
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    await proxy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_gateway_relays_upstream_progress(gateway):
+    progress: list[tuple[float, float | None]] = []
+
+    async def on_progress(value, total, message):  # noqa: ARG001
+        progress.append((value, total))
+
+    async with Client(gateway) as client:
+        result = await client.call_tool(
+            "upstream_deploy", {"steps": 3}, progress_handler=on_progress
+        )
+
+    assert result[0].text == "deployed"
+    assert progress == [(1, 3), (2, 3), (3, 3)]
@@ -0,0 +1,237 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from mcp.types import TextContent
+
+from app.mcp.queue_manager import RedisQueueManager
+from app.tests.utils.redis import FakeRedis
+
+
+def make_proxy(delay: float = 0.0) -> MagicMock:
+    """Create a proxy whose client answers every tool call after `delay` seconds."""
+
+    async def call_tool(name, arguments, progress_handler=None):  # noqa: ARG001
+        steps = arguments.get("steps", 0)
+        for step in range(steps):
+            if progress_handler:
+                await progress_handler(step + 1, steps, f"step {step + 1}")
+            await asyncio.sleep(delay / max(steps, 1))
+        if not steps:
+            await asyncio.sleep(delay)
+        return [TextContent(type="text", text=f"{name} done")]
+
+    proxy = MagicMock()
+    proxy.mcp_server.settings = {}
+    proxy.client.is_connected.return_value = True
+    proxy.client.call_tool = call_tool
+    return proxy
+
+
+@pytest.fixture
+def queue() -> RedisQueueManager:
+    manager = RedisQueueManager()
+    manager.redis = FakeRedis()
+    return manager
+
+
+def published_responses(queue: RedisQueueManager) -> dict[str, dict]:
+    responses = [
+        json.loads(message)
+        for channel, message in queue.redis.published
+        if channel == queue.response_channel
+    ]
+    return {response["request_id"]: response for response in responses}
+
+
+async def start_processor(
+    queue: RedisQueueManager, proxies: dict[str, MagicMock]
+) -> asyncio.Task:
+    queue._running = True
+    return asyncio.create_task(queue.process_tool_calls(proxies))
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_calls(queue):
+    """In-flight calls finish and publish their result before drain returns."""
+    processor = await start_processor(queue, {"server": make_proxy(delay=0.2)})
+    request_id = await queue.enqueue_tool_call("server", "deploy", {})
+
+    while request_id not in queue._in_flight:
+        await asyncio.sleep(0.01)
+
+    await queue.drain(timeout=5)
+    await asyncio.wait_for(processor, timeout=2)
+
+    response = published_responses(queue)[request_id]
+    assert response["success"] is True
+    assert response["result"][0]["text"] == "deploy done"
+    assert not queue._in_flight
+
+
+@pytest.mark.asyncio
+async def test_drain_deadline_cancels_and_reports(queue):
+    """Calls still running at the deadline are cancelled and fail fast."""
+    processor = await start_processor(queue, {"server": make_proxy(delay=10)})
+    request_id = await queue.enqueue_tool_call("server", "scan", {})
+
+    while request_id not in queue._in_flight:
+        await asyncio.sleep(0.01)
+
+    await queue.drain(timeout=0.1)
+    await asyncio.wait_for(processor, timeout=2)
+
+    response = published_responses(queue)[request_id]
+    assert response["success"] is False
+    assert "shutdown" in response["error"]
+
+
+@pytest.mark.asyncio
+async def test_unstarted_calls_stay_queued(queue, monkeypatch):
+    """Calls that were never picked up are left on the queue for other nodes."""
+    monkeypatch.setattr("app.mcp.queue_manager.settings.MCP_QUEUE_CONCURRENCY", 1)
+    processor = await start_processor(queue, {"server": make_proxy(delay=0.2)})
+    first = await queue.enqueue_tool_call("server", "first", {})
+    while first not in queue._in_flight:
+        await asyncio.sleep(0.01)
+    second = await queue.enqueue_tool_call("server", "second", {})
+
+    await queue.drain(timeout=5)
+    await asyncio.wait_for(processor, timeout=2)
+
+    assert first in published_responses(queue)
+    assert second not in published_responses(queue)
+    remaining = [json.loads(m) for m in queue.redis.lists[queue.tool_queue]]
+    assert [r["request_id"] for r in remaining] == [second]
+
+
+@pytest.mark.asyncio
+async def test_requeue_hands_back_to_consuming_end(queue):
+    """Requeued messages are the next ones popped by any worker."""
+    await queue.redis.lpush(queue.tool_queue, "later")
+    await queue.requeue("returned")
+
+    _, message = await queue.redis.brpop(queue.tool_queue, timeout=1)
+    assert message == "returned"
+
+
+async def start_listener(queue: RedisQueueManager) -> asyncio.Task:
+    queue.pubsub = queue.redis.pubsub()
+    await queue.pubsub.subscribe(queue.response_channel, queue.cancel_channel)
+    return asyncio.create_task(queue.start_response_listener())
+
+
+async def collect_events(queue: RedisQueueManager, request_id: str) -> list[dict]:
+    return [event async for event in queue.stream_events(request_id, block_ms=2000)]
+
+
+@pytest.mark.asyncio
+async def test_streamed_call_publishes_progress_then_result(queue):
+    processor = await start_processor(queue, {"server": make_proxy(delay=0.05)})
+    request_id = await queue.enqueue_tool_call(
+        "server", "deploy", {"steps": 3}, stream=True
+    )
+
+    events = await asyncio.wait_for(collect_events(queue, request_id), timeout=5)
+
+    assert [event["type"] for event in events] == [
+        "progress",
+        "progress",
+        "progress",
+        "result",
+    ]
+    assert events[1] == {
+        "type": "progress",
+        "progress": 2,
+        "total": 3,
+        "message": "step 2",
+    }
+    assert events[-1]["result"][0]["text"] == "deploy done"
+
+    await queue.drain(timeout=1)
+    await asyncio.wait_for(processor, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_unstreamed_call_writes_no_events(queue):
+    processor = await start_processor(queue, {"server": make_proxy()})
+    request_id = await queue.enqueue_tool_call("server", "deploy", {"steps": 2})
+
+    while request_id not in published_responses(queue):
+        await asyncio.sleep(0.01)
+
+    assert not queue.redis.streams
+    await queue.drain(timeout=1)
+    await asyncio.wait_for(processor, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_call(queue):
+    listener = await start_listener(queue)
+    processor = await start_processor(queue, {"server": make_proxy(delay=10)})
+    request_id = await queue.enqueue_tool_call(
+        "server", "scan", {"steps": 100}, stream=True
+    )
+    while request_id not in queue._in_flight:
+        await asyncio.sleep(0.01)
+
+    await queue.cancel_tool_call(request_id)
+    events = await asyncio.wait_for(collect_events(queue, request_id), timeout=5)
+
+    assert events[-1] == {"type": "error", "error": "Tool call cancelled by caller"}
+    assert published_responses(queue)[request_id]["success"] is False
+
+    await queue.drain(timeout=1)
+    await asyncio.wait_for(processor, timeout=2)
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_call_before_it_starts(queue):
+    request_id = await queue.enqueue_tool_call("server", "scan", {}, stream=True)
+    await queue.cancel_tool_call(request_id)
+
+    processor = await start_processor(queue, {"server": make_proxy()})
+    events = await asyncio.wait_for(collect_events(queue, request_id), timeout=5)
+
+    assert events == [{"type": "error", "error": "Tool call cancelled by caller"}]
+    await queue.drain(timeout=1)
+    await asyncio.wait_for(processor, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_streams_of_unknown_calls_end_with_an_error(queue):
+    events = await asyncio.wait_for(collect_events(queue, "no-such-call"), timeout=5)
+
+    assert events == [{"type": "error", "error": "Unknown or expired tool call"}]
+
+
+@pytest.mark.asyncio
+async def test_streams_end_at_their_deadline(queue):
+    request_id = await queue.enqueue_tool_call("server", "scan", {}, stream=True)
+
+    events = [
+        event
+        async for event in queue.stream_events(request_id, block_ms=50, timeout=0.2)
+    ]
+
+    assert events == [{"type": "error", "error": "Timed out waiting for the tool call"}]
+    assert await queue.call_proxy_id(request_id) == "server"
+
+
+@pytest.mark.asyncio
+async def test_expired_calls_report_an_error(queue):
+    request_id = await queue.enqueue_tool_call(
+        "server", "scan", {}, timeout=0, stream=True
+    )
+    await asyncio.sleep(0.01)
+
+    processor = await start_processor(queue, {"server": make_proxy()})
+    events = await asyncio.wait_for(collect_events(queue, request_id), timeout=5)
+
+    assert events == [{"type": "error", "error": "Tool call expired before it started"}]
+    assert published_responses(queue)[request_id]["success"] is False
+    await queue.drain(timeout=1)
+    await asyncio.wait_for(processor, timeout=2)
@@ -0,0 +1,141 @@
+import httpx
+import pytest
+
+from app.mcp.openapi.rate_limit import (
+    RateLimitedTransport,
+    RateLimiter,
+    rate_limit_window,
+    retry_after,
+)
+
+URL = "https://api.example.com/items"
+NOW = 1_800_000_000.0
+
+
+class FakeTime:
+    """A clock whose sleeps return at once and move it forward."""
+
+    def __init__(self):
+        self.now = NOW
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+def make_client(
+    handler, fake_time: FakeTime, scope: str = "user-1", **limits
+) -> tuple[httpx.AsyncClient, RateLimiter]:
+    limiter = RateLimiter(clock=fake_time.clock, sleep=fake_time.sleep, **limits)
+    transport = RateLimitedTransport(httpx.MockTransport(handler), limiter, scope)
+    return httpx.AsyncClient(transport=transport), limiter
+
+
+def test_rate_limit_headers():
+    assert retry_after(httpx.Headers({"Retry-After": "7"}), NOW) == 7.0
+    date = httpx.Headers({"Retry-After": "Fri, 15 Jan 2027 08:00:10 GMT"})
+    assert retry_after(date, NOW) == 10.0
+    assert retry_after(httpx.Headers(), NOW) is None
+
+    github = httpx.Headers(
+        {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "12",
+            "X-RateLimit-Reset": str(int(NOW) + 60),
+        }
+    )
+    assert rate_limit_window(github, NOW) == (5000, 12, 60.0)
+    draft = httpx.Headers({"RateLimit-Remaining": "3", "RateLimit-Reset": "20"})
+    assert rate_limit_window(draft, NOW) == (None, 3, 20.0)
+    assert rate_limit_window(httpx.Headers(), NOW) is None
+
+
+@pytest.mark.asyncio
+async def test_token_buckets_pace_requests():
+    fake_time = FakeTime()
+    client, limiter = make_client(
+        lambda request: httpx.Response(200),  # noqa: ARG005
+        fake_time,
+        credential_rate=10,
+        credential_burst=2,
+    )
+
+    async with client:
+        for _ in range(5):
+            await client.get(URL)
+
+    # Two requests of burst, then one every 100ms
+    assert fake_time.sleeps == [0.1, 0.1, 0.1]
+    [host] = limiter.usage()
+    assert host["requests"] == 5
+    assert host["throttled_seconds"] == pytest.approx(0.3)
+
+
+@pytest.mark.asyncio
+async def test_quota_headers_slow_down_requests():
+    fake_time = FakeTime()
+    remaining = iter([50, 4, 4, 0])
+
+    def handler(request: httpx.Request) -> httpx.Response:  # noqa: ARG001
+        return httpx.Response(
+            200,
+            headers={
+                "X-RateLimit-Limit": "100",
+                "X-RateLimit-Remaining": str(next(remaining, 100)),
+                "X-RateLimit-Reset": str(int(fake_time.now) + 8),
+            },
+        )
+
+    client, _ = make_client(handler, fake_time)
+    async with client:
+        await client.get(URL)
+        await client.get(URL)
+        assert fake_time.sleeps == []
+        # 4 requests left for 8 seconds, one every 2 seconds
+        await client.get(URL)
+        await client.get(URL)
+        assert fake_time.sleeps == [2.0]
+        # An exhausted quota waits for the reset
+        await client.get(URL)
+        assert fake_time.sleeps == [2.0, 8.0]
+
+
+@pytest.mark.asyncio
+async def test_idempotent_requests_are_retried():
+    fake_time = FakeTime()
+    answers: list[httpx.Response] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:  # noqa: ARG001
+        return answers.pop(0)
+
+    client, limiter = make_client(
+        handler, fake_time, max_retries=2, backoff=0.5, max_delay=30
+    )
+    async with client:
+        answers[:] = [
+            httpx.Response(429, headers={"Retry-After": "3"}),
+            httpx.Response(200),
+        ]
+        assert (await client.get(URL)).status_code == 200
+        assert fake_time.sleeps == [3.0]
+
+        # Without Retry-After the backoff is jittered and grows per attempt
+        fake_time.sleeps.clear()
+        answers[:] = [httpx.Response(503)] * 3
+        assert (await client.get(URL)).status_code == 503
+        assert len(fake_time.sleeps) == 2
+        assert 0 <= fake_time.sleeps[0] <= 0.5
+        assert 0 <= fake_time.sleeps[1] <= 1.0
+
+        # Unsafe methods and waits longer than the maximum are not retried
+        answers[:] = [httpx.Response(503)]
+        assert (await client.post(URL, json={})).status_code == 503
+        answers[:] = [httpx.Response(429, headers={"Retry-After": "60"})]
+        assert (await client.get(URL)).status_code == 429
+
+    assert limiter.usage()[0]["retries"] == 3
+    assert answers == []
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import psutil
+import pytest
+
+from app.mcp.manager import MCPManager
+from app.mcp.resource_monitor import PROCESS_MARKER_ENV, ResourceMonitor
+from app.models import MCPServer, MCPServerResourceSample
+
+
+@pytest.fixture
+def server_process():
+    """A long-running child process tagged as an MCP server."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(30)"],
+        env={**os.environ, PROCESS_MARKER_ENV: "server-a"},
+    )
+    yield process
+    process.kill()
+    process.wait()
+
+
+def make_sample(
+    rss_mb: float = 10, open_fds: int = 5, cpu_percent: float = 0.0
+) -> MCPServerResourceSample:
+    return MCPServerResourceSample(
+        timestamp=datetime.now(),
+        processes=1,
+        cpu_percent=cpu_percent,
+        rss_bytes=int(rss_mb * 1024 * 1024),
+        open_fds=open_fds,
+        threads=1,
+    )
+
+
+def test_sample_finds_tagged_process(server_process):  # noqa: ARG001
+    """Only processes carrying the server's marker are measured."""
+    monitor = ResourceMonitor(history_size=5)
+
+    sample = monitor.sample("server-a")
+
+    assert sample is not None
+    assert sample.processes == 1
+    assert sample.rss_bytes > 0
+    assert sample.threads >= 1
+    assert monitor.sample("server-b") is None
+
+
+def test_sample_all_scans_processes_once(server_process, monkeypatch):  # noqa: ARG001
+    """All servers are sampled from a single listing of our descendants."""
+    monitor = ResourceMonitor(history_size=5)
+    scans = []
+    children = psutil.Process.children
+
+    def count_scans(self, recursive=False):
+        if self.pid == os.getpid():
+            scans.append(self.pid)
+        return children(self, recursive=recursive)
+
+    monkeypatch.setattr(psutil.Process, "children", count_scans)
+
+    samples = monitor.sample_all(["server-a", "server-b", "server-c"])
+
+    assert list(samples) == ["server-a"]
+    assert samples["server-a"].processes == 1
+    assert monitor.history("server-a") == [samples["server-a"]]
+    assert len(scans) == 1
+
+
+def test_history_is_bounded(server_process):  # noqa: ARG001
+    monitor = ResourceMonitor(history_size=3)
+
+    samples = [monitor.sample("server-a") for _ in range(5)]
+
+    assert monitor.history("server-a") == samples[-3:]
+
+    monitor.forget("server-a")
+    assert monitor.history("server-a") == []
+
+
+def test_check_limits(monkeypatch):
+    """Hard limits take precedence over soft limits; unset limits never trip."""
+    monitor = ResourceMonitor()
+    assert monitor.check_limits(make_sample(rss_mb=10_000, open_fds=10_000)) == "ok"
+
+    monkeypatch.setattr(
+        "app.mcp.resource_monitor.settings.MCP_PROCESS_RSS_SOFT_LIMIT_MB", 100
+    )
+    monkeypatch.setattr(
+        "app.mcp.resource_monitor.settings.MCP_PROCESS_FDS_HARD_LIMIT", 50
+    )
+
+    assert monitor.check_limits(make_sample(rss_mb=50)) == "ok"
+    assert monitor.check_limits(make_sample(rss_mb=150)) == "soft"
+    assert monitor.check_limits(make_sample(rss_mb=150, open_fds=60)) == "hard"
+
+    monkeypatch.setattr(
+        "app.mcp.resource_monitor.settings.MCP_PROCESS_CPU_HARD_LIMIT_PERCENT", 200
+    )
+    assert monitor.check_limits(make_sample(cpu_percent=150)) == "ok"
+    assert monitor.check_limits(make_sample(cpu_percent=250)) == "hard"
+
+
+@pytest.mark.asyncio
+async def test_restarts_are_not_stacked(monkeypatch):
+    """A server over its limit gets one restart at a time, tracked until done."""
+    manager = MCPManager()
+    started = []
+
+    async def restart_server(server):
+        started.append(server.id)
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(manager, "restart_server", restart_server)
+    server = MCPServer(id="server-a", name="A", kind="custom")
+    assert manager._schedule_restart(server)
+    assert not manager._schedule_restart(server)
+    await asyncio.sleep(0)
+    assert started == ["server-a"]
+
+    task = manager._pending_restarts["server-a"]
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert "server-a" not in manager._pending_restarts
+    assert task not in manager._background_tasks
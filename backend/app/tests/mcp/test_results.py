@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+from mcp.types import TextContent
+
+from app.mcp.proxy import MCPProxy
+from app.mcp.queue_manager import queue_manager
+from app.mcp.results import bound_result, fetch_chunk
+from app.models import MCPRunConfig, MCPServer
+from app.tests.utils.redis import FakeRedis
+
+
+@pytest.mark.asyncio
+async def test_small_results_pass_through():
+    redis = FakeRedis()
+
+    bounded = await bound_result(
+        redis, "s", [TextContent(type="text", text="hello")], limit=10
+    )
+
+    assert bounded.content == [{"type": "text", "text": "hello", "annotations": None}]
+    assert bounded.continuation is None
+    assert redis.values == {}
+
+
+@pytest.mark.asyncio
+async def test_large_results_are_split_into_chunks():
+    redis = FakeRedis()
+    text = "a" * 10 + "b" * 25
+
+    bounded = await bound_result(
+        redis, "s", [TextContent(type="text", text=text)], limit=10, chunk_size=10
+    )
+
+    assert bounded.content[0]["text"] == "a" * 10
+    assert "fetch_result_chunk" in bounded.content[1]["text"]
+    assert bounded.continuation["chunks"] == 3
+    assert bounded.continuation["remaining"] == 25
+
+    token = bounded.continuation["token"]
+    chunks = [(await fetch_chunk(redis, "s", token, i))[0].text for i in range(3)]
+    assert "".join(chunks) == "b" * 25
+
+    with pytest.raises(ValueError, match="another server"):
+        await fetch_chunk(redis, "other", token, 0)
+    with pytest.raises(ValueError, match="between 0 and 2"):
+        await fetch_chunk(redis, "s", token, 3)
+
+
+@pytest_asyncio.fixture
+async def gateway(monkeypatch):
+    """Gateway with one proxy whose results are limited to 100 characters."""
+    redis = FakeRedis()
+    monkeypatch.setattr(queue_manager, "redis", redis)
+    monkeypatch.setattr(queue_manager, "pubsub", redis.pubsub())
+    await queue_manager.pubsub.subscribe(
+        queue_manager.response_channel, queue_manager.cancel_channel
+    )
+
+    upstream = FastMCP("upstream")
+
+    @upstream.tool()
+    def dump(size: int) -> str:
+        return "x" * size
+
+    proxy = MCPProxy(
+        mcp_server=MCPServer(
+            id="upstream",
+            name="Upstream",
+            description="Test server",
+            transport="stdio",
+            version="1.0.0",
+            run=MCPRunConfig(command="true"),
+            settings={"max_result_size": 100},
+        )
+    )
+    proxy.client = Client(upstream)
+    assert await proxy.initialize()
+
+    app = FastMCP("gateway")
+    proxy.mount(app)
+    worker = asyncio.create_task(queue_manager.start_worker({"upstream": proxy}))
+
+    yield app
+
+    await queue_manager.drain(timeout=1)
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    await proxy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_gateway_truncates_and_serves_chunks(gateway, monkeypatch):
+    monkeypatch.setattr("app.mcp.results.settings.MCP_RESULT_CHUNK_SIZE", 150)
+
+    async with Client(gateway) as client:
+        tools = {tool.name for tool in await client.list_tools()}
+        assert "upstream_fetch_result_chunk" in tools
+
+        result = await client.call_tool("upstream_dump", {"size": 400})
+        assert result[0].text == "x" * 100
+        token = result[1].text.split('token "')[1].split('"')[0]
+
+        first = await client.call_tool(
+            "upstream_fetch_result_chunk", {"token": token, "index": 0}
+        )
+        last = await client.call_tool(
+            "upstream_fetch_result_chunk", {"token": token, "index": 1}
+        )
+        assert first[0].text + last[0].text == "x" * 300
+        assert "next index is 1" in first[1].text
+        assert len(last) == 1
+
+        with pytest.raises(ToolError, match="expired"):
+            await client.call_tool(
+                "upstream_fetch_result_chunk", {"token": "missing", "index": 0}
+            )
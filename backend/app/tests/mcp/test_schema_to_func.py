@@ -1,9 +1,11 @@
 from typing import Any
 
 import pytest
+from fastmcp import FastMCP
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo, PydanticUndefined
 
+from app.mcp.openapi import schema_to_func
 from app.mcp.openapi.schema_to_func import schema_to_function
 
 
@@ -407,5 +409,91 @@ class TestSchemaToFunction:
         # No need to test required fields here as they were tested in schema assertions above
 
 
+ADDRESS_SCHEMA = {
+    "type": "object",
+    "title": "Address",
+    "properties": {"city": {"type": "string"}, "zip": {"type": "string"}},
+    "required": ["city"],
+}
+
+
+def _operation_schema(name: str) -> dict[str, Any]:
+    return {
+        "name": name,
+        "description": f"{name} operation",
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "description": "Record ID"},
+            "address": ADDRESS_SCHEMA,
+            "note": {"type": "string"},
+        },
+        "required": ["id"],
+    }
+
+
+class TestSchemaCompilationCache:
+    """Test suite for memoized and lazy compilation of generated functions"""
+
+    def test_input_model_compiled_on_first_use(self):
+        """The input model is only built once it is used"""
+        fn = schema_to_function(_operation_schema("CreateLazy"), {"path": "/lazy"})
+
+        assert not fn.model.compiled
+        assert list(fn.__signature__.parameters) == [
+            "id",
+            "address",
+            "note",
+            "response_fields",
+            "max_response_bytes",
+        ]
+
+        instance = fn.model(id=1, address={"city": "Paris"})
+        assert fn.model.compiled
+        assert instance.address.city == "Paris"
+        assert instance.model_config["json_schema_extra"] == {"path": "/lazy"}
+
+    def test_identical_schemas_share_models(self):
+        """Identical schemas reuse the compiled model, nested models are shared"""
+        first = schema_to_function(_operation_schema("CreateShared"), {"path": "/a"})
+        second = schema_to_function(_operation_schema("CreateShared"), {"path": "/a"})
+        other = schema_to_function(_operation_schema("UpdateShared"), {"path": "/b"})
+
+        assert first is not second
+        assert first.model is second.model
+        assert other.model is not first.model
+        assert (
+            first.model.model_fields["address"].annotation
+            == other.model.model_fields["address"].annotation
+        )
+
+    def test_registers_as_tool_without_compiling(self):
+        """FastMCP builds the tool from the signature alone"""
+        app = FastMCP("tools")
+        fn = schema_to_function(_operation_schema("CreateTool"))
+
+        app.add_tool(fn)
+
+        [tool] = app._tool_manager.list_tools()
+        assert tool.name == "CreateTool"
+        assert tool.parameters["required"] == ["id"]
+        assert not fn.model.compiled
+
+    def test_caches_keep_recently_used_models(self, monkeypatch):
+        """The caches evict their least recently used models past their size"""
+        monkeypatch.setattr(schema_to_func._function_cache, "maxsize", 2)
+        monkeypatch.setattr(schema_to_func._nested_model_cache, "maxsize", 2)
+        first = schema_to_function(_operation_schema("CreateFirst")).model
+        second = schema_to_function(_operation_schema("CreateSecond")).model
+        # Using the first model again makes the second the least recently used
+        assert schema_to_function(_operation_schema("CreateFirst")).model is first
+        schema_to_function(_operation_schema("CreateThird"))
+
+        assert len(schema_to_func._function_cache) == 2
+        assert schema_to_function(_operation_schema("CreateFirst")).model is first
+        assert schema_to_function(_operation_schema("CreateSecond")).model is not (
+            second
+        )
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
@@ -0,0 +1,149 @@
+import pytest
+
+from app.mcp.openapi.executor import translate_fn_to_endpoint
+from app.mcp.openapi.spec_index import SpecIndex
+
+SPEC = {
+    "openapi": "3.0.3",
+    "paths": {
+        "/pets/{petId}": {
+            "parameters": [{"$ref": "#/components/parameters/PetId"}],
+            "get": {
+                "operationId": "getPet",
+                "summary": "Get a pet",
+                "parameters": [
+                    {
+                        "name": "X-Request-Id",
+                        "in": "header",
+                        "schema": {"type": "string"},
+                    }
+                ],
+            },
+            "put": {
+                "operationId": "updatePet",
+                "requestBody": {"$ref": "#/components/requestBodies/Pet"},
+            },
+        },
+        "/trees": {
+            "post": {
+                "operationId": "createTree",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "root": {"$ref": "#/components/schemas/Node"}
+                                },
+                            }
+                        }
+                    }
+                },
+            },
+            "get": {"parameters": [{"name": "class", "in": "query"}]},
+        },
+    },
+    "components": {
+        "parameters": {
+            "PetId": {
+                "name": "petId",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "integer"},
+            }
+        },
+        "requestBodies": {
+            "Pet": {
+                "content": {
+                    "application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}
+                }
+            }
+        },
+        "schemas": {
+            "Named": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+                "required": ["name"],
+            },
+            "Pet": {
+                "allOf": [
+                    {"$ref": "#/components/schemas/Named"},
+                    {"type": "object", "properties": {"tag": {"type": "string"}}},
+                ]
+            },
+            "Node": {
+                "type": "object",
+                "properties": {
+                    "value": {"type": "integer"},
+                    "children": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Node"},
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def test_operations_are_materialized_lazily():
+    index = SpecIndex(SPEC)
+
+    assert index.operation_ids() == ["getPet", "updatePet", "get_trees", "createTree"]
+    assert index.stats()["materialized"] == 0
+
+    definition = index.definition("getPet")
+    assert definition["tool_schema"]["parameters"]["required"] == ["petId"]
+    assert definition["tool_metadata"]["X_Request_Id"] == {
+        "type": "parameter",
+        "in": "header",
+        "name": "X-Request-Id",
+    }
+    assert index.definition("getPet") is definition
+    assert index.stats()["materialized"] == 1
+
+    # Generated names stay valid identifiers
+    assert "class_" in index.definition("get_trees")["tool_metadata"]
+
+    with pytest.raises(KeyError):
+        index.definition("deletePet")
+
+
+def test_refs_are_resolved_once_with_cycles_cut():
+    index = SpecIndex(SPEC)
+
+    pet = index.definition("updatePet")["tool_schema"]["parameters"]
+    assert pet["properties"]["name"] == {"type": "string"}
+    assert pet["required"] == ["petId", "name"]
+
+    root = index.definition("createTree")["tool_schema"]["parameters"]["properties"][
+        "root"
+    ]
+    assert root["title"] == "Node"
+    assert root["properties"]["children"]["items"] == {
+        "type": "object",
+        "title": "Node",
+    }
+    assert index.stats()["cycles"] == 1
+
+    # Shared schemas are resolved once and reused
+    assert index.resolve({"$ref": "#/components/schemas/Node"}) is root
+    with pytest.raises(ValueError, match="local"):
+        index.resolve({"$ref": "other.yaml#/Pet"})
+
+
+def test_functions_translate_to_requests():
+    index = SpecIndex(SPEC)
+    fn = index.function("updatePet")
+    metadata = index.definition("updatePet")["tool_metadata"]
+
+    config = translate_fn_to_endpoint(
+        metadata=metadata,
+        connection=None,
+        fn=fn,
+        model_instance=fn.model(petId=3, name="Rex", tag="dog"),
+    )
+
+    assert index.function("updatePet") is fn
+    assert (config.method, config.url) == ("PUT", "/pets/3")
+    assert config.body == {"name": "Rex", "tag": "dog"}
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.mcp.stats import HOUR, MINUTE, ServerStatsHistory, parse_range
+from app.models import MCPServerStats
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 10, 19, 12, 0, 5, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[MCPServerStats.__table__])
+    with Session(engine) as session:
+        yield session
+
+
+def test_parse_range():
+    assert parse_range("30m") == timedelta(minutes=30)
+    assert parse_range("7d") == timedelta(days=7)
+    for value in ("", "0h", "1w", "h"):
+        with pytest.raises(ValueError):
+            parse_range(value)
+
+
+def test_minutes_are_aggregated_in_memory(session):
+    clock = Clock()
+    history = ServerStatsHistory(clock=clock)
+
+    for latency in (0.01, 0.02, 0.03, 0.5):
+        history.record_call("s", latency, ok=True)
+    history.record_call("s", 0.04, ok=False)
+    clock.advance(minutes=1)
+    history.record_restart("s")
+    history.record_call("s", 0.1, ok=True)
+
+    resolution, points = history.query(session, "s", timedelta(hours=1))
+
+    assert resolution == MINUTE
+    assert [(p.calls, p.errors, p.restarts) for p in points] == [(5, 1, 0), (1, 0, 1)]
+    assert points[0].latency_p50_ms == 30.0
+    assert points[0].latency_max_ms == 500.0
+    assert points[1].bucket_start - points[0].bucket_start == timedelta(minutes=1)
+
+
+def test_compaction_persists_and_downsamples(session):
+    clock = Clock()
+    history = ServerStatsHistory(clock=clock)
+
+    for _ in range(3):
+        history.record_call("s", 0.01, ok=True)
+        clock.advance(minutes=1)
+    history.record_call("s", 0.02, ok=False)
+
+    # The open minute stays in memory until it closes
+    assert history.compact(session) == 3
+    assert history.compact(session) == 0
+    _, points = history.query(session, "s", timedelta(hours=1))
+    assert sum(p.calls for p in points) == 4
+
+    clock.advance(hours=26)
+    history.compact(session)
+
+    rows = session.exec(select(MCPServerStats)).all()
+    assert {row.resolution for row in rows} == {HOUR}
+    resolution, points = history.query(session, "s", timedelta(days=7))
+    assert resolution == HOUR
+    assert [(p.calls, p.errors) for p in points] == [(4, 1)]
+    assert points[0].latency_max_ms == 20.0
+
+    clock.advance(days=40)
+    history.compact(session)
+    assert session.exec(select(MCPServerStats)).all() == []
+
+
+def test_failed_compaction_is_retried(session, monkeypatch):
+    clock = Clock()
+    history = ServerStatsHistory(clock=clock)
+    for _ in range(2):
+        history.record_call("s", 0.01, ok=True)
+        clock.advance(minutes=1)
+
+    def fail():
+        raise RuntimeError("commit failed")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(session, "commit", fail)
+        with pytest.raises(RuntimeError):
+            history.compact(session)
+
+    # The minutes lost with the rollback are written again
+    assert history.compact(session) == 2
+    assert len(session.exec(select(MCPServerStats)).all()) == 2
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+
+from app.mcp.loadtest.fake_server import FakeMCPServer
+from app.mcp.loadtest.replay import replay
+from app.mcp.loadtest.trace import load_trace, synthesize_arguments
+from app.mcp.proxy import MCPProxy
+from app.mcp.traffic import TrafficRecorder, argument_shape
+from app.models import MCPRunConfig, MCPServer
+
+
+def test_argument_shape_drops_values():
+    shape = argument_shape(
+        {"query": "secret", "limit": 5, "tags": ["a", "b"], "opts": {"exact": True}}
+    )
+
+    assert shape == {
+        "query": "str",
+        "limit": "int",
+        "tags": ["str"],
+        "opts": {"exact": "bool"},
+    }
+    assert synthesize_arguments(shape) == {
+        "query": "x",
+        "limit": 0,
+        "tags": ["x"],
+        "opts": {"exact": False},
+    }
+
+
+def test_disabled_or_unsampled_recorder_skips_calls(tmp_path):
+    assert not TrafficRecorder(tmp_path / "a.ndjson", enabled=False).should_record()
+    assert not TrafficRecorder(
+        tmp_path / "b.ndjson", sample_rate=0.0, enabled=True
+    ).should_record()
+
+
+@pytest.mark.asyncio
+async def test_proxy_records_sampled_calls(tmp_path, monkeypatch):
+    recorder = TrafficRecorder(tmp_path / "trace.ndjson", sample_rate=1.0, enabled=True)
+    monkeypatch.setattr("app.mcp.proxy.traffic_recorder", recorder)
+
+    proxy = MCPProxy(
+        mcp_server=MCPServer(
+            id="traced-server",
+            name="Traced Server",
+            description="Test server",
+            transport="stdio",
+            version="1.0.0",
+            run=MCPRunConfig(command="true"),
+        )
+    )
+
+    async def queue_tool_call(key, arguments):  # noqa: ARG001
+        return [{"type": "text", "text": "hello"}], True
+
+    monkeypatch.setattr(proxy, "_queue_tool_call", queue_tool_call)
+    await proxy._mcp_call_tool("greet", {"name": "Ada"})
+    recorder.close()
+
+    [entry] = load_trace(tmp_path / "trace.ndjson")
+    assert entry["server"] == "traced-server"
+    assert entry["tool"] == "greet"
+    assert entry["args"] == {"name": "str"}
+    assert entry["result_bytes"] == len(
+        json.dumps([{"type": "text", "text": "hello"}], separators=(",", ":"))
+    )
+    assert entry["ok"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_record_their_own_outcome(tmp_path, monkeypatch):
+    recorder = TrafficRecorder(tmp_path / "trace.ndjson", sample_rate=1.0, enabled=True)
+    monkeypatch.setattr("app.mcp.proxy.traffic_recorder", recorder)
+    proxy = MCPProxy(
+        mcp_server=MCPServer(
+            id="traced-server",
+            name="Traced Server",
+            transport="stdio",
+            run=MCPRunConfig(command="true"),
+        )
+    )
+
+    async def queue_tool_call(key, arguments):  # noqa: ARG001
+        if key == "flaky":
+            # Fails while the other call is still running
+            await asyncio.sleep(0.01)
+            proxy.stats["errors"] += 1
+            return [], False
+        await asyncio.sleep(0.05)
+        return [{"type": "text", "text": "hello"}], True
+
+    monkeypatch.setattr(proxy, "_queue_tool_call", queue_tool_call)
+    await asyncio.gather(
+        proxy._mcp_call_tool("greet", {}), proxy._mcp_call_tool("flaky", {})
+    )
+    recorder.close()
+
+    outcomes = {
+        entry["tool"]: entry["ok"] for entry in load_trace(tmp_path / "trace.ndjson")
+    }
+    assert outcomes == {"greet": True, "flaky": False}
+
+
+@pytest.mark.asyncio
+async def test_replay_against_fake_server():
+    entries = [
+        {
+            "ts": 100.0 + i * 0.01,
+            "server": "s",
+            "tool": "search" if i % 2 else "flaky",
+            "args": {"q": "str"},
+            "latency_ms": 2.0,
+            "result_bytes": 128,
+            "ok": i % 2 == 1,
+        }
+        for i in range(10)
+    ]
+    fake = FakeMCPServer.from_trace(entries)
+
+    report = await replay(entries, Client(fake), speed=10.0)
+
+    assert report.calls == 10
+    assert report.errors == 5
+    assert report.errors_by_tool == {"flaky": 5}
+    assert report.error_rate == 0.5
+    assert report.latency_ms["p50"] >= 2.0
+    assert report.throughput > 0
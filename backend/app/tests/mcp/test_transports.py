@@ -0,0 +1,128 @@
+import httpx
+import pytest
+from fastmcp.client.transports import StdioTransport
+
+from app.mcp.resource_monitor import PROCESS_MARKER_ENV
+from app.mcp.transports import (
+    HTTPConnectionPool,
+    PooledSSETransport,
+    PooledStreamableHttpTransport,
+    create_transport,
+)
+from app.models import MCPRunConfig, MCPServer
+
+
+def make_server(**kwargs) -> MCPServer:
+    data = {
+        "id": "test-server",
+        "name": "Test Server",
+        "description": "Test server",
+        "transport": "http",
+        "version": "1.0.0",
+    }
+    return MCPServer(**{**data, **kwargs})
+
+
+def test_stdio_transport_without_url():
+    """Servers without a url keep running as local subprocesses."""
+    server = make_server(
+        run=MCPRunConfig(command="npx", args=["server"], env={"A": "1"}),
+        secrets={"TOKEN": "secret"},
+    )
+
+    transport = create_transport(server)
+
+    assert isinstance(transport, StdioTransport)
+    assert transport.env == {
+        "A": "1",
+        "TOKEN": "secret",
+        PROCESS_MARKER_ENV: "test-server",
+    }
+
+
+def test_remote_transports_send_secrets_as_headers():
+    """Hosted endpoints are reached over HTTP with secrets as headers."""
+    sse = create_transport(
+        make_server(
+            transport="sse",
+            url="https://mcp.example.com/sse",
+            secrets={"Authorization": "Bearer token"},
+        )
+    )
+    http = create_transport(
+        make_server(
+            transport="streamable-http",
+            url="https://mcp.example.com/mcp",
+            settings={"headers": {"X-Tenant": "acme"}},
+        )
+    )
+
+    assert isinstance(sse, PooledSSETransport)
+    assert sse.headers == {"Authorization": "Bearer token"}
+    assert isinstance(http, PooledStreamableHttpTransport)
+    assert http.headers == {"X-Tenant": "acme"}
+
+
+def test_server_without_run_or_url_is_rejected():
+    with pytest.raises(ValueError, match="neither a run configuration nor a url"):
+        create_transport(make_server())
+
+
+class RecordingTransport(httpx.AsyncHTTPTransport):
+    closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_pool_outlives_session_clients():
+    """Closing a session's httpx client leaves the shared pool open."""
+    pool = HTTPConnectionPool()
+    shared = RecordingTransport()
+    pool._transports["https://mcp.example.com"] = shared
+
+    async with pool.client_factory("https://mcp.example.com/mcp")(headers={}):
+        pass
+    pool.client_factory("https://mcp.example.com/other")
+
+    assert not shared.closed
+    assert list(pool._transports) == ["https://mcp.example.com"]
+
+    await pool.aclose()
+    assert shared.closed
+    assert not pool._transports
+
+
+@pytest.mark.asyncio
+async def test_secret_headers_do_not_follow_cross_origin_redirects():
+    """Redirects to another origin do not receive the server's secret headers."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/mcp":
+            return httpx.Response(307, headers={"Location": "/mcp/"})
+        if request.url.host == "mcp.example.com":
+            return httpx.Response(
+                307, headers={"Location": "https://evil.example.com/collect"}
+            )
+        return httpx.Response(200)
+
+    pool = HTTPConnectionPool()
+    pool._transports["https://mcp.example.com"] = httpx.MockTransport(handler)
+    factory = pool.client_factory("https://mcp.example.com/mcp")
+
+    async with factory(headers={"X-Api-Key": "secret"}) as client:
+        await client.get("https://mcp.example.com/mcp")
+
+    assert [str(request.url) for request in requests] == [
+        "https://mcp.example.com/mcp",
+        "https://mcp.example.com/mcp/",
+        "https://evil.example.com/collect",
+    ]
+    assert [request.headers.get("X-Api-Key") for request in requests] == [
+        "secret",
+        "secret",
+        None,
+    ]
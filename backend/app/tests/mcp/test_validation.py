@@ -0,0 +1,88 @@
+import pytest
+from fastmcp.exceptions import ToolError
+
+from app.mcp import validation
+from app.mcp.proxy import MCPProxy
+from app.mcp.validation import (
+    ArgumentValidationError,
+    ToolArgumentValidator,
+    compile_validator,
+)
+from app.models import MCPRunConfig, MCPServer, MCPTool
+
+SEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string"},
+        "limit": {"type": "integer", "minimum": 1},
+    },
+    "required": ["query"],
+}
+
+
+def test_rejects_with_precise_errors():
+    validator = ToolArgumentValidator()
+    validator.load({"search": SEARCH_SCHEMA, "free": None})
+
+    validator.validate("search", {"query": "mcp", "limit": 5})
+    validator.validate("free", {"anything": True})
+    validator.validate("unknown", {"anything": True})
+
+    with pytest.raises(ArgumentValidationError) as exc_info:
+        validator.validate("search", {"limit": 0})
+
+    assert exc_info.value.errors == [
+        "<root>: 'query' is a required property",
+        "limit: 0 is less than the minimum of 1",
+    ]
+    stats = validator.stats()
+    assert stats["validated"] == 2
+    assert stats["rejected"] == 1
+
+
+def test_validators_are_shared_and_invalid_schemas_skipped():
+    assert compile_validator(dict(SEARCH_SCHEMA)) is compile_validator(
+        dict(SEARCH_SCHEMA)
+    )
+    assert compile_validator({"type": "not-a-type"}) is None
+
+
+@pytest.mark.asyncio
+async def test_proxy_rejects_before_enqueue(monkeypatch):
+    async def enqueue_tool_call(**kwargs):  # noqa: ARG001
+        raise AssertionError("invalid call reached the queue")
+
+    monkeypatch.setattr(
+        "app.mcp.proxy.queue_manager.enqueue_tool_call", enqueue_tool_call
+    )
+    server = MCPServer(
+        id="validation-server",
+        name="Validation Server",
+        description="Test server",
+        transport="stdio",
+        version="1.0.0",
+        run=MCPRunConfig(command="true"),
+        tools=[
+            MCPTool(
+                name="search", description="", parameters=SEARCH_SCHEMA, status=True
+            )
+        ],
+    )
+    proxy = MCPProxy(mcp_server=server)
+
+    with pytest.raises(ToolError, match="'query' is a required property"):
+        await proxy._mcp_call_tool("search", {"limit": 3})
+
+    assert proxy.stats["validation"]["rejected"] == 1
+    assert proxy.stats["errors"] == 0
+
+
+def test_validator_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(validation._validator_cache, "maxsize", 2)
+    first = compile_validator({**SEARCH_SCHEMA, "title": "first"})
+    compile_validator({**SEARCH_SCHEMA, "title": "second"})
+    assert compile_validator({**SEARCH_SCHEMA, "title": "first"}) is first
+    compile_validator({**SEARCH_SCHEMA, "title": "third"})
+
+    assert len(validation._validator_cache) == 2
+    assert compile_validator({**SEARCH_SCHEMA, "title": "first"}) is first
@@ -0,0 +1,205 @@
+import copy
+
+import chromadb
+import pytest
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+from app.services import api_search_service
+from app.services.api_search_service import (
+    SearchMode,
+    delete_embeddings,
+    search_endpoints,
+    store_embeddings,
+)
+from app.services.file_service import original_filename
+from app.services.fts_index import EndpointFTSIndex, keywords, match_query
+
+
+class CountingEmbeddings(EmbeddingFunction):
+    """Embeds documents by a few word counts, recording each embedded document."""
+
+    def __init__(self):
+        self.documents: list[str] = []
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self.documents.extend(input)
+        return [
+            [float(document.lower().count(word)) for word in ("meow", "cat", "pet")]
+            + [1.0]
+            for document in input
+        ]
+
+
+def operation(summary: str) -> dict:
+    return {"summary": summary, "responses": {"200": {"description": "OK"}}}
+
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {
+        f"/pets/{n}": {"get": operation(f"Get pet {n}"), "delete": operation("Drop")}
+        for n in range(60)
+    },
+}
+
+
+CATS = {
+    "swagger": "2.0",
+    "info": {"title": "Cats", "version": "1.0.0"},
+    "paths": {
+        "/cats/{catId}/meow": {
+            "post": {**operation("Make a cat meow"), "tags": ["cats"]}
+        },
+        "/cats": {"get": {**operation("List cats"), "operationId": "listCats"}},
+    },
+}
+
+
+@pytest.fixture
+def embeddings(monkeypatch, tmp_path):
+    embedding_function = CountingEmbeddings()
+    client = chromadb.EphemeralClient()
+    monkeypatch.setattr(api_search_service, "chroma_client", client)
+    monkeypatch.setattr(api_search_service, "embedding_function", embedding_function)
+    monkeypatch.setattr(
+        api_search_service, "fts_index", EndpointFTSIndex(tmp_path / "fts.db")
+    )
+    yield embedding_function
+    client.delete_collection("test-project")
+
+
+def test_original_filename():
+    assert original_filename("project/20250101_120000_spec.json") == "spec.json"
+    assert original_filename("20250101_120000_20250101_spec.json") == (
+        "20250101_spec.json"
+    )
+    assert original_filename("spec.json") == "spec.json"
+
+
+def test_reuploads_embed_only_changed_endpoints(embeddings):
+    first = store_embeddings("test-project", "20250101_120000_pets.json", SPEC)
+    assert (first.endpoints, first.unchanged, first.removed) == (120, 0, 0)
+    assert len(embeddings.documents) == 120
+
+    spec = copy.deepcopy(SPEC)
+    spec["paths"]["/pets/1"]["get"]["summary"] = "Fetch pet 1"
+    del spec["paths"]["/pets/2"]
+    spec["paths"]["/cats"] = {"get": operation("List cats")}
+    embeddings.documents.clear()
+    second = store_embeddings("test-project", "20250102_120000_pets.json", spec)
+
+    assert (second.endpoints, second.unchanged, second.removed) == (119, 117, 2)
+    assert len(embeddings.documents) == 2
+    assert any("Fetch pet 1" in document for document in embeddings.documents)
+
+    collection = api_search_service.get_collection("test-project")
+    indexed = collection.get(include=["metadatas"])
+    assert len(indexed["ids"]) == 119
+    # Every endpoint now belongs to the latest upload
+    assert {
+        (metadata["file_id"], metadata["source"]) for metadata in indexed["metadatas"]
+    } == {("20250102_120000_pets.json", "pets.json:Pets")}
+
+
+def test_other_collections_and_legacy_documents(embeddings):
+    collection = api_search_service.get_collection("test-project")
+    # Documents indexed before sources, keyed by the timestamped file
+    collection.add(
+        ids=["20240101_120000_pets.json_old"],
+        documents=["old"],
+        metadatas=[{"file_id": "20240101_120000_pets.json"}],
+    )
+    store_embeddings("test-project", "20250101_120000_other.json", SPEC)
+    # An unrelated spec uploaded under the same name
+    store_embeddings("test-project", "20250101_120000_pets.json", CATS)
+    embeddings.documents.clear()
+
+    result = store_embeddings("test-project", "20250102_120000_pets.json", SPEC)
+
+    assert (result.unchanged, result.removed) == (0, 0)
+    assert len(embeddings.documents) == 120
+    assert len(collection.get()["ids"]) == 1 + 120 + 2 + 120
+    assert len(collection.get(where={"source": "other.json:Pets"})["ids"]) == 120
+    assert len(collection.get(where={"source": "pets.json:Cats"})["ids"]) == 2
+
+
+def test_keywords():
+    assert keywords("repos/:owner/issues") == "repos owner issues"
+    assert keywords("listRepoIssues") == "listrepoissues list repo issues"
+    assert match_query('POST /repos/{owner}/issues "x"') == (
+        '"post" OR "repos" OR "owner" OR "issues" OR "x"'
+    )
+    assert match_query("/ ?") is None
+
+
+@pytest.mark.usefixtures("embeddings")
+def test_search_modes():
+    store_embeddings("test-project", "20250101_120000_pets.json", SPEC)
+    store_embeddings("test-project", "20250101_120000_cats.json", CATS)
+
+    fts = search_endpoints(
+        "test-project", "POST /cats/{catId}/meow", 3, None, SearchMode.FTS
+    )
+    assert fts[0].metadata["url"] == "cats/:catId/meow"
+    assert fts[0].ranks == {"fts": 1}
+    assert fts[0].score > fts[1].score
+
+    semantic = search_endpoints("test-project", "pet", 3, None, SearchMode.SEMANTIC)
+    assert [match.ranks["semantic"] for match in semantic] == [1, 2, 3]
+    assert semantic[0].score <= semantic[1].score
+
+    hybrid = search_endpoints("test-project", "meow cat", 5)
+    assert hybrid[0].metadata["url"] == "cats/:catId/meow"
+    assert set(hybrid[0].ranks) == {"semantic", "fts"}
+    assert hybrid[0].score == pytest.approx(
+        sum(1 / (60 + rank) for rank in hybrid[0].ranks.values())
+    )
+    assert [match.score for match in hybrid] == sorted(
+        (match.score for match in hybrid), reverse=True
+    )
+
+    # Filters apply to keyword matches too
+    filtered = search_endpoints(
+        "test-project",
+        "meow cat",
+        5,
+        {"file_id": "20250101_120000_pets.json"},
+        SearchMode.HYBRID,
+    )
+    assert filtered
+    assert all(
+        match.metadata["file_id"] == "20250101_120000_pets.json" for match in filtered
+    )
+
+    delete_embeddings("test-project", "20250101_120000_cats.json")
+    assert not search_endpoints("test-project", "meow", 5, None, SearchMode.FTS)
+
+
+@pytest.mark.usefixtures("embeddings")
+def test_search_indexes_endpoints_embedded_before_fts():
+    store_embeddings("test-project", "20250101_120000_cats.json", CATS)
+    api_search_service.fts_index.delete("test-project")
+
+    matches = search_endpoints("test-project", "meow", 1, None, SearchMode.FTS)
+    assert matches[0].metadata["url"] == "cats/:catId/meow"
+
+
+def test_keyword_scores_do_not_depend_on_other_projects(tmp_path):
+    index = EndpointFTSIndex(tmp_path / "fts.db")
+    metadata = {"method": "GET", "url": "cats/:catId", "name": "Get a cat"}
+    index.upsert("one", ["cat"], [metadata])
+    before = index.search("one", "cat")
+
+    index.upsert(
+        "two",
+        [f"cat{n}" for n in range(20)],
+        [{"url": f"cats/{n}", "name": "cat"} for n in range(20)],
+    )
+
+    assert index.search("one", "cat") == before
+    assert len(index.search("two", "cat", 50)) == 20
+    index.delete("two")
+    assert index.search("two", "cat") == []
+    assert index.count("two") == 0
+    assert index.search("one", "cat") == before
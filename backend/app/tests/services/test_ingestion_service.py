@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.api_search_service import EmbeddingResult
+from app.services.ingestion_service import (
+    IngestionJob,
+    IngestionJobStatus,
+    IngestionQueue,
+)
+
+
+@pytest.fixture
+def upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BASE_DIR", str(tmp_path))
+    project_dir = tmp_path / ".centroid" / "uploads" / "project"
+    project_dir.mkdir(parents=True)
+    (project_dir / "spec.json").write_text(json.dumps({"openapi": "3.0.3"}))
+    return "project/spec.json"
+
+
+def wait(queue: IngestionQueue, job: IngestionJob) -> IngestionJob:
+    deadline = time.monotonic() + 5
+    while queue.get(job.id).status in (
+        IngestionJobStatus.QUEUED,
+        IngestionJobStatus.RUNNING,
+    ):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return queue.get(job.id)
+
+
+def test_jobs_report_progress_and_timings(upload):
+    release = threading.Event()
+    calls = []
+
+    def ingest(project_id, file_id, content, on_progress=None):
+        calls.append((project_id, file_id, content))
+        on_progress(EmbeddingResult(endpoints=50))
+        release.wait(5)
+        return EmbeddingResult(
+            endpoints=120, skipped=1, errors=["bad endpoint"], embed_seconds=0.5
+        )
+
+    queue = IngestionQueue(workers=1, ingest=ingest)
+    job = queue.submit("project", upload)
+    assert job.status in (IngestionJobStatus.QUEUED, IngestionJobStatus.RUNNING)
+
+    deadline = time.monotonic() + 5
+    while queue.get(job.id).endpoints_processed < 50:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert queue.get(job.id).status == IngestionJobStatus.RUNNING
+    release.set()
+
+    job = wait(queue, job)
+    queue.shutdown()
+    assert calls == [("project", "spec.json", {"openapi": "3.0.3"})]
+    assert job.status == IngestionJobStatus.COMPLETED
+    assert (job.endpoints_processed, job.endpoints_skipped) == (120, 1)
+    assert job.endpoint_errors == ["bad endpoint"]
+    assert job.error is None
+    assert job.timings["embed"] == 0.5
+    assert set(job.timings) == {"queued", "parse", "extract", "embed", "total"}
+    assert job.finished_at >= job.started_at >= job.created_at
+
+
+def test_failed_jobs_keep_their_error(upload):
+    def ingest(*args, **kwargs):  # noqa: ARG001
+        raise ValueError("Unsupported API collection format")
+
+    queue = IngestionQueue(workers=1, ingest=ingest)
+    job = wait(queue, queue.submit("project", upload))
+    missing = wait(queue, queue.submit("project", "project/missing.json"))
+    queue.shutdown()
+
+    assert job.status == IngestionJobStatus.FAILED
+    assert job.error == "Unsupported API collection format"
+    assert missing.status == IngestionJobStatus.FAILED
+    assert "missing.json" in missing.error
+
+
+def test_finished_jobs_are_pruned(upload):
+    queue = IngestionQueue(
+        workers=1, retained=2, ingest=lambda *args, **kwargs: EmbeddingResult()
+    )
+    jobs = [wait(queue, queue.submit("project", upload)) for _ in range(3)]
+    other = wait(queue, queue.submit("other", upload))
+    queue.shutdown()
+
+    assert queue.get(jobs[0].id) is None
+    assert [job.id for job in queue.list()] == [other.id, jobs[2].id]
+    assert [job.id for job in queue.list("project")] == [jobs[2].id]
+
+
+def test_uploads_of_a_file_are_ingested_one_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BASE_DIR", str(tmp_path))
+    project_dir = tmp_path / ".centroid" / "uploads" / "project"
+    project_dir.mkdir(parents=True)
+    files = [f"2025010{day}_120000_spec.json" for day in range(1, 4)]
+    for name in files:
+        (project_dir / name).write_text(json.dumps({"openapi": "3.0.3"}))
+    running: list[str] = []
+    overlapped = []
+
+    def ingest(project_id, file_id, content, on_progress=None):  # noqa: ARG001
+        running.append(file_id)
+        overlapped.append(len(running) > 1)
+        time.sleep(0.05)
+        running.remove(file_id)
+        return EmbeddingResult()
+
+    queue = IngestionQueue(workers=3, ingest=ingest)
+    jobs = [queue.submit("project", f"project/{name}") for name in files]
+    jobs = [wait(queue, job) for job in jobs]
+    queue.shutdown()
+
+    assert all(job.status == IngestionJobStatus.COMPLETED for job in jobs)
+    assert overlapped == [False, False, False]
+    # Locks are dropped with the last job of their file
+    deadline = time.monotonic() + 5
+    while queue._source_locks:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
@@ -0,0 +1,148 @@
+from app.services.openapi_endpoints import example_value, iter_openapi_endpoints
+from app.services.utils import APIEndpoint, parse_api_collection
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {
+        "/pets/{petId}": {
+            "parameters": [{"$ref": "#/components/parameters/PetId"}],
+            "get": {
+                "operationId": "getPet",
+                "summary": "Get a pet",
+                "tags": ["pets"],
+                "parameters": [
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "description": "Fields to return",
+                        "schema": {"type": "string", "enum": ["name", "tag"]},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "The pet",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Pet"}
+                            }
+                        },
+                    },
+                    "default": {"description": "Error"},
+                },
+            },
+            "put": {
+                "operationId": "updatePet",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "example": {"name": "Rex"},
+                            "schema": {"$ref": "#/components/schemas/Pet"},
+                        }
+                    }
+                },
+                "responses": {"204": {"description": "Updated"}},
+            },
+        }
+    },
+    "components": {
+        "parameters": {
+            "PetId": {
+                "name": "petId",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "integer", "format": "int64"},
+            }
+        },
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "parent": {"$ref": "#/components/schemas/Pet"},
+                },
+            }
+        },
+    },
+}
+
+SWAGGER = {
+    "swagger": "2.0",
+    "produces": ["application/json"],
+    "paths": {
+        "/pets": {
+            "post": {
+                "tags": ["pets"],
+                "parameters": [
+                    {
+                        "name": "pet",
+                        "in": "body",
+                        "schema": {"properties": {"name": {"example": "Rex"}}},
+                    },
+                    {"name": "dry_run", "in": "query", "type": "boolean"},
+                ],
+                "responses": {"201": {"description": "Created"}},
+            }
+        }
+    },
+}
+
+
+def test_openapi_operations_become_endpoints():
+    get_pet, update_pet = parse_api_collection(SPEC)
+
+    endpoint = APIEndpoint(**get_pet)
+    assert (endpoint.name, endpoint.folder) == ("Get a pet", "pets")
+    assert endpoint.request.method == "GET"
+    assert endpoint.request.url.path == ["pets", ":petId"]
+    assert endpoint.request.url.raw == "{{baseUrl}}/pets/:petId"
+    assert endpoint.request.url.variable == [{"key": "petId", "value": "<long>"}]
+    assert endpoint.request.url.query == [
+        {
+            "key": "fields",
+            "value": "name",
+            "description": {"content": "Fields to return", "type": "text/plain"},
+            "disabled": True,
+        }
+    ]
+    assert endpoint.request.header == [{"key": "Accept", "value": "application/json"}]
+    assert [(r.code, r.status) for r in endpoint.response] == [
+        (200, "OK"),
+        (None, None),
+    ]
+    # The recursive schema is cut where it refers to itself
+    assert '"parent": {}' in endpoint.response[0].body
+
+    endpoint = APIEndpoint(**update_pet)
+    assert endpoint.request.body["raw"] == '{"name": "Rex"}'
+    assert endpoint.folder == ""
+
+    # Ids are stable across extractions
+    assert [e["id"] for e in iter_openapi_endpoints(SPEC)] == [
+        get_pet["id"],
+        update_pet["id"],
+    ]
+
+
+def test_swagger_operations_become_endpoints():
+    (create_pet,) = parse_api_collection(SWAGGER)
+
+    endpoint = APIEndpoint(**create_pet)
+    assert endpoint.name == "/pets"
+    assert endpoint.request.body["raw"] == '{"name": "Rex"}'
+    assert endpoint.request.url.query[0]["value"] == "<boolean>"
+    assert endpoint.request.header == [
+        {"key": "Content-Type", "value": "application/json"},
+        {"key": "Accept", "value": "application/json"},
+    ]
+    assert (endpoint.response[0].code, endpoint.response[0].status) == (
+        201,
+        "Created",
+    )
+
+
+def test_example_values():
+    assert example_value({"type": "string", "format": "date-time"}) == "<date-time>"
+    assert example_value({"type": ["null", "number"]}) == "<number>"
+    assert example_value({"oneOf": [{"type": "boolean"}]}) == "<boolean>"
+    assert example_value({"type": "array", "items": {"default": 3}}) == [3]
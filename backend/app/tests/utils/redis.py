@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any
+
+
+class FakePubSub:
+    """In-memory stand-in for redis.asyncio.client.PubSub."""
+
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._channels: set[str] = set()
+        self._messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._channels.add(channel)
+            self._redis._subscribers[channel].add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self._channels):
+            self._channels.discard(channel)
+            self._redis._subscribers[channel].discard(self)
+
+    async def close(self) -> None:
+        await self.unsubscribe()
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float = 0.0
+    ) -> dict[str, Any] | None:
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout=timeout or 0)
+        except asyncio.TimeoutError:
+            return None
+
+    async def listen(self):
+        while True:
+            yield await self._messages.get()
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio.Redis used by the MCP queue."""
+
+    def __init__(self):
+        self.lists: dict[str, deque] = defaultdict(deque)
+        self.values: dict[str, Any] = {}
+        self.published: list[tuple[str, str]] = []
+        self._subscribers: dict[str, set[FakePubSub]] = defaultdict(set)
+        self._pushed: dict[str, asyncio.Event] = defaultdict(asyncio.Event)
+        self.streams: dict[str, list[tuple[str, dict[str, str]]]] = defaultdict(list)
+        self.expirations: dict[str, int] = {}
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        return None
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def lpush(self, key: str, *values: str) -> int:
+        for value in values:
+            self.lists[key].appendleft(value)
+        self._pushed[key].set()
+        return len(self.lists[key])
+
+    async def rpush(self, key: str, *values: str) -> int:
+        for value in values:
+            self.lists[key].append(value)
+        self._pushed[key].set()
+        return len(self.lists[key])
+
+    async def llen(self, key: str) -> int:
+        return len(self.lists[key])
+
+    async def brpop(self, key: str, timeout: float = 0) -> tuple[str, str] | None:
+        deadline = time.monotonic() + timeout
+        while not self.lists[key]:
+            pushed = self._pushed[key]
+            pushed.clear()
+            remaining = deadline - time.monotonic() if timeout else None
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(pushed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return key, self.lists[key].pop()
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        subscribers = self._subscribers.get(channel, set())
+        for pubsub in subscribers:
+            pubsub._messages.put_nowait(
+                {"type": "message", "channel": channel, "data": message}
+            )
+        return len(subscribers)
+
+    async def set(self, key: str, value: Any, ex: int | None = None) -> bool:  # noqa: ARG002
+        self.values[key] = value
+        return True
+
+    async def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self.expirations[key] = seconds
+        return True
+
+    async def xadd(
+        self,
+        key: str,
+        fields: dict[str, str],
+        maxlen: int | None = None,
+        approximate: bool = True,  # noqa: ARG002
+    ) -> str:
+        stream = self.streams[key]
+        entry_id = f"{len(stream) + 1}-0"
+        stream.append((entry_id, dict(fields)))
+        if maxlen is not None:
+            del stream[:-maxlen]
+        self._pushed[key].set()
+        return entry_id
+
+    async def xread(
+        self, streams: dict[str, str], block: int | None = None
+    ) -> list[tuple[str, list[tuple[str, dict[str, str]]]]]:
+        def pending() -> list[tuple[str, list[tuple[str, dict[str, str]]]]]:
+            found = []
+            for key, last_id in streams.items():
+                last = int(last_id.split("-")[0])
+                entries = [
+                    entry
+                    for entry in self.streams[key]
+                    if int(entry[0].split("-")[0]) > last
+                ]
+                if entries:
+                    found.append((key, entries))
+            return found
+
+        found = pending()
+        if found or block is None:
+            return found
+
+        events = [self._pushed[key] for key in streams]
+        for event in events:
+            event.clear()
+        waiters = [asyncio.create_task(event.wait()) for event in events]
+        try:
+            await asyncio.wait(
+                waiters,
+                timeout=block / 1000 if block else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return pending()